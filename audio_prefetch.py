@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+音訊預先解碼 - 在 Whisper 推論前先把影片解碼成 16kHz 單聲道 PCM
+
+- 解碼由 ffmpeg 子行程執行，同時最多預先解碼 lookahead 支影片，與推論重疊
+- PCM 以 int16 原始檔存放於 cache/audio，以記憶體映射讀取後轉為 float32 交給 Whisper
+- 以 (路徑, 大小, 修改時間) 為 key，重新執行同一支影片時不需再解碼
+- 轉錄快取的音訊雜湊可直接由 PCM 檔計算（與 ffmpeg 輸出逐位元組相同）
+"""
+
+import os
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_AUDIO_FOLDER = "cache/audio"
+SAMPLE_RATE = 16000
+
+# 與 TranscriptionCache._compute_audio_hash 相同的解碼參數
+FFMPEG_PCM_ARGS = ['-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le']
+
+
+def load_pcm(pcm_path: str) -> "np.ndarray":
+    """以記憶體映射讀取 int16 PCM，返回 Whisper 使用的 float32 陣列（-1 ~ 1）"""
+    samples = np.memmap(pcm_path, dtype=np.int16, mode='r')
+    return samples.astype(np.float32) / 32768.0
+
+
+class AudioStore:
+    """預先解碼的 PCM 檔案（int16, 16kHz, mono）"""
+
+    def __init__(self, folder: str = DEFAULT_AUDIO_FOLDER, max_gb: float = 5.0):
+        path = Path(folder)
+        self.folder = path if path.is_absolute() else PROJECT_ROOT / path
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_gb * 1024 ** 3)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def pcm_path(self, video_path: str) -> Path:
+        """影片對應的 PCM 檔路徑（路徑、大小或修改時間改變時 key 也會改變）"""
+        video_path = os.path.abspath(video_path)
+        stat = os.stat(video_path)
+        key = hashlib.sha1(f"{video_path}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8')).hexdigest()
+        return self.folder / f"{key}.pcm"
+
+    def get(self, video_path: str) -> Optional[Path]:
+        """已解碼時返回 PCM 檔路徑"""
+        try:
+            path = self.pcm_path(video_path)
+        except OSError:
+            return None
+        if path.exists():
+            os.utime(path)  # 更新修改時間，供 _trim 判斷最近使用
+            return path
+        return None
+
+    def extract(self, video_path: str) -> Path:
+        """
+        解碼影片音訊（已存在時直接返回）
+
+        Raises:
+            RuntimeError: ffmpeg 不存在或解碼失敗
+        """
+        path = self.pcm_path(video_path)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(path.name, threading.Lock())
+
+        with key_lock:
+            if path.exists():
+                os.utime(path)
+                return path
+
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                completed = subprocess.run(
+                    ['ffmpeg', '-nostdin', '-v', 'error', '-y', '-i', video_path, *FFMPEG_PCM_ARGS, str(tmp_path)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+                )
+            except FileNotFoundError:
+                raise RuntimeError("找不到 ffmpeg，無法預先解碼音訊")
+
+            if completed.returncode != 0:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                raise RuntimeError(completed.stderr.decode('utf-8', 'replace').strip() or "ffmpeg 解碼失敗")
+
+            os.replace(tmp_path, path)
+
+        self._trim(keep=path)
+        return path
+
+    def _trim(self, keep: Path):
+        """超過容量上限時刪除最久未使用的 PCM 檔"""
+        files = []
+        total = 0
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith(".pcm"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+                total += stat.st_size
+
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+
+class AudioPrefetcher:
+    """
+    依處理順序預先解碼後面 lookahead 支影片
+
+    schedule() 設定順序、append() 追加（監看模式陸續加入的影片）；
+    get() 取得某支影片的 PCM 時，會確保其後 lookahead 支也已開始解碼。
+    """
+
+    def __init__(self, store: AudioStore, lookahead: int = 2):
+        self.store = store
+        self.lookahead = max(1, lookahead)
+        self._executor = ThreadPoolExecutor(max_workers=self.lookahead, thread_name_prefix="audio-prefetch")
+        self._lock = threading.Lock()
+        self._order: List[str] = []
+        self._position = -1
+        self._futures: Dict[str, Future] = {}
+
+    @classmethod
+    def from_config(cls, parallel_config: dict) -> Optional['AudioPrefetcher']:
+        """依 parallel 設定建立，audio_prefetch 為 0 或缺少 numpy 時返回 None"""
+        lookahead = parallel_config.get("audio_prefetch", 2)
+        if not lookahead or not NUMPY_AVAILABLE:
+            return None
+        store = AudioStore(
+            parallel_config.get("audio_cache_folder", DEFAULT_AUDIO_FOLDER),
+            parallel_config.get("audio_cache_max_gb", 5.0)
+        )
+        return cls(store, lookahead)
+
+    def schedule(self, video_paths: List[str]):
+        """設定處理順序並開始解碼前 lookahead 支"""
+        with self._lock:
+            self._order = [os.path.abspath(p) for p in video_paths]
+            self._position = -1
+        self._submit_from(0)
+
+    def append(self, video_paths: List[str]):
+        """追加到處理順序尾端；目前處理位置之後不足 lookahead 支時立即開始解碼"""
+        with self._lock:
+            self._order.extend(os.path.abspath(p) for p in video_paths)
+            start = self._position + 1
+        self._submit_from(start)
+
+    def _submit_from(self, start: int):
+        with self._lock:
+            for video_path in self._order[start:start + self.lookahead]:
+                if video_path not in self._futures:
+                    self._futures[video_path] = self._executor.submit(self.store.extract, video_path)
+
+    def get(self, video_path: str) -> Optional[Path]:
+        """
+        取得影片的 PCM 檔（必要時等待或立即解碼），失敗時返回 None（由 Whisper 自行解碼）
+        """
+        video_path = os.path.abspath(video_path)
+        with self._lock:
+            future = self._futures.pop(video_path, None)
+            position = self._order.index(video_path) if video_path in self._order else -1
+            if position >= 0:
+                self._position = position
+        if position >= 0:
+            self._submit_from(position + 1)
+
+        try:
+            if future is not None:
+                return future.result()
+            return self.store.get(video_path) or self.store.extract(video_path)
+        except (OSError, RuntimeError) as e:
+            print(f"   [Warning] 音訊預先解碼失敗，改由 Whisper 解碼: {e}")
+            return None
+
+    def shutdown(self):
+        """停止預先解碼（已開始的 ffmpeg 會執行完畢）"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+草稿批次修改 - 一次對多份剪映草稿套用字幕樣式或尋找 / 取代
+
+- apply_style() / apply_replace() 修改記憶體中的草稿資料（字幕編輯器的單一草稿 API 也使用）
+- run_batch() 以草稿名稱列表或萬用字元（翻譯專案_*）選取草稿，於多個子行程並行處理
+- 尋找 / 取代先以草稿索引過濾，沒有符合文字的草稿不會被讀取
+- dry_run 只回報會改變的內容（每份草稿的欄位前後值與取代前後的字幕），不寫入
+- 寫入使用 write_draft_json（暫存檔 + 原子替換）
+
+命令列:
+    python draft_batch.py --pattern "翻譯專案_*" --font-size 9 --position-y -0.4 --dry-run
+    python draft_batch.py --pattern "翻譯專案_*" --find "人工智能" --replace "人工智慧"
+"""
+
+import os
+import json
+import random
+import fnmatch
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from draft_index import classify_texts, get_draft_index
+from draft_writer import write_draft_json
+
+# text_color_random 時隨機選用的字幕顏色
+COLOR_OPTIONS = ['#FFFFFF', '#ffe759', '#00ff00', '#00d4ff', '#ff6699']
+
+# 樣式修補可用的欄位（與字幕位置編輯器相同）
+STYLE_FIELDS = ("position_y", "font_size", "line_max_width", "background_alpha",
+                "text_color", "text_color_random")
+
+# dry run 每份草稿最多列出幾條取代前後的字幕
+MAX_DIFF_SAMPLES = 20
+
+
+def _hex_to_rgb(hex_color: str) -> list:
+    """#RRGGBB 轉為 0-1 的 RGB"""
+    hex_color = hex_color.lstrip('#')
+    return [int(hex_color[i:i + 2], 16) / 255 for i in (0, 2, 4)]
+
+
+def _track_change(fields: Dict[str, dict], name: str, old, new):
+    if old == new:
+        return
+    change = fields.setdefault(name, {"from": [], "to": new})
+    if old not in change["from"] and len(change["from"]) < 5:
+        change["from"].append(old)
+
+
+def apply_style(draft_data: dict, patch: dict) -> dict:
+    """
+    套用字幕樣式修補（只修改 patch 中有的欄位；跳過標題和 @html_cat）
+
+    Args:
+        draft_data: 草稿資料（直接修改）
+        patch: STYLE_FIELDS 中的任意欄位
+
+    Returns:
+        {"materials": 字幕素材數, "segments": 字幕片段數, "skipped": 跳過的素材數,
+         "changed": 實際改變的素材 + 片段數, "fields": {欄位: {"from": [舊值...], "to": 新值}}}
+    """
+    texts = draft_data.get("materials", {}).get("texts", [])
+    fields: Dict[str, dict] = {}
+    subtitle_ids = set()
+    changed = 0
+    skipped = 0
+
+    color = patch.get("text_color")
+    random_color = patch.get("text_color_random", False)
+    recolor = color is not None or random_color
+
+    for item in classify_texts(draft_data):
+        if item["kind"] != "subtitle":
+            skipped += 1
+            continue
+
+        text = texts[item["index"]]
+        subtitle_ids.add(text.get("id"))
+        before = json.dumps(text, sort_keys=True)
+
+        updates = {}
+        if "font_size" in patch:
+            updates["font_size"] = patch["font_size"]
+        if "line_max_width" in patch:
+            updates["line_max_width"] = patch["line_max_width"]
+        if "background_alpha" in patch:
+            updates["background_alpha"] = patch["background_alpha"]
+            updates["background_style"] = 1 if patch["background_alpha"] > 0 else 0
+            updates["background_color"] = "#000000"
+        current_color = None
+        if recolor:
+            current_color = random.choice(COLOR_OPTIONS) if random_color else color
+            updates["text_color"] = current_color
+
+        for name, value in updates.items():
+            _track_change(fields, name, text.get(name), value)
+            text[name] = value
+
+        # content 中的字號與顏色
+        if "font_size" in patch or recolor:
+            try:
+                content = json.loads(text.get("content", "{}"))
+            except (TypeError, ValueError):
+                content = None
+            if content and "styles" in content:
+                for style in content["styles"]:
+                    if "font_size" in patch:
+                        style["size"] = patch["font_size"]
+                    if recolor:
+                        rgb = _hex_to_rgb(current_color)
+                        if "fill" not in style:
+                            style["fill"] = {"content": {"solid": {"color": rgb}}}
+                        else:
+                            style["fill"]["content"]["solid"]["color"] = rgb
+                text["content"] = json.dumps(content, ensure_ascii=False)
+
+        if json.dumps(text, sort_keys=True) != before:
+            changed += 1
+
+    # 字幕片段的位置
+    segments = 0
+    if "position_y" in patch:
+        for track in draft_data.get("tracks", []):
+            if track.get("type") != "text":
+                continue
+            for segment in track.get("segments", []):
+                if segment.get("material_id") in subtitle_ids:
+                    if "clip" in segment and "transform" in segment["clip"]:
+                        transform = segment["clip"]["transform"]
+                        if transform.get("y") != patch["position_y"]:
+                            _track_change(fields, "position_y", transform.get("y"), patch["position_y"])
+                            changed += 1
+                        transform["y"] = patch["position_y"]
+                        segments += 1
+
+    return {"materials": len(subtitle_ids), "segments": segments, "skipped": skipped,
+            "changed": changed, "fields": fields}
+
+
+def apply_replace(draft_data: dict, find_text: str, replace_text: str,
+                  indexes: Optional[Iterable[int]] = None) -> dict:
+    """
+    取代字幕文字（跳過標題和 @html_cat），並更新 styles 的 range
+
+    Args:
+        indexes: 只檢查這些文字素材（由草稿索引預先找出），None 表示全部
+
+    Returns:
+        {"replaced": 取代的字幕數, "samples": [{"before", "after"}]}
+    """
+    texts = draft_data.get("materials", {}).get("texts", [])
+    if indexes is None:
+        indexes = [item["index"] for item in classify_texts(draft_data) if item["kind"] == "subtitle"]
+
+    replaced = 0
+    samples = []
+    for i in sorted(indexes):
+        if i >= len(texts):
+            continue
+        text = texts[i]
+        try:
+            content_data = json.loads(text.get("content", ""))
+            text_content = content_data.get("text", "")
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if find_text not in text_content:
+            continue
+
+        new_text = text_content.replace(find_text, replace_text)
+        content_data["text"] = new_text
+
+        # 更新 styles 中的 range 以匹配新文字長度
+        for style in content_data.get("styles", []):
+            if "range" in style:
+                style["range"] = [0, len(new_text)]
+
+        text["content"] = json.dumps(content_data, ensure_ascii=False)
+        replaced += 1
+        if len(samples) < MAX_DIFF_SAMPLES:
+            samples.append({"before": text_content, "after": new_text})
+
+    return {"replaced": replaced, "samples": samples}
+
+
+def process_draft(draft_path: str, style: Optional[dict] = None, find_text: Optional[str] = None,
+                  replace_text: str = "", indexes: Optional[List[int]] = None,
+                  dry_run: bool = False) -> dict:
+    """
+    讀取單一草稿、套用修改，有變更且非 dry run 時寫回（子行程執行）
+
+    Returns:
+        {"draft", "changed", "written", "style", "replace"} 或 {"draft", "error"}
+    """
+    name = Path(draft_path).parent.name
+    try:
+        with open(draft_path, 'r', encoding='utf-8') as f:
+            draft_data = json.load(f)
+
+        result = {"draft": name}
+        changed = False
+        if style:
+            result["style"] = apply_style(draft_data, style)
+            changed |= bool(result["style"]["changed"])
+        if find_text:
+            result["replace"] = apply_replace(draft_data, find_text, replace_text, indexes)
+            changed |= bool(result["replace"]["replaced"])
+
+        result["changed"] = changed
+        result["written"] = False
+        if changed and not dry_run:
+            write_draft_json(draft_path, draft_data)
+            result["written"] = True
+        return result
+    except Exception as e:
+        return {"draft": name, "error": f"{type(e).__name__}: {e}"}
+
+
+def select_drafts(draft_root: str, names: Optional[List[str]] = None,
+                  pattern: Optional[str] = None) -> List[str]:
+    """依名稱列表或萬用字元（可用 | 分隔多個）選取草稿，返回存在的草稿名稱"""
+    available = get_draft_index(draft_root).list_drafts()
+    selected = []
+    if names:
+        existing = set(available)
+        selected.extend(name for name in names if name in existing)
+    if pattern:
+        patterns = [p.strip() for p in pattern.split("|") if p.strip()]
+        selected.extend(name for name in available if any(fnmatch.fnmatchcase(name, p) for p in patterns))
+    return list(dict.fromkeys(selected))
+
+
+def run_batch(draft_root: str, names: Optional[List[str]] = None, pattern: Optional[str] = None,
+              style: Optional[dict] = None, find_text: Optional[str] = None, replace_text: str = "",
+              dry_run: bool = False, workers: Optional[int] = None) -> dict:
+    """
+    對選取的草稿套用樣式修補和 / 或尋找取代
+
+    Args:
+        draft_root: 剪映草稿根目錄
+        names / pattern: 草稿名稱列表 / 萬用字元（兩者的聯集）
+        style: 樣式修補（STYLE_FIELDS 的子集）
+        find_text / replace_text: 尋找 / 取代的字幕文字
+        dry_run: 只回報變更，不寫入
+        workers: 子行程數（預設 CPU 數，草稿數少時減少）
+
+    Returns:
+        {"selected", "changed", "written", "skipped", "errors", "dry_run", "drafts": [每份草稿的結果]}
+    """
+    style = {k: v for k, v in (style or {}).items() if k in STYLE_FIELDS}
+    if not style and not find_text:
+        raise ValueError("未指定樣式或尋找文字")
+
+    index = get_draft_index(draft_root)
+    selected = select_drafts(draft_root, names, pattern)
+
+    # 只有尋找 / 取代時，以索引排除沒有符合文字的草稿
+    jobs = []
+    failed = []
+    skipped = 0
+    for name in selected:
+        indexes = None
+        if find_text:
+            try:
+                entry = index.get(name)
+            except (OSError, ValueError) as e:
+                # 損壞或寫入中的草稿只記為該草稿失敗，不中斷整批
+                failed.append({"draft": name, "error": f"{type(e).__name__}: {e}"})
+                continue
+            if entry is None:
+                skipped += 1
+                continue
+            indexes = [item["index"] for item in entry.texts
+                       if item["kind"] == "subtitle" and item["text"] and find_text in item["text"]]
+            if not indexes and not style:
+                skipped += 1
+                continue
+        jobs.append((str(index.draft_path(name)), indexes))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    args = [(path, style, find_text, replace_text, indexes, dry_run) for path, indexes in jobs]
+    if workers == 1 or len(jobs) <= 1:
+        results = [process_draft(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(process_draft, *zip(*args)))
+    results = failed + results
+
+    errors = [r for r in results if "error" in r]
+    return {
+        "selected": len(selected),
+        "changed": sum(1 for r in results if r.get("changed")),
+        "written": sum(1 for r in results if r.get("written")),
+        "skipped": skipped,
+        "errors": len(errors),
+        "dry_run": dry_run,
+        "drafts": results
+    }
+
+
+def print_summary(summary: dict):
+    """印出 run_batch() 的結果"""
+    mode = "[Dry Run] " if summary["dry_run"] else ""
+    print(f"{mode}選取 {summary['selected']} 份草稿，變更 {summary['changed']} 份，"
+          f"寫入 {summary['written']} 份，略過 {summary['skipped']} 份，失敗 {summary['errors']} 份")
+    for result in summary["drafts"]:
+        if "error" in result:
+            print(f"   [Error] {result['draft']}: {result['error']}")
+            continue
+        if not result["changed"]:
+            continue
+        print(f"   {result['draft']}")
+        style = result.get("style")
+        if style:
+            for name, change in style["fields"].items():
+                before = ", ".join(str(v) for v in change["from"])
+                print(f"      {name}: {before} -> {change['to']}")
+            print(f"      改變 {style['changed']} 個字幕素材 / 片段")
+        replace = result.get("replace")
+        if replace and replace["replaced"]:
+            print(f"      取代 {replace['replaced']} 條字幕")
+            for sample in replace["samples"][:3]:
+                print(f"      - {sample['before']}")
+                print(f"      + {sample['after']}")
+
+
+def main():
+    """命令列入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="批次修改剪映草稿的字幕樣式或文字")
+    parser.add_argument("drafts", nargs="*", help="草稿名稱")
+    parser.add_argument("--pattern", "-p", help="草稿名稱萬用字元，例如 \"翻譯專案_*\"（可用 | 分隔多個）")
+    parser.add_argument("--root", help="剪映草稿根目錄（預設從 config.json 讀取）")
+    parser.add_argument("--position-y", type=float, help="字幕垂直位置")
+    parser.add_argument("--font-size", type=float, help="字號")
+    parser.add_argument("--line-max-width", type=float, help="行寬")
+    parser.add_argument("--background-alpha", type=float, help="背景透明度（0 為無背景）")
+    parser.add_argument("--text-color", help="字幕顏色，例如 #FFFFFF")
+    parser.add_argument("--text-color-random", action="store_true", help="每條字幕隨機顏色")
+    parser.add_argument("--find", help="尋找文字")
+    parser.add_argument("--replace", default="", help="取代文字")
+    parser.add_argument("--dry-run", "-n", action="store_true", help="只顯示會改變的內容，不寫入")
+    parser.add_argument("--workers", type=int, help="子行程數（預設 CPU 數）")
+    args = parser.parse_args()
+
+    if not args.drafts and not args.pattern:
+        parser.error("請指定草稿名稱或 --pattern")
+
+    style = {
+        name: getattr(args, name)
+        for name in STYLE_FIELDS
+        if getattr(args, name) not in (None, False)
+    }
+
+    if args.root:
+        draft_root = Path(args.root)
+    else:
+        from subtitle_position_server import get_jianying_draft_root
+        draft_root = get_jianying_draft_root()
+
+    try:
+        summary = run_batch(str(draft_root), args.drafts, args.pattern, style,
+                            args.find, args.replace, args.dry_run, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+        return
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+剪映草稿索引 - 草稿列表與字幕文字的持久快取
+
+- 每份草稿以 (名稱, draft_content.json 大小, 修改時間) 為 key 存放於 SQLite，
+  內容未變更時不需再讀取整份草稿與逐一解析文字素材的 content JSON
+- 草稿列表只在草稿根目錄的修改時間改變（新增 / 刪除 / 重新命名資料夾）時重新掃描；
+  掃描時還沒有 draft_content.json 的資料夾（正在建立的草稿）之後會個別再檢查
+- 伺服器自己寫回草稿後以 update() 直接更新索引，不需重新讀檔
+
+文字素材分類與編輯器一致：內容含 @html_cat 的為浮水印、前 2 個為標題，其餘為字幕。
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_INDEX_PATH = "cache/draft_index.sqlite"
+DRAFT_FILE = "draft_content.json"
+
+# 索引內容格式變更時遞增，舊索引自動失效
+INDEX_VERSION = 1
+
+# 前 N 個（非 @html_cat 的）文字素材視為標題
+TITLE_COUNT = 2
+
+
+def classify_texts(draft_data: dict) -> List[dict]:
+    """
+    解析草稿的文字素材
+
+    Returns:
+        [{"index", "id", "text", "kind"}]；kind 為 html_cat / title / subtitle，
+        content 無法解析時 text 為 None
+    """
+    texts = []
+    for i, material in enumerate(draft_data.get("materials", {}).get("texts", [])):
+        try:
+            text = json.loads(material.get("content", "")).get("text", "")
+        except (TypeError, ValueError, AttributeError):
+            text = None
+
+        if text and "@html_cat" in text:
+            kind = "html_cat"
+        elif i < TITLE_COUNT:
+            kind = "title"
+        else:
+            kind = "subtitle"
+        texts.append({"index": i, "id": material.get("id"), "text": text, "kind": kind})
+    return texts
+
+
+@dataclass
+class DraftEntry:
+    """單一草稿的索引內容"""
+    name: str
+    size: int
+    mtime: int
+    texts: List[dict] = field(default_factory=list)
+
+    @property
+    def subtitles(self) -> List[Optional[str]]:
+        """字幕文字（依素材順序，無法解析的為 None）"""
+        return [item["text"] for item in self.texts if item["kind"] == "subtitle"]
+
+    @property
+    def subtitle_ids(self) -> List[str]:
+        """字幕文字素材的 ID"""
+        return [item["id"] for item in self.texts if item["kind"] == "subtitle"]
+
+
+class DraftIndex:
+    """單一剪映草稿根目錄的索引（多執行緒共用）"""
+
+    def __init__(self, draft_root: str, index_path: Optional[str] = DEFAULT_INDEX_PATH):
+        self.draft_root = Path(draft_root)
+        self._root_key = os.path.abspath(str(self.draft_root))
+        self._lock = threading.Lock()
+        self._entries: Dict[str, DraftEntry] = {}
+        self._listing: Optional[List[str]] = None
+        self._listing_mtime: Optional[int] = None
+        self._pending: List[str] = []
+        self._conn = None
+
+        if index_path:
+            path = Path(index_path)
+            path = path if path.is_absolute() else PROJECT_ROOT / path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS drafts (
+                    root TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    texts TEXT NOT NULL,
+                    PRIMARY KEY (root, name)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS listings (
+                    root TEXT PRIMARY KEY,
+                    mtime INTEGER NOT NULL,
+                    names TEXT NOT NULL,
+                    pending TEXT NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # 草稿列表
+    # ------------------------------------------------------------------
+
+    def _root_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.draft_root).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan(self):
+        """返回 (含草稿檔的資料夾, 尚無草稿檔的資料夾)"""
+        names, pending = [], []
+        with os.scandir(self.draft_root) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if os.path.isfile(os.path.join(entry.path, DRAFT_FILE)):
+                        names.append(entry.name)
+                    else:
+                        pending.append(entry.name)
+        return sorted(names), pending
+
+    def _cached_listing(self, mtime: int) -> Optional[List[str]]:
+        with self._lock:
+            if (self._listing is None or self._listing_mtime != mtime) and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT names, pending FROM listings WHERE root = ? AND mtime = ?", (self._root_key, mtime)
+                ).fetchone()
+                if row is not None:
+                    self._listing, self._pending = json.loads(row[0]), json.loads(row[1])
+                    self._listing_mtime = mtime
+            if self._listing is None or self._listing_mtime != mtime:
+                return None
+            listing, pending = list(self._listing), list(self._pending)
+
+        if any(os.path.isfile(self.draft_path(name)) for name in pending):
+            return None
+        return listing
+
+    def list_drafts(self) -> List[str]:
+        """草稿根目錄中含 draft_content.json 的資料夾名稱（依名稱排序）"""
+        mtime = self._root_mtime()
+        if mtime is None:
+            return []
+
+        listing = self._cached_listing(mtime)
+        if listing is not None:
+            return listing
+
+        names, pending = self._scan()
+        with self._lock:
+            self._listing, self._pending, self._listing_mtime = names, pending, mtime
+            self._forget_missing(names)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO listings (root, mtime, names, pending) VALUES (?, ?, ?, ?)",
+                    (self._root_key, mtime, json.dumps(names, ensure_ascii=False),
+                     json.dumps(pending, ensure_ascii=False))
+                )
+                self._conn.commit()
+        return list(names)
+
+    def _forget_missing(self, names: List[str]):
+        """刪除已不存在的草稿索引（呼叫端持有鎖）"""
+        existing = set(names)
+        for name in [n for n in self._entries if n not in existing]:
+            del self._entries[name]
+        if self._conn is None:
+            return
+        rows = self._conn.execute("SELECT name FROM drafts WHERE root = ?", (self._root_key,)).fetchall()
+        stale = [(self._root_key, name) for (name,) in rows if name not in existing]
+        if stale:
+            self._conn.executemany("DELETE FROM drafts WHERE root = ? AND name = ?", stale)
+
+    # ------------------------------------------------------------------
+    # 單一草稿
+    # ------------------------------------------------------------------
+
+    def draft_path(self, name: str) -> Path:
+        return self.draft_root / name / DRAFT_FILE
+
+    def _cached(self, name: str, size: int, mtime: int) -> Optional[DraftEntry]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.size == size and entry.mtime == mtime:
+                return entry
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT texts FROM drafts WHERE root = ? AND name = ? AND size = ? AND mtime = ? AND version = ?",
+                (self._root_key, name, size, mtime, INDEX_VERSION)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = DraftEntry(name, size, mtime, json.loads(row[0]))
+            self._entries[name] = entry
+            return entry
+
+    def _store(self, entry: DraftEntry):
+        with self._lock:
+            self._entries[entry.name] = entry
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO drafts (root, name, size, mtime, version, texts) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._root_key, entry.name, entry.size, entry.mtime, INDEX_VERSION,
+                     json.dumps(entry.texts, ensure_ascii=False))
+                )
+                self._conn.commit()
+
+    def get(self, name: str) -> Optional[DraftEntry]:
+        """
+        取得草稿的索引內容（檔案變更時重新解析），草稿不存在時返回 None
+
+        Raises:
+            ValueError: draft_content.json 無法解析
+        """
+        path = self.draft_path(name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        cached = self._cached(name, stat.st_size, stat.st_mtime_ns)
+        if cached is not None:
+            return cached
+
+        with open(path, 'r', encoding='utf-8') as f:
+            draft_data = json.load(f)
+        entry = DraftEntry(name, stat.st_size, stat.st_mtime_ns, classify_texts(draft_data))
+        self._store(entry)
+        return entry
+
+    def update(self, name: str, draft_data: dict) -> Optional[DraftEntry]:
+        """已將 draft_data 寫入草稿後呼叫，以記憶體中的內容更新索引"""
+        try:
+            stat = os.stat(self.draft_path(name))
+        except OSError:
+            return None
+        entry = DraftEntry(name, stat.st_size, stat.st_mtime_ns, classify_texts(draft_data))
+        self._store(entry)
+        return entry
+
+
+_indexes: Dict[str, DraftIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_draft_index(draft_root: str) -> DraftIndex:
+    """取得此行程中某草稿根目錄共用的索引（儲存於 cache/draft_index.sqlite）"""
+    key = os.path.abspath(str(draft_root))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = DraftIndex(key)
+        return index
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+剪映草稿 JSON 的串流寫入
+
+- draft_content.json 依頂層欄位、素材列表與軌道片段逐一編碼寫出，不在記憶體中組出整份 JSON 字串
+- 寫入暫存檔後原子替換，中途當機不會留下寫了一半的草稿
+- 輸出與 json.dumps(content, ensure_ascii=False, indent=indent) 逐位元組一致
+- 只使用標準函式庫：編輯器與 pyJianYingDraft 的 ScriptFile.dump() 共用，
+  匯入時不會載入 pyJianYingDraft 套件（及其 Windows 專用的相依套件）
+"""
+
+import os
+import json
+import threading
+
+from typing import Any, Dict, Iterator, Optional
+
+_BUFFER_SIZE = 1024 * 1024
+
+
+def _encode(value: Any, indent: Optional[int], level: int) -> str:
+    """整體編碼一個值，並將縮排調整到第 level 層"""
+    if indent is None:
+        return json.dumps(value, ensure_ascii=False)
+    text = json.dumps(value, ensure_ascii=False, indent=indent)
+    if level == 0 or "\n" not in text:
+        return text
+    # JSON 字串內的換行都已跳脫，可以直接取代
+    return text.replace("\n", "\n" + " " * (indent * level))
+
+
+def _iter_value(value: Any, indent: Optional[int], level: int) -> Iterator[str]:
+    """
+    逐塊編碼：第 0~2 層的字典與第 0~3 層的列表逐項展開，更深的值整體編碼
+
+    對草稿而言，即頂層欄位、materials 各類素材列表、tracks 與其 segments 列表被展開，
+    單一素材與單一片段整體編碼。
+    """
+    if isinstance(value, dict) and value and level <= 2:
+        items = value.items()
+        opener, closer = "{", "}"
+    elif isinstance(value, list) and value and level <= 3:
+        items = None
+        opener, closer = "[", "]"
+    else:
+        yield _encode(value, indent, level)
+        return
+
+    if indent is None:
+        separator, prefix, suffix = ", ", "", ""
+    else:
+        separator = ","
+        prefix = "\n" + " " * (indent * (level + 1))
+        suffix = "\n" + " " * (indent * level)
+
+    yield opener
+    first = True
+    if items is not None:
+        for key, item in items:
+            yield (prefix if first else separator + prefix) + json.dumps(str(key), ensure_ascii=False) + ": "
+            yield from _iter_value(item, indent, level + 1)
+            first = False
+    else:
+        for item in value:
+            yield prefix if first else separator + prefix
+            yield from _iter_value(item, indent, level + 1)
+            first = False
+    yield suffix + closer
+
+
+def iter_draft_json(content: Dict[str, Any], indent: Optional[int] = None) -> Iterator[str]:
+    """逐塊產生草稿內容的 JSON 文字"""
+    return _iter_value(content, indent, 0)
+
+
+def write_draft_json(file_path: str, content: Dict[str, Any], indent: Optional[int] = None) -> None:
+    """
+    串流寫入草稿 JSON，寫完後原子替換目標檔案
+
+    Args:
+        file_path: 目標檔案路徑，通常為 draft_content.json
+        content: 草稿內容
+        indent: 縮排空格數，預設不縮排
+    """
+    file_path = os.fspath(file_path)
+    directory, name = os.path.split(os.path.abspath(file_path))
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        with open(tmp_path, "w", encoding="utf-8", buffering=_BUFFER_SIZE) as f:
+            for chunk in iter_draft_json(content, indent):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
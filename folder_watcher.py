@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+資料夾監看 - 偵測新放入且已寫入完成的影片
+
+- Linux 使用 inotify（透過 libc，不需額外套件）得知檔案變動；其他平台或 inotify 無法使用時定期掃描
+- 使用 inotify 時仍每 poll_interval 秒做一次完整掃描，事件佇列溢位（IN_Q_OVERFLOW）時立即重新掃描
+- 檔案大小與修改時間持續 settle_seconds 秒不變才視為寫入完成（複製 / 上傳中的檔案不會被提早處理）
+- 啟動時資料夾內已存在的影片也會產出一次（已放置超過 settle_seconds 的不需等待）；之後同一檔案內容改變（大小或修改時間不同）會再次產出
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# inotify 事件（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """最小的 inotify 包裝：監看單一資料夾，返回 (事件 mask, 檔名)"""
+
+    def __init__(self, folder: str):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+        if libc.inotify_add_watch(self._fd, os.fsencode(folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed: {folder}")
+
+    def read(self, timeout: float) -> Iterator[Tuple[int, str]]:
+        """等待最多 timeout 秒，產出 (事件 mask, 檔名)；IN_Q_OVERFLOW 等不帶檔名的事件檔名為空字串"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            yield mask, os.fsdecode(name)
+
+    def close(self):
+        os.close(self._fd)
+
+
+class FolderWatcher:
+    """監看資料夾中指定副檔名的檔案，產出寫入完成的路徑"""
+
+    def __init__(self, folder: str, extensions: Iterable[str] = (".mp4", ".avi", ".mov", ".mkv"),
+                 settle_seconds: float = 5.0, poll_interval: float = 2.0, use_inotify: bool = True):
+        self.folder = Path(folder)
+        self.extensions = {ext.lower() for ext in extensions}
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+
+        # 路徑 -> (大小, 修改時間, 開始穩定的時間)
+        self._candidates: Dict[str, Tuple[int, int, float]] = {}
+        # 已產出的路徑 -> (大小, 修改時間)
+        self._emitted: Dict[str, Tuple[int, int]] = {}
+        self._stop = threading.Event()
+
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(str(self.folder))
+            except (OSError, AttributeError) as e:
+                print(f"[Watch] inotify 無法使用，改為定期掃描: {e}")
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+
+    def _accepts(self, name: str) -> bool:
+        return not name.startswith(".") and Path(name).suffix.lower() in self.extensions
+
+    def _observe(self, path: str, now: float, initial: bool = False):
+        """
+        更新候選檔案的大小 / 修改時間；改變時重新計算穩定時間
+
+        穩定時間從第一次看到（或看到改變）時起算：複製工具常保留來源的修改時間，
+        不能以 mtime 判斷是否已寫入完成。只有啟動時的初次掃描（initial）以修改時間起算，
+        讓已放置許久的舊檔不必再等待。
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._candidates.pop(path, None)
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if self._emitted.get(path) == signature:
+            self._candidates.pop(path, None)
+            return
+        previous = self._candidates.get(path)
+        if previous is None or previous[:2] != signature:
+            since = min(now, stat.st_mtime) if initial and previous is None else now
+            self._candidates[path] = (*signature, since)
+
+    def _scan(self, now: float, initial: bool = False):
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_file() and self._accepts(entry.name):
+                self._observe(entry.path, now, initial)
+
+    def _ready(self, now: float) -> list:
+        """穩定超過 settle_seconds 的候選檔案（依放入順序）"""
+        ready = []
+        for path, (size, mtime, since) in list(self._candidates.items()):
+            self._observe(path, now)
+            current = self._candidates.get(path)
+            if current is None or current[2] != since or size == 0:
+                continue
+            if now - since >= self.settle_seconds:
+                del self._candidates[path]
+                self._emitted[path] = (size, mtime)
+                ready.append((since, path))
+        return [path for _, path in sorted(ready)]
+
+    def watch(self) -> Iterator[str]:
+        """持續產出寫入完成的檔案路徑，直到 stop() 被呼叫"""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        last_scan = 0.0
+        tick = min(self.poll_interval, max(0.2, self.settle_seconds / 2))
+
+        while not self._stop.is_set():
+            now = time.time()
+            # inotify 模式也定期完整掃描，補上漏掉的事件（例如監看建立前的變動）
+            if now - last_scan >= self.poll_interval:
+                self._scan(now, initial=not last_scan)
+                last_scan = now
+            if self._inotify is None:
+                self._stop.wait(tick)
+            else:
+                timeout = tick if self._candidates else min(1.0, self.poll_interval)
+                for mask, name in self._inotify.read(timeout):
+                    if mask & IN_Q_OVERFLOW:
+                        # 事件佇列溢位：有事件被丟棄，只能重新掃描整個資料夾
+                        print("[Watch] inotify 事件佇列溢位，重新掃描資料夾")
+                        self._scan(time.time())
+                        last_scan = time.time()
+                    elif name and self._accepts(name):
+                        self._observe(str(self.folder / name), time.time())
+
+            for path in self._ready(time.time()):
+                yield path
+
+    def stop(self):
+        """停止監看（watch() 會在下一次檢查時結束）"""
+        self._stop.set()
+
+    def close(self):
+        self.stop()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -29,6 +29,7 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 from gui.utils.theme import COLORS
 from gui.utils.config_manager import ConfigManager
+from media_probe import get_media_probe
 
 
 class VideoItem(ctk.CTkFrame):
@@ -56,20 +57,14 @@ class VideoItem(ctk.CTkFrame):
         except:
             return "N/A"
 
-    def _get_duration(self) -> str:
-        """取得影片長度 (使用 ffprobe)"""
-        try:
-            result = subprocess.run(
-                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                 '-of', 'default=noprint_wrappers=1:nokey=1', self.video_path],
-                capture_output=True, text=True, timeout=5
-            )
-            duration = float(result.stdout.strip())
-            mins = int(duration // 60)
-            secs = int(duration % 60)
-            return f"{mins}:{secs:02d}"
-        except:
+    @staticmethod
+    def format_duration(duration: Optional[float]) -> str:
+        """格式化影片長度（秒）"""
+        if not duration:
             return "--:--"
+        mins = int(duration // 60)
+        secs = int(duration % 60)
+        return f"{mins}:{secs:02d}"
 
     def _setup_ui(self):
         """建立 UI"""
@@ -116,13 +111,9 @@ class VideoItem(ctk.CTkFrame):
         )
         self.duration_label.pack(side="left")
 
-        # 背景載入時長
-        threading.Thread(target=self._load_duration, daemon=True).start()
-
-    def _load_duration(self):
-        """背景載入影片時長"""
-        duration = self._get_duration()
-        self.after(0, lambda: self.duration_label.configure(text=duration))
+    def set_duration(self, text: str):
+        """更新時長顯示（需在 UI 執行緒呼叫）"""
+        self.duration_label.configure(text=text)
 
     def _on_click(self, event=None):
         """點擊事件"""
@@ -164,8 +155,11 @@ class VideoPlayer:
             if not self.cap.isOpened():
                 return False
 
-            self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+            # 幀數與幀率優先使用媒體探測快取，沒有時才向 OpenCV 查詢
+            probe = get_media_probe().try_probe(video_path)
+            video_info = (probe.video if probe else None) or {}
+            self.total_frames = video_info.get("frame_count") or int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.fps = video_info.get("fps") or self.cap.get(cv2.CAP_PROP_FPS) or 30
             self.current_frame = 0
 
             # 顯示第一幀
@@ -662,12 +656,32 @@ class VideoManagerPanel(ctk.CTkFrame):
             item.pack(fill="x", pady=2, padx=5)
             self.video_items.append(item)
 
+        # 背景批次載入時長（並行探測，已快取的檔案不再探測）
+        threading.Thread(
+            target=self._load_durations, args=(list(self.video_items),), daemon=True
+        ).start()
+
         # 更新計數
         self.count_label.configure(text=f"{len(video_files)} 個影片")
 
         # 重置右側面板
         self._reset_right_panel()
 
+    def _load_durations(self, items: List[VideoItem]):
+        """背景探測影片時長，完成後一次更新列表"""
+        probes = get_media_probe().probe_many([item.video_path for item in items])
+        durations = [
+            (item, VideoItem.format_duration(probes[item.video_path].duration if probes[item.video_path] else None))
+            for item in items
+        ]
+
+        def apply():
+            for item, text in durations:
+                if item.winfo_exists():
+                    item.set_duration(text)
+
+        self.after(0, apply)
+
     def _on_video_select(self, item: VideoItem):
         """選中影片"""
         # 停止當前播放
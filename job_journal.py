@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+批次工作日誌 - 記錄每支影片的階段轉換與產出，中斷後重新執行時從最後完成的階段繼續
+
+- SQLite（WAL）只追加事件，不修改舊紀錄：(影片, 階段, 狀態, 產出, 細節, 時間)
+- 階段：transcribe / translate / draft；狀態：done / partial / failed / reset
+- 轉錄結果與翻譯進度另存為檢查點 JSON（cache/journal），翻譯中途中斷也只需補翻未完成的字幕
+- 影片大小或修改時間改變時舊紀錄自動失效；--force 以 reset 事件讓舊紀錄失效
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_JOURNAL_PATH = "cache/job_journal.sqlite"
+
+# 可作為續跑起點的狀態
+RESUMABLE_STATUS = ("done", "partial")
+
+
+class JobJournal:
+    """只追加的工作日誌（多執行緒共用同一連線，以鎖保護）"""
+
+    def __init__(self, db_path: str = DEFAULT_JOURNAL_PATH):
+        path = Path(db_path)
+        self.db_path = path if path.is_absolute() else PROJECT_ROOT / path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_folder = self.db_path.parent / "journal"
+        self.checkpoint_folder.mkdir(parents=True, exist_ok=True)
+        self.run_id = uuid.uuid4().hex[:12]
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                video_path TEXT NOT NULL,
+                size INTEGER,
+                mtime INTEGER,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                artifact TEXT,
+                detail TEXT,
+                at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS events_video ON events (video_path, id)")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, parallel_config: dict) -> Optional['JobJournal']:
+        """依 parallel.journal 設定建立，停用時返回 None"""
+        config = parallel_config.get("journal", {})
+        if not config.get("enabled", True):
+            return None
+        return cls(config.get("path", DEFAULT_JOURNAL_PATH))
+
+    @staticmethod
+    def _signature(video_path: str) -> tuple:
+        try:
+            stat = os.stat(video_path)
+        except OSError:
+            return None, None
+        return stat.st_size, stat.st_mtime_ns
+
+    # ------------------------------------------------------------------
+    # 事件
+    # ------------------------------------------------------------------
+
+    def record(self, video_path: str, stage: str, status: str,
+               artifact: Optional[str] = None, detail: Optional[dict] = None):
+        """追加一筆事件"""
+        video_path = os.path.abspath(video_path)
+        size, mtime = self._signature(video_path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO events (run_id, video_path, size, mtime, stage, status, artifact, detail, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, video_path, size, mtime, stage, status,
+                 str(artifact) if artifact is not None else None,
+                 json.dumps(detail, ensure_ascii=False) if detail else None,
+                 time.time())
+            )
+            self._conn.commit()
+
+    def reset(self, video_paths: Iterable[str]):
+        """讓這些影片的既有紀錄失效（強制重新處理）"""
+        for video_path in video_paths:
+            self.record(video_path, "all", "reset")
+
+    def resume_points(self, video_paths: Iterable[str]) -> Dict[str, dict]:
+        """
+        各影片可續跑的最後階段
+
+        Returns:
+            {呼叫端傳入的路徑: {"stage", "status", "artifact", "detail"}}，
+            沒有可用紀錄（從未處理、已 reset、影片已變更）的影片不會出現
+        """
+        points = {}
+        with self._lock:
+            for video_path in video_paths:
+                absolute = os.path.abspath(video_path)
+                row = self._conn.execute(
+                    "SELECT stage, status, artifact, detail, size, mtime FROM events "
+                    "WHERE video_path = ? AND status IN ('done', 'partial', 'reset') "
+                    "ORDER BY id DESC LIMIT 1",
+                    (absolute,)
+                ).fetchone()
+                if row is None or row[1] == "reset":
+                    continue
+                stage, status, artifact, detail, size, mtime = row
+                if (size, mtime) != self._signature(absolute):
+                    continue
+                points[video_path] = {
+                    "stage": stage,
+                    "status": status,
+                    "artifact": artifact,
+                    "detail": json.loads(detail) if detail else {}
+                }
+        return points
+
+    def history(self, video_path: str) -> List[dict]:
+        """單一影片的所有事件（舊到新）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, stage, status, artifact, detail, at FROM events WHERE video_path = ? ORDER BY id",
+                (os.path.abspath(video_path),)
+            ).fetchall()
+        return [
+            {"run_id": run_id, "stage": stage, "status": status, "artifact": artifact,
+             "detail": json.loads(detail) if detail else {}, "at": at}
+            for run_id, stage, status, artifact, detail, at in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # 檢查點
+    # ------------------------------------------------------------------
+
+    def checkpoint_path(self, video_path: str) -> Path:
+        key = hashlib.sha1(os.path.abspath(video_path).encode("utf-8")).hexdigest()
+        return self.checkpoint_folder / f"{key}.json"
+
+    def write_checkpoint(self, video_path: str, entries: List[dict]) -> Path:
+        """寫入字幕檢查點（暫存檔 + 原子替換），返回檔案路徑"""
+        path = self.checkpoint_path(video_path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def load_checkpoint(path: str) -> Optional[List[dict]]:
+        """讀取檢查點，不存在或損毀時返回 None"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
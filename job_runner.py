@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+背景工作管理 - 在背景執行長時間的批次，並以事件串流回報進度
+
+- JobManager.start() 立即返回工作 ID；工作依序在背景執行緒執行（同時只跑一個，其餘排隊）
+- 每個工作保留一串事件（狀態、各影片的階段轉換、輸出行），以遞增 ID 供 SSE / 輪詢續讀
+- cancel() 設定工作的 cancel_event，由工作本身在階段之間停止；排隊中的工作直接取消
+- 工作執行期間 stdout 同時寫入主控台與工作的 log 事件（HTTP 執行緒的輸出除外）
+"""
+
+import sys
+import time
+import uuid
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 每個工作保留的事件數上限（較舊的事件會被捨棄，續讀時從最舊的一筆開始）
+DEFAULT_MAX_EVENTS = 5000
+
+# 結束後保留的工作數
+DEFAULT_KEEP_FINISHED = 20
+
+FINISHED_STATUS = ("completed", "failed", "cancelled")
+
+
+class Job:
+    """單一背景工作的狀態與事件"""
+
+    def __init__(self, name: str, max_events: int = DEFAULT_MAX_EVENTS):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.cancel_event = threading.Event()
+
+        # 各階段計數 {stage: {status: n}} 與各影片最新狀態
+        self.stages: Dict[str, Dict[str, int]] = {}
+        self.videos: Dict[str, dict] = {}
+
+        self._events: deque = deque(maxlen=max_events)
+        self._next_id = 1
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUS
+
+    def emit(self, event_type: str, **data):
+        """追加一筆事件並喚醒等待中的串流"""
+        with self._cond:
+            event = {"id": self._next_id, "type": event_type, "t": round(time.time() - self.created_at, 3), **data}
+            self._next_id += 1
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def on_video_event(self, event: dict):
+        """TranscriptionPipeline / batch_process 的進度回呼：更新計數後轉為 video 事件"""
+        video, stage, status = event.get("video"), event.get("stage"), event.get("status")
+        with self._cond:
+            if stage and status:
+                counts = self.stages.setdefault(stage, {})
+                counts[status] = counts.get(status, 0) + 1
+            if video:
+                self.videos[video] = {k: v for k, v in event.items() if k not in ("video", "stats")}
+        self.emit("video", **event)
+
+    def log(self, line: str):
+        self.emit("log", line=line)
+
+    def set_status(self, status: str, **data):
+        with self._cond:
+            self.status = status
+            if status == "running":
+                self.started_at = time.time()
+            elif status in FINISHED_STATUS:
+                self.finished_at = time.time()
+        self.emit("status", status=status, **data)
+
+    def events_since(self, since: int = 0, timeout: Optional[float] = None) -> Tuple[List[dict], bool]:
+        """
+        取得 ID 大於 since 的事件；沒有新事件時最多等待 timeout 秒
+
+        Returns:
+            (事件列表, 工作是否已結束)
+        """
+        with self._cond:
+            if timeout and not self.finished and (not self._events or self._events[-1]["id"] <= since):
+                self._cond.wait(timeout)
+            events = [event for event in self._events if event["id"] > since]
+            return events, self.finished
+
+    def summary(self) -> dict:
+        with self._cond:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "result": self.result,
+                "stages": {stage: dict(counts) for stage, counts in self.stages.items()},
+                "videos": {video: dict(state) for video, state in self.videos.items()},
+                "last_event_id": self._next_id - 1
+            }
+
+
+class _JobOutput:
+    """工作執行期間取代 sys.stdout：照常輸出到主控台，並把完整的行轉為工作的 log 事件"""
+
+    def __init__(self, job: Job, stream):
+        self.job = job
+        self.stream = stream
+        self._partial: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        self.stream.write(text)
+        # HTTP 請求日誌與工作無關
+        if threading.current_thread().name.startswith("http-worker"):
+            return len(text)
+        ident = threading.get_ident()
+        with self._lock:
+            buffered = self._partial.pop(ident, "") + text
+            *lines, rest = buffered.split("\n")
+            if rest:
+                self._partial[ident] = rest
+        for line in lines:
+            line = line.rstrip("\r")
+            if line.strip():
+                self.job.log(line)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class JobManager:
+    """依序執行背景工作，保留最近的工作與事件"""
+
+    def __init__(self, keep_finished: int = DEFAULT_KEEP_FINISHED, max_events: int = DEFAULT_MAX_EVENTS):
+        self.keep_finished = keep_finished
+        self.max_events = max_events
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-runner")
+
+    def start(self, name: str, target: Callable[[Job], Any]) -> Job:
+        """
+        排入背景工作，立即返回
+
+        Args:
+            name: 顯示用名稱
+            target: target(job)，返回值存為 job.result；應定期檢查 job.cancel_event
+        """
+        job = Job(name, self.max_events)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.emit("status", status="queued")
+        self._executor.submit(self._run, job, target)
+        return job
+
+    def _run(self, job: Job, target: Callable[[Job], Any]):
+        if job.cancel_event.is_set():
+            if not job.finished:
+                job.set_status("cancelled")
+            return
+
+        job.set_status("running")
+        original = sys.stdout
+        sys.stdout = _JobOutput(job, original)
+        try:
+            job.result = target(job)
+            job.set_status("cancelled" if job.cancel_event.is_set() else "completed", result=job.result)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.log(traceback.format_exc())
+            job.set_status("failed", error=job.error)
+        finally:
+            sys.stdout = original
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda j: j.created_at)[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+        return [job.summary() for job in jobs]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """要求取消工作（執行中的工作在目前階段結束後停止）"""
+        job = self.get(job_id)
+        if job is None or job.finished or job.cancel_event.is_set():
+            return job
+        job.cancel_event.set()
+        job.set_status("cancelled" if job.status == "queued" else "cancelling")
+        return job
+
+    def shutdown(self):
+        """取消所有工作並等待執行中的工作結束"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self.cancel(job.id)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+媒體探測服務 - 影片 / 音訊 / 圖片的時長、尺寸與軌道資訊
+
+- 以 (路徑, 大小, 修改時間) 為 key 持久快取於 SQLite，檔案未變更時不再探測
+- 優先使用 pymediainfo（與 pyJianYingDraft 相同的數值），未安裝時改用 ffprobe
+- probe_many() 以執行緒池並行探測未命中的檔案（兩種後端都不佔用 GIL）
+
+使用者: pyJianYingDraft 的 VideoMaterial / AudioMaterial、GUI 影片列表與播放器、
+TranscriptionPipeline 的長影片優先排程。
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import subprocess
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+try:
+    import pymediainfo
+    PYMEDIAINFO_AVAILABLE = True
+except ImportError:
+    PYMEDIAINFO_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_CACHE_PATH = "cache/media_probe.sqlite"
+
+# 結果格式變更時遞增，舊快取自動失效
+PROBE_VERSION = 1
+
+# ffprobe 以 video stream 表示的圖片格式
+IMAGE_CODECS = {"png", "mjpeg", "bmp", "webp", "tiff", "gif", "jpeg2000"}
+
+
+@dataclass
+class ProbeResult:
+    """
+    探測結果
+
+    時長單位與 pymediainfo 相同為毫秒；沒有該類型軌道時對應欄位為 None。
+    """
+    path: str
+    size: int
+    mtime: int
+    backend: str
+    duration_ms: Optional[float] = None       # 容器（general）時長
+    video: Optional[dict] = None              # duration_ms, width, height, fps, frame_count, codec
+    image: Optional[dict] = None              # width, height
+    audio: Optional[dict] = None              # duration_ms, codec, sample_rate, channels
+
+    @property
+    def duration(self) -> Optional[float]:
+        """時長（秒）：容器時長，沒有時使用影片或音訊軌道時長"""
+        for value in (self.duration_ms,
+                      (self.video or {}).get("duration_ms"),
+                      (self.audio or {}).get("duration_ms")):
+            if value:
+                return value / 1000
+        return None
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _parse_frame_rate(value) -> Optional[float]:
+    """解析 "30000/1001" 或 "29.970" 格式的幀率"""
+    if not value:
+        return None
+    if isinstance(value, str) and "/" in value:
+        num, _, den = value.partition("/")
+        num, den = _to_float(num), _to_float(den)
+        return num / den if num and den else None
+    return _to_float(value)
+
+
+def _probe_with_mediainfo(path: str) -> dict:
+    info = pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})
+    result = {"backend": "pymediainfo"}
+
+    if info.general_tracks:
+        result["duration_ms"] = _to_float(info.general_tracks[0].duration)
+    if info.video_tracks:
+        track = info.video_tracks[0]
+        result["video"] = {
+            "duration_ms": _to_float(track.duration),
+            "width": track.width,
+            "height": track.height,
+            "fps": _parse_frame_rate(track.frame_rate),
+            "frame_count": _to_int(track.frame_count),
+            "codec": track.format
+        }
+    if info.image_tracks:
+        track = info.image_tracks[0]
+        result["image"] = {"width": track.width, "height": track.height}
+    if info.audio_tracks:
+        track = info.audio_tracks[0]
+        result["audio"] = {
+            "duration_ms": _to_float(track.duration),
+            "codec": track.format,
+            "sample_rate": _to_int(track.sampling_rate),
+            "channels": _to_int(track.channel_s)
+        }
+    return result
+
+
+def _probe_with_ffprobe(path: str) -> dict:
+    completed = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_format', '-show_streams', '-of', 'json', path],
+        capture_output=True, text=True, timeout=30
+    )
+    if completed.returncode != 0:
+        raise ValueError(completed.stderr.strip() or f"ffprobe 失敗: {path}")
+
+    data = json.loads(completed.stdout or "{}")
+    fmt = data.get("format", {})
+    format_duration = _to_float(fmt.get("duration"))
+    result = {"backend": "ffprobe", "duration_ms": format_duration * 1000 if format_duration else None}
+
+    for stream in data.get("streams", []):
+        codec_type = stream.get("codec_type")
+        stream_duration = _to_float(stream.get("duration")) or format_duration
+        if codec_type == "video" and "video" not in result and "image" not in result:
+            if stream.get("disposition", {}).get("attached_pic"):
+                continue
+            is_image = stream.get("codec_name") in IMAGE_CODECS and not stream_duration
+            if is_image or "image2" in fmt.get("format_name", "") or fmt.get("format_name", "").endswith("_pipe"):
+                result["image"] = {"width": stream.get("width"), "height": stream.get("height")}
+            else:
+                result["video"] = {
+                    "duration_ms": stream_duration * 1000 if stream_duration else None,
+                    "width": stream.get("width"),
+                    "height": stream.get("height"),
+                    "fps": _parse_frame_rate(stream.get("avg_frame_rate")),
+                    "frame_count": _to_int(stream.get("nb_frames")),
+                    "codec": stream.get("codec_name")
+                }
+        elif codec_type == "audio" and "audio" not in result:
+            result["audio"] = {
+                "duration_ms": stream_duration * 1000 if stream_duration else None,
+                "codec": stream.get("codec_name"),
+                "sample_rate": _to_int(stream.get("sample_rate")),
+                "channels": stream.get("channels")
+            }
+    return result
+
+
+class MediaProbe:
+    """帶持久快取的媒體探測服務（多執行緒共用）"""
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE_PATH, max_workers: int = 8):
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._memory: Dict[str, ProbeResult] = {}
+        self._conn = None
+
+        if cache_path:
+            path = Path(cache_path)
+            path = path if path.is_absolute() else PROJECT_ROOT / path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS probes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # 快取
+    # ------------------------------------------------------------------
+
+    def _cached(self, path: str, size: int, mtime: int) -> Optional[ProbeResult]:
+        with self._lock:
+            result = self._memory.get(path)
+            if result is not None and result.size == size and result.mtime == mtime:
+                return result
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT data FROM probes WHERE path = ? AND size = ? AND mtime = ? AND version = ?",
+                (path, size, mtime, PROBE_VERSION)
+            ).fetchone()
+            if row is None:
+                return None
+            result = ProbeResult(**json.loads(row[0]))
+            self._memory[path] = result
+            return result
+
+    def _store(self, result: ProbeResult):
+        with self._lock:
+            self._memory[result.path] = result
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO probes (path, size, mtime, version, data) VALUES (?, ?, ?, ?, ?)",
+                    (result.path, result.size, result.mtime, PROBE_VERSION,
+                     json.dumps(asdict(result), ensure_ascii=False))
+                )
+                self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # 探測
+    # ------------------------------------------------------------------
+
+    def probe(self, path: str) -> ProbeResult:
+        """
+        探測單一檔案
+
+        Raises:
+            FileNotFoundError: 檔案不存在
+            ValueError: 無法解析（沒有可用的後端或格式不支援）
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        cached = self._cached(path, stat.st_size, stat.st_mtime_ns)
+        if cached is not None:
+            return cached
+
+        if PYMEDIAINFO_AVAILABLE and pymediainfo.MediaInfo.can_parse():
+            data = _probe_with_mediainfo(path)
+        else:
+            try:
+                data = _probe_with_ffprobe(path)
+            except FileNotFoundError:
+                raise ValueError("沒有可用的媒體探測工具（請安裝 pymediainfo 或 ffprobe）")
+            except (subprocess.SubprocessError, json.JSONDecodeError) as e:
+                raise ValueError(f"無法解析媒體檔案 {path}: {e}")
+
+        result = ProbeResult(path=path, size=stat.st_size, mtime=stat.st_mtime_ns, **data)
+        self._store(result)
+        return result
+
+    def try_probe(self, path: str) -> Optional[ProbeResult]:
+        """探測單一檔案，失敗時返回 None"""
+        try:
+            return self.probe(path)
+        except (OSError, ValueError):
+            return None
+
+    def probe_many(self, paths: Iterable[str]) -> Dict[str, Optional[ProbeResult]]:
+        """
+        並行探測多個檔案
+
+        Returns:
+            {呼叫端傳入的路徑: 結果}，無法探測的檔案為 None
+        """
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return {}
+        workers = min(self.max_workers, len(paths))
+        if workers == 1:
+            return {p: self.try_probe(p) for p in paths}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media-probe") as executor:
+            return dict(zip(paths, executor.map(self.try_probe, paths)))
+
+
+_default_probe: Optional[MediaProbe] = None
+_default_lock = threading.Lock()
+
+
+def get_media_probe() -> MediaProbe:
+    """取得此行程共用的媒體探測服務（快取位於 cache/media_probe.sqlite）"""
+    global _default_probe
+    with _default_lock:
+        if _default_probe is None:
+            _default_probe = MediaProbe()
+        return _default_probe
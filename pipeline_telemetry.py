@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline 遙測 - 每支影片各階段的耗時、佇列深度與 worker 使用率
+
+- span(): 量測一段工作（解碼、推論、翻譯、草稿建置、寫檔），巢狀 span 只記錄不重複計入忙碌時間
+- record(): 補記已知起訖的時間（佇列等待、副本行程內的推論、翻譯引擎回報的批次延遲）
+- 背景執行緒定期取樣各佇列深度
+- 事件逐行寫入 JSONL trace（cache/traces，只保留最近 keep_traces 個檔案），並可開啟本機 HTTP 端點查詢即時指標
+- 各階段的次數、總計與最大值為完整統計；p95 取自最近 sample_window 筆，長時間執行時記憶體不會持續成長
+
+預設停用（parallel.telemetry.enabled）。
+
+階段名稱以「池.動作」表示（transcribe.inference、translate.batch、draft.write...），
+使用率 = 該池頂層 span 的忙碌時間 / (經過時間 × worker 數)。
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Optional
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_TRACE_FOLDER = "cache/traces"
+DEFAULT_KEEP_TRACES = 20
+DEFAULT_SAMPLE_WINDOW = 2048
+
+_local = threading.local()
+
+
+def current_recorder() -> Optional[Callable]:
+    """
+    目前執行緒所在 span 的記錄函式 recorder(stage, duration, **attrs)，不在 span 內時為 None
+
+    供 pipeline 以外的模組（例如翻譯批次）把量測掛到目前的影片上；
+    取得後可以交給其他執行緒（例如翻譯引擎的回呼）呼叫。
+    """
+    stack = getattr(_local, "stack", None)
+    if not stack:
+        return None
+    telemetry, task = stack[-1]
+    return partial(telemetry.record_duration, task)
+
+
+def prune_traces(folder: Path, keep: int):
+    """刪除較舊的 trace 檔，只留下最新的 keep 個"""
+    try:
+        traces = sorted(folder.glob("pipeline_*.jsonl"), key=lambda path: path.stat().st_mtime)
+    except OSError:
+        return
+    for path in traces[:max(0, len(traces) - max(0, keep))]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+class PipelineTelemetry:
+    """單次 pipeline 執行的遙測收集器（多執行緒共用）"""
+
+    def __init__(self, trace_path: Optional[str] = None, sample_interval: float = 1.0,
+                 sample_window: int = DEFAULT_SAMPLE_WINDOW):
+        self.sample_interval = sample_interval
+        self.sample_window = max(1, sample_window)
+        self.started = time.time()
+        self.trace_path = Path(trace_path) if trace_path else None
+
+        self._lock = threading.Lock()
+        self._trace = None
+        if self.trace_path:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._trace = open(self.trace_path, "a", encoding="utf-8")
+
+        # 階段 -> {"count", "total", "max"}；最近的耗時另存於 _recent（計算 p95）
+        self._stages: Dict[str, dict] = {}
+        self._recent: Dict[str, Deque[float]] = {}
+        self._busy: Dict[str, float] = {}
+        self._workers: Dict[str, int] = {}
+        self._queues: Dict[str, object] = {}
+        self._queue_stats: Dict[str, dict] = {}
+        self._stats_provider: Optional[Callable[[], dict]] = None
+
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def from_config(cls, parallel_config: dict) -> Optional['PipelineTelemetry']:
+        """依 parallel.telemetry 設定建立，停用時返回 None"""
+        config = parallel_config.get("telemetry", {})
+        if not config.get("enabled", False):
+            return None
+
+        folder = Path(config.get("trace_folder", DEFAULT_TRACE_FOLDER))
+        folder = folder if folder.is_absolute() else PROJECT_ROOT / folder
+        # 加上這次的檔案共保留 keep_traces 個
+        prune_traces(folder, config.get("keep_traces", DEFAULT_KEEP_TRACES) - 1)
+        trace_path = folder / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        telemetry = cls(str(trace_path), config.get("sample_interval", 1.0),
+                        config.get("sample_window", DEFAULT_SAMPLE_WINDOW))
+
+        port = config.get("metrics_port", 0)
+        if port:
+            telemetry.serve(port)
+        return telemetry
+
+    # ------------------------------------------------------------------
+    # 設定
+    # ------------------------------------------------------------------
+
+    def set_workers(self, workers: Dict[str, int]):
+        """各池的 worker 數（計算使用率用）"""
+        with self._lock:
+            self._workers.update(workers)
+
+    def set_stats_provider(self, provider: Callable[[], dict]):
+        """指標中附帶的計數（例如 TranscriptionPipeline.stats）"""
+        self._stats_provider = provider
+
+    def watch_queues(self, queues: Dict[str, object]):
+        """開始定期取樣佇列深度（物件需提供 qsize()）"""
+        self._queues = dict(queues)
+        for name in self._queues:
+            self._queue_stats[name] = {"max": 0, "total": 0, "samples": 0}
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample_loop, name="telemetry-sampler", daemon=True)
+            self._sampler.start()
+
+    # ------------------------------------------------------------------
+    # 記錄
+    # ------------------------------------------------------------------
+
+    def _write(self, event: dict):
+        if self._trace is None:
+            return
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            if self._trace is not None:
+                self._trace.write(line + "\n")
+
+    def record(self, task: str, stage: str, start: float, end: float, busy: bool = False, **attrs):
+        """
+        記錄一段已知起訖時間（time.time()）的工作
+
+        Args:
+            busy: 是否計入該池的忙碌時間（佇列等待與巢狀量測為 False）
+        """
+        duration = max(0.0, end - start)
+        pool = stage.split(".", 1)[0]
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = {"count": 0, "total": 0.0, "max": 0.0}
+                self._recent[stage] = deque(maxlen=self.sample_window)
+            stats["count"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+            self._recent[stage].append(duration)
+            if busy:
+                self._busy[pool] = self._busy.get(pool, 0.0) + duration
+        self._write(dict({
+            "type": "span",
+            "task": task,
+            "stage": stage,
+            "start": round(start - self.started, 4),
+            "duration": round(duration, 4),
+            "thread": threading.current_thread().name
+        }, **attrs))
+
+    def record_duration(self, task: str, stage: str, duration: float, **attrs):
+        """記錄剛結束、長度為 duration 秒的工作（不計入忙碌時間）"""
+        end = time.time()
+        self.record(task, stage, end - duration, end, **attrs)
+
+    @contextmanager
+    def span(self, task: str, stage: str, **attrs):
+        """量測一段工作；最外層的 span 計入該池的忙碌時間"""
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        busy = not stack
+        stack.append((self, task))
+        start = time.time()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            if error:
+                attrs["error"] = error
+            self.record(task, stage, start, time.time(), busy=busy, **attrs)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self.sample_queues()
+
+    def sample_queues(self):
+        """取樣一次佇列深度"""
+        depths = {name: queue.qsize() for name, queue in self._queues.items()}
+        with self._lock:
+            for name, depth in depths.items():
+                stats = self._queue_stats[name]
+                stats["max"] = max(stats["max"], depth)
+                stats["total"] += depth
+                stats["samples"] += 1
+        self._write({"type": "queues", "t": round(time.time() - self.started, 2), **depths})
+
+    # ------------------------------------------------------------------
+    # 匯出
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """目前的各階段耗時統計、佇列深度、使用率與處理量"""
+        elapsed = time.time() - self.started
+        with self._lock:
+            stages = {}
+            for stage, stats in sorted(self._stages.items()):
+                recent = sorted(self._recent[stage])
+                stages[stage] = {
+                    "count": stats["count"],
+                    "total": round(stats["total"], 3),
+                    "mean": round(stats["total"] / stats["count"], 3),
+                    "p95": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3),
+                    "max": round(stats["max"], 3)
+                }
+            utilization = {
+                pool: round(self._busy.get(pool, 0.0) / (elapsed * workers), 3)
+                for pool, workers in self._workers.items()
+                if workers and elapsed > 0
+            }
+            queues = {
+                name: {
+                    "current": self._queues[name].qsize(),
+                    "max": stats["max"],
+                    "mean": round(stats["total"] / stats["samples"], 2) if stats["samples"] else 0
+                }
+                for name, stats in self._queue_stats.items()
+            }
+
+        snapshot = {
+            "elapsed": round(elapsed, 2),
+            "stages": stages,
+            "queues": queues,
+            "utilization": utilization
+        }
+        if self._stats_provider is not None:
+            counters = self._stats_provider()
+            snapshot["counters"] = counters
+            completed = counters.get("completed", 0)
+            if elapsed > 0:
+                snapshot["throughput_per_hour"] = round(completed * 3600 / elapsed, 2)
+        return snapshot
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """在背景開啟指標端點：GET /metrics 返回 snapshot() 的 JSON"""
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(telemetry.snapshot(), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"[Warning] 無法開啟指標端點 {host}:{port}: {e}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="telemetry-metrics", daemon=True).start()
+        print(f"[Telemetry] 指標端點: http://{host}:{port}/metrics")
+
+    def print_summary(self):
+        """印出各階段耗時與使用率"""
+        snapshot = self.snapshot()
+        print(f"[Telemetry] 各階段耗時 (秒):")
+        for stage, stats in snapshot["stages"].items():
+            print(f"   {stage:<24} n={stats['count']:<5} total={stats['total']:<10.1f} "
+                  f"mean={stats['mean']:<8.2f} p95={stats['p95']:<8.2f} max={stats['max']:.2f}")
+        if snapshot["utilization"]:
+            usage = ", ".join(f"{pool} {value:.0%}" for pool, value in snapshot["utilization"].items())
+            print(f"   Worker 使用率: {usage}")
+        if snapshot["queues"]:
+            depths = ", ".join(f"{name} max {stats['max']} / mean {stats['mean']}"
+                               for name, stats in snapshot["queues"].items())
+            print(f"   佇列深度: {depths}")
+        if self.trace_path:
+            print(f"   Trace: {self.trace_path}")
+
+    def close(self):
+        """停止取樣與指標端點，寫入最終統計"""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._write(dict(self.snapshot(), type="summary"))
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
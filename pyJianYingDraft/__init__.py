@@ -1,7 +1,7 @@
 import warnings
 import sys
 
-from .local_materials import CropSettings, VideoMaterial, AudioMaterial
+from .local_materials import CropSettings, VideoMaterial, AudioMaterial, set_media_probe
 from .keyframe import KeyframeProperty
 
 from .time_util import Timerange
@@ -10,13 +10,23 @@ from .video_segment import VideoSegment, StickerSegment, ClipSettings
 from .effect_segment import EffectSegment, FilterSegment
 from .text_segment import TextSegment, TextStyle, TextBorder, TextBackground, TextShadow
 
-from .metadata import FontType
-from .metadata import MaskType
-from .metadata import TransitionType, FilterType
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import TextIntro, TextOutro, TextLoopAnim
-from .metadata import AudioSceneEffectType
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType
+from . import metadata
+
+# 元数据枚举在首次访问时才加载, 见`metadata.__getattr__`
+_METADATA_ENUMS = (
+    "FontType",
+    "MaskType",
+    "TransitionType", "FilterType",
+    "IntroType", "OutroType", "GroupAnimationType",
+    "TextIntro", "TextOutro", "TextLoopAnim",
+    "AudioSceneEffectType",
+    "VideoSceneEffectType", "VideoCharacterEffectType",
+)
+
+def __getattr__(name: str):
+    if name in _METADATA_ENUMS:
+        return getattr(metadata, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 from .track import TrackType
 from .template_mode import ShrinkMode, ExtendMode
@@ -146,10 +156,17 @@ class Crop_settings:
 class _DeprecatedEnum:
     """带deprecation警告的枚举代理类"""
     def __init__(self, original_enum, old_name, new_name):
-        self._enum = original_enum
+        self._original = original_enum
         self._old_name = old_name
         self._new_name = new_name
 
+    @property
+    def _enum(self):
+        # 元数据枚举以名称传入, 首次使用时才加载
+        if isinstance(self._original, str):
+            self._original = getattr(metadata, self._original)
+        return self._original
+
     def __getattr__(self, name):
         # 当访问枚举成员时显示警告
         _deprecated_class_warning(self._old_name, self._new_name)
@@ -164,19 +181,19 @@ class _DeprecatedEnum:
         return f"<Deprecated {self._old_name} (use {self._new_name} instead)>"
 
 Track_type = _DeprecatedEnum(TrackType, "Track_type", "TrackType")
-Font_type = _DeprecatedEnum(FontType, "Font_type", "FontType")
-Mask_type = _DeprecatedEnum(MaskType, "Mask_type", "MaskType")
-Filter_type = _DeprecatedEnum(FilterType, "Filter_type", "FilterType")
-Transition_type = _DeprecatedEnum(TransitionType, "Transition_type", "TransitionType")
-Intro_type = _DeprecatedEnum(IntroType, "Intro_type", "IntroType")
-Outro_type = _DeprecatedEnum(OutroType, "Outro_type", "OutroType")
-Group_animation_type = _DeprecatedEnum(GroupAnimationType, "Group_animation_type", "GroupAnimationType")
-Text_intro = _DeprecatedEnum(TextIntro, "Text_intro", "TextIntro")
-Text_outro = _DeprecatedEnum(TextOutro, "Text_outro", "TextOutro")
-Text_loop_anim = _DeprecatedEnum(TextLoopAnim, "Text_loop_anim", "TextLoopAnim")
-Audio_scene_effect_type = _DeprecatedEnum(AudioSceneEffectType, "Audio_scene_effect_type", "AudioSceneEffectType")
-Video_scene_effect_type = _DeprecatedEnum(VideoSceneEffectType, "Video_scene_effect_type", "VideoSceneEffectType")
-Video_character_effect_type = _DeprecatedEnum(VideoCharacterEffectType, "Video_character_effect_type", "VideoCharacterEffectType")
+Font_type = _DeprecatedEnum("FontType", "Font_type", "FontType")
+Mask_type = _DeprecatedEnum("MaskType", "Mask_type", "MaskType")
+Filter_type = _DeprecatedEnum("FilterType", "Filter_type", "FilterType")
+Transition_type = _DeprecatedEnum("TransitionType", "Transition_type", "TransitionType")
+Intro_type = _DeprecatedEnum("IntroType", "Intro_type", "IntroType")
+Outro_type = _DeprecatedEnum("OutroType", "Outro_type", "OutroType")
+Group_animation_type = _DeprecatedEnum("GroupAnimationType", "Group_animation_type", "GroupAnimationType")
+Text_intro = _DeprecatedEnum("TextIntro", "Text_intro", "TextIntro")
+Text_outro = _DeprecatedEnum("TextOutro", "Text_outro", "TextOutro")
+Text_loop_anim = _DeprecatedEnum("TextLoopAnim", "Text_loop_anim", "TextLoopAnim")
+Audio_scene_effect_type = _DeprecatedEnum("AudioSceneEffectType", "Audio_scene_effect_type", "AudioSceneEffectType")
+Video_scene_effect_type = _DeprecatedEnum("VideoSceneEffectType", "Video_scene_effect_type", "VideoSceneEffectType")
+Video_character_effect_type = _DeprecatedEnum("VideoCharacterEffectType", "Video_character_effect_type", "VideoCharacterEffectType")
 Keyframe_property = _DeprecatedEnum(KeyframeProperty, "Keyframe_property", "KeyframeProperty")
 
 # 仅在Windows系统下定义jianying_controller相关的向后兼容类
@@ -208,6 +225,7 @@ __all__ = [
     "CropSettings",
     "VideoMaterial",
     "AudioMaterial",
+    "set_media_probe",
     "KeyframeProperty",
     "Timerange",
     "AudioSegment",
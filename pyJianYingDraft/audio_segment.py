@@ -6,7 +6,7 @@
 import uuid
 from copy import deepcopy
 
-from typing import Optional, Literal, Union
+from typing import Optional, Literal, Union, TYPE_CHECKING
 from typing import Dict, List, Any
 
 from .time_util import tim, Timerange
@@ -15,7 +15,9 @@ from .local_materials import AudioMaterial
 from .keyframe import KeyframeProperty, KeyframeList
 
 from .metadata import EffectParamInstance
-from .metadata import AudioSceneEffectType, ToneEffectType, SpeechToSongType
+from . import metadata
+if TYPE_CHECKING:
+    from .metadata import AudioSceneEffectType, ToneEffectType, SpeechToSongType
 
 
 class AudioEffect:
@@ -34,7 +36,7 @@ class AudioEffect:
 
     audio_adjust_params: List[EffectParamInstance]
 
-    def __init__(self, effect_meta: Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType],
+    def __init__(self, effect_meta: Union["AudioSceneEffectType", "ToneEffectType", "SpeechToSongType"],
                  params: Optional[List[Optional[float]]] = None):
         """根据给定的音效元数据及参数列表构造一个音频特效对象, params的范围是0~100"""
 
@@ -43,15 +45,15 @@ class AudioEffect:
         self.resource_id = effect_meta.value.resource_id
         self.audio_adjust_params = []
 
-        if isinstance(effect_meta, AudioSceneEffectType):
+        if metadata.is_member(effect_meta, "AudioSceneEffectType"):
             self.category_id = "sound_effect"
             self.category_name = "场景音"
             self.category_index = 1
-        elif isinstance(effect_meta, ToneEffectType):
+        elif metadata.is_member(effect_meta, "ToneEffectType"):
             self.category_id = "tone"
             self.category_name = "音色"
             self.category_index = 2
-        elif isinstance(effect_meta, SpeechToSongType):
+        elif metadata.is_member(effect_meta, "SpeechToSongType"):
             self.category_id = "speech_to_song"
             self.category_name = "声音成曲"
             self.category_index = 3
@@ -131,7 +133,7 @@ class AudioSegment(MediaSegment):
         self.fade = None
         self.effects = []
 
-    def add_effect(self, effect_type: Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType],
+    def add_effect(self, effect_type: Union["AudioSceneEffectType", "ToneEffectType", "SpeechToSongType"],
                    params: Optional[List[Optional[float]]] = None) -> "AudioSegment":
         """为音频片段添加一个作用于整个片段的音频效果, 目前"声音成曲"效果不能自动被剪映所识别
 
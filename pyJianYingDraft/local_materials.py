@@ -1,10 +1,61 @@
 import os
 import uuid
-import pymediainfo
 
-from typing import Optional, Literal
+from typing import Optional, Literal, Tuple, Callable
 from typing import Dict, Any
 
+_TrackInfo = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_media_probe: Optional[Callable[[str], _TrackInfo]] = None
+"""由使用方注入的素材探测函数, 未注入时直接调用pymediainfo"""
+
+def set_media_probe(probe: Optional[Callable[[str], _TrackInfo]]) -> None:
+    """注入素材探测函数(例如带缓存的探测服务), 传入`None`恢复使用pymediainfo
+
+    Args:
+        probe (`Callable[[str], Tuple]`, optional): 接收素材路径, 返回(视频轨道, 图片轨道, 音频轨道)信息,
+            格式与`_probe_tracks`相同, 时长单位为毫秒.
+    """
+    global _media_probe
+    _media_probe = probe
+
+def _track_duration(track: Dict[str, Any], path: str) -> int:
+    """轨道时长(微秒)
+
+    Raises:
+        `ValueError`: 无法获取素材时长.
+    """
+    duration_ms = track.get("duration_ms")
+    if duration_ms is None:
+        raise ValueError(f"无法获取素材 {path} 的时长")
+    return int(duration_ms * 1e3)
+
+def _probe_tracks(path: str, media_type: str) -> _TrackInfo:
+    """获取素材的(视频轨道, 图片轨道, 音频轨道)信息, 时长单位为毫秒
+
+    Raises:
+        `ValueError`: 无法解析该素材文件.
+    """
+    if _media_probe is not None:
+        return _media_probe(path)
+
+    import pymediainfo
+    if not pymediainfo.MediaInfo.can_parse():
+        raise ValueError(f"不支持的{media_type}素材类型 '{os.path.splitext(path)[1]}'")
+
+    info: pymediainfo.MediaInfo = \
+        pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
+    video = image = audio = None
+    if len(info.video_tracks):
+        track = info.video_tracks[0]
+        video = {"duration_ms": track.duration, "width": track.width, "height": track.height}  # type: ignore
+    if len(info.image_tracks):
+        track = info.image_tracks[0]
+        image = {"width": track.width, "height": track.height}  # type: ignore
+    if len(info.audio_tracks):
+        audio = {"duration_ms": info.audio_tracks[0].duration}  # type: ignore
+    return video, image, audio
+
 class CropSettings:
     """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角"""
 
@@ -75,7 +126,7 @@ class VideoMaterial:
 
         Raises:
             `FileNotFoundError`: 素材文件不存在.
-            `ValueError`: 不支持的素材文件类型.
+            `ValueError`: 不支持的素材文件类型, 或无法获取素材时长.
         """
         path = os.path.abspath(path)
         postfix = os.path.splitext(path)[1]
@@ -88,29 +139,25 @@ class VideoMaterial:
         self.crop_settings = crop_settings
         self.local_material_id = ""
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError(f"不支持的视频素材类型 '{postfix}'")
-
-        info: pymediainfo.MediaInfo = \
-            pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
+        video_track, image_track, _ = _probe_tracks(path, "视频")
         # 有视频轨道的视为视频素材
-        if len(info.video_tracks):
+        if video_track is not None:
             self.material_type = "video"
-            self.duration = int(info.video_tracks[0].duration * 1e3)  # type: ignore
-            self.width, self.height = info.video_tracks[0].width, info.video_tracks[0].height  # type: ignore
+            self.duration = _track_duration(video_track, path)
+            self.width, self.height = video_track["width"], video_track["height"]
         # gif文件使用imageio库获取长度
-        elif postfix.lower() == ".gif":
+        elif postfix.lower() == ".gif" and image_track is not None:
             import imageio
             gif = imageio.get_reader(path)
 
             self.material_type = "video"
             self.duration = int(round(gif.get_meta_data()['duration'] * gif.get_length() * 1e3))
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
+            self.width, self.height = image_track["width"], image_track["height"]
             gif.close()
-        elif len(info.image_tracks):
+        elif image_track is not None:
             self.material_type = "photo"
             self.duration = 10800000000  # 相当于3h
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
+            self.width, self.height = image_track["width"], image_track["height"]
         else:
             raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
 
@@ -158,7 +205,7 @@ class AudioMaterial:
 
         Raises:
             `FileNotFoundError`: 素材文件不存在.
-            `ValueError`: 不支持的素材文件类型.
+            `ValueError`: 不支持的素材文件类型, 或无法获取素材时长.
         """
         path = os.path.abspath(path)
         if not os.path.exists(path):
@@ -168,14 +215,12 @@ class AudioMaterial:
         self.material_id = uuid.uuid4().hex
         self.path = path
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
-        info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
-        if len(info.video_tracks):
+        video_track, _, audio_track = _probe_tracks(path, "音频")
+        if video_track is not None:
             raise ValueError("音频素材不应包含视频轨道")
-        if not len(info.audio_tracks):
+        if audio_track is None:
             raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
-        self.duration = int(info.audio_tracks[0].duration * 1e3)  # type: ignore
+        self.duration = _track_duration(audio_track, path)
 
     def export_json(self) -> Dict[str, Any]:
         return {
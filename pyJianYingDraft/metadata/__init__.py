@@ -2,35 +2,102 @@
 
 音频相关元数据更新时间：2024
 其余元数据更新时间：2025-08
+
+各元数据枚举所在的模块(其中最大的视频特效、滤镜与字体共有上万行定义)按需导入:
+首次访问`metadata.VideoSceneEffectType`等属性时才加载对应模块并构造枚举成员.
 """
 
-from .effect_meta import EffectMeta, EffectParamInstance
-from .effect_meta import AnimationMeta
-
-# 视频特效
-from .video_scene_effect import VideoSceneEffectType
-from .video_character_effect import VideoCharacterEffectType
-
-# 视频动画
-from .video_intro import IntroType
-from .video_outro import OutroType
-from .video_group_animation import GroupAnimationType
-
-# 音频特效
-from .audio_scene_effect import AudioSceneEffectType
-from .tone_effect import ToneEffectType
-from .speech_to_song import SpeechToSongType
-
-# 文本动画
-from .text_intro import TextIntro
-from .text_outro import TextOutro
-from .text_loop import TextLoopAnim
-
-# 其它
-from .font_meta import FontType
-from .mask_meta import MaskType, MaskMeta
-from .filter_meta import FilterType
-from .transition_meta import TransitionType
+import sys
+import importlib
+
+from typing import Any, List, Optional, Iterable
+
+from .effect_meta import EffectEnum, EffectMeta, EffectParamInstance, normalize_name
+from .effect_meta import AnimationMeta, MaskMeta
+
+_LAZY_ENUMS = {
+    # 视频特效
+    "VideoSceneEffectType": ".video_scene_effect",
+    "VideoCharacterEffectType": ".video_character_effect",
+
+    # 视频动画
+    "IntroType": ".video_intro",
+    "OutroType": ".video_outro",
+    "GroupAnimationType": ".video_group_animation",
+
+    # 音频特效
+    "AudioSceneEffectType": ".audio_scene_effect",
+    "ToneEffectType": ".tone_effect",
+    "SpeechToSongType": ".speech_to_song",
+
+    # 文本动画
+    "TextIntro": ".text_intro",
+    "TextOutro": ".text_outro",
+    "TextLoopAnim": ".text_loop",
+
+    # 其它
+    "FontType": ".font_meta",
+    "MaskType": ".mask_meta",
+    "FilterType": ".filter_meta",
+    "TransitionType": ".transition_meta",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """按需导入元数据枚举(PEP 562), 导入后缓存为模块属性"""
+    module_name = _LAZY_ENUMS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def is_member(obj: Any, enum_name: str) -> bool:
+    """判断`obj`是否为名为`enum_name`的元数据枚举的成员
+
+    该枚举所在模块尚未导入时`obj`必然不是其成员, 此时直接返回False而不会触发导入.
+    """
+    enum_cls = globals().get(enum_name)
+    if enum_cls is None:
+        module = sys.modules.get(__name__ + _LAZY_ENUMS[enum_name])
+        if module is None:
+            return False
+        enum_cls = getattr(module, enum_name)
+    return isinstance(obj, enum_cls)
+
+
+def search(query: str, enum_names: Optional[Iterable[str]] = None, *, limit: Optional[int] = 20,
+           is_vip: Optional[bool] = None, min_similarity: float = 0.4) -> List[EffectEnum]:
+    """在多个元数据枚举中按名称搜索, 结果的排序规则与`EffectEnum.search`相同
+
+    Args:
+        query (str): 查询串
+        enum_names (`Iterable[str]`, optional): 要搜索的枚举名称(如"FilterType"), 默认搜索全部枚举(会加载全部元数据)
+        limit (`int`, optional): 最多返回的结果数, None表示不限制, 默认为20
+        is_vip (`bool`, optional): 仅返回VIP(True)或免费(False)的成员, 默认不过滤
+        min_similarity (`float`, optional): 模糊匹配的最低相似度, 默认为0.4
+
+    Raises:
+        `ValueError`: 未知的枚举名称
+    """
+    names = list(_LAZY_ENUMS) if enum_names is None else list(enum_names)
+    unknown = [name for name in names if name not in _LAZY_ENUMS]
+    if unknown:
+        raise ValueError(f"Unknown metadata enum: {', '.join(unknown)}")
+
+    results = []
+    for order, name in enumerate(names):
+        enum_cls = __getattr__(name)
+        for key, member in enum_cls._name_index().search(normalize_name(query), is_vip, min_similarity):
+            results.append((key[:3], order, key[3], member))
+    results.sort(key=lambda item: item[:3])
+    return [item[3] for item in results[:limit]]
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ENUMS))
+
 
 __all__ = [
     "AnimationMeta",
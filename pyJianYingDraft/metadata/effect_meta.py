@@ -2,7 +2,7 @@
 
 from enum import Enum
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from typing import TypeVar, Optional
 
 class EffectParam:
@@ -92,8 +92,94 @@ class EffectMeta:
 
 EffectEnumSubclass = TypeVar("EffectEnumSubclass", bound="EffectEnum")
 
+def normalize_name(name: str) -> str:
+    """名称的规范形式: 忽略大小写、空格和下划线"""
+    return name.lower().replace(" ", "").replace("_", "")
+
+def _bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+SearchKey = Tuple[int, float, int, int]
+"""搜索结果的排序键: (匹配级别, -相似度, 名称长度, 枚举内序号), 越小越靠前"""
+
+class _NameIndex:
+    """单个特效枚举的名称索引, 在首次查找时构建一次"""
+
+    exact: Dict[str, "EffectEnum"]
+    """规范化名称 -> 枚举成员"""
+    names: List[str]
+    """各成员的规范化名称"""
+    members: List["EffectEnum"]
+    grams: Dict[str, List[int]]
+    """二元组 -> 含有该二元组的成员序号"""
+    gram_counts: List[int]
+
+    def __init__(self, enum_cls: "type[EffectEnum]"):
+        self.exact = {}
+        for member_name, member in enum_cls.__members__.items():
+            self.exact.setdefault(normalize_name(member_name), member)
+
+        self.names, self.members, self.gram_counts = [], [], []
+        self.grams = {}
+        for i, member in enumerate(enum_cls):
+            key = normalize_name(member.name)
+            grams = _bigrams(key)
+            self.names.append(key)
+            self.members.append(member)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(i)
+
+    def search(self, query: str, is_vip: Optional[bool], min_similarity: float) -> List[Tuple[SearchKey, "EffectEnum"]]:
+        """返回所有匹配的(排序键, 成员), 匹配级别依次为: 完全相同、前缀、子串、二元组相似"""
+        if not query:
+            return []
+
+        query_grams = _bigrams(query)
+        if query_grams:
+            # 包含查询串的名称必然含有其全部二元组, 因此只需检查至少共享一个二元组的成员
+            shared: Dict[int, int] = {}
+            for gram in query_grams:
+                for i in self.grams.get(gram, ()):
+                    shared[i] = shared.get(i, 0) + 1
+            candidates = shared.items()
+        else:
+            candidates = ((i, 0) for i, name in enumerate(self.names) if query in name)
+
+        results: List[Tuple[SearchKey, EffectEnum]] = []
+        for i, count in candidates:
+            member = self.members[i]
+            if is_vip is not None and getattr(member.value, "is_vip", None) != is_vip:
+                continue
+            name = self.names[i]
+            if query_grams:
+                similarity = 2 * count / (len(query_grams) + self.gram_counts[i])
+            else:
+                similarity = len(query) / len(name)
+            if name == query:
+                level = 0
+            elif name.startswith(query):
+                level = 1
+            elif query in name:
+                level = 2
+            elif similarity >= min_similarity:
+                level = 3
+            else:
+                continue
+            results.append(((level, -similarity, len(name), i), member))
+        return results
+
+_name_indexes: Dict[type, _NameIndex] = {}
+
 class EffectEnum(Enum):
-    """特效枚举基类, 提供一个`from_name`方法用于根据名称获取特效元数据"""
+    """特效枚举基类, 提供`from_name`方法用于根据名称获取特效元数据, 以及`search`方法用于按名称搜索"""
+
+    @classmethod
+    def _name_index(cls) -> _NameIndex:
+        index = _name_indexes.get(cls)
+        if index is None:
+            index = _name_indexes[cls] = _NameIndex(cls)
+        return index
 
     @classmethod
     def from_name(cls: "type[EffectEnumSubclass]", name: str) -> EffectEnumSubclass:
@@ -105,11 +191,28 @@ class EffectEnum(Enum):
         Raises:
             `ValueError`: 特效名称不存在
         """
-        name = name.lower().replace(" ", "").replace("_", "")
-        for effect in cls:
-            if effect.name.lower().replace(" ", "").replace("_", "") == name:
-                return effect
-        raise ValueError(f"Effect named '{name}' not found")
+        name = normalize_name(name)
+        effect = cls._name_index().exact.get(name)
+        if effect is None:
+            raise ValueError(f"Effect named '{name}' not found")
+        return effect
+
+    @classmethod
+    def search(cls: "type[EffectEnumSubclass]", query: str, *, limit: Optional[int] = 20,
+               is_vip: Optional[bool] = None, min_similarity: float = 0.4) -> List[EffectEnumSubclass]:
+        """按名称搜索特效, 同样忽略大小写、空格和下划线
+
+        依次返回名称完全相同、以查询串开头、包含查询串的成员, 最后是二元组相似度(Dice系数)不低于`min_similarity`的成员
+
+        Args:
+            query (str): 查询串
+            limit (`int`, optional): 最多返回的结果数, None表示不限制, 默认为20
+            is_vip (`bool`, optional): 仅返回VIP(True)或免费(False)的特效, 默认不过滤
+            min_similarity (`float`, optional): 模糊匹配的最低相似度, 取值范围0~1, 默认为0.4
+        """
+        results = cls._name_index().search(normalize_name(query), is_vip, min_similarity)
+        results.sort(key=lambda item: item[0])
+        return [member for _, member in results[:limit]]
 
 # 动画元数据
 class AnimationMeta:
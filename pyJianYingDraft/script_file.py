@@ -3,8 +3,8 @@ import json
 import math
 from copy import deepcopy
 
-from typing import Optional, Literal, Union, overload
-from typing import Type, Dict, List, Any
+from typing import Optional, Literal, Union, overload, TYPE_CHECKING
+from typing import Type, Dict, List, Tuple, Set, Any, Iterable
 
 from . import util
 from . import assets
@@ -19,7 +19,8 @@ from .effect_segment import EffectSegment, FilterSegment
 from .text_segment import TextSegment, TextStyle, TextBubble
 from .track import TrackType, BaseTrack, Track
 
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType, FilterType
+if TYPE_CHECKING:
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType, FilterType
 
 class ScriptMaterial:
     """草稿文件中的素材信息部分"""
@@ -53,6 +54,9 @@ class ScriptMaterial:
     canvases: List[BackgroundFilling]
     """背景填充列表"""
 
+    _id_sets: Dict[str, Tuple[List[Any], Set[str], int]]
+    """素材列表名称 -> (列表, 已收录的id集合, 已收录的素材数), 供`__contains__`使用"""
+
     def __init__(self):
         self.audios = []
         self.videos = []
@@ -70,6 +74,8 @@ class ScriptMaterial:
         self.filters = []
         self.canvases = []
 
+        self._id_sets = {}
+
     @overload
     def __contains__(self, item: Union[VideoMaterial, AudioMaterial]) -> bool: ...
     @overload
@@ -77,23 +83,37 @@ class ScriptMaterial:
     @overload
     def __contains__(self, item: Union[SegmentAnimations, VideoEffect, Transition, Filter]) -> bool: ...
 
+    def _has_id(self, field: str, id_attr: str, item_id: str) -> bool:
+        """判断素材列表`field`中是否有id为`item_id`的素材
+
+        每个素材列表维护一个id集合, 列表增长时只补充新增部分, 列表被替换或缩短时重建
+        """
+        items = getattr(self, field)
+        cached = self._id_sets.get(field)
+        if cached is None or cached[0] is not items or cached[2] > len(items):
+            cached = (items, set(), 0)
+        ids = cached[1]
+        ids.update(getattr(item, id_attr) for item in items[cached[2]:])
+        self._id_sets[field] = (items, ids, len(items))
+        return item_id in ids
+
     def __contains__(self, item) -> bool:
         if isinstance(item, VideoMaterial):
-            return item.material_id in [video.material_id for video in self.videos]
+            return self._has_id("videos", "material_id", item.material_id)
         elif isinstance(item, AudioMaterial):
-            return item.material_id in [audio.material_id for audio in self.audios]
+            return self._has_id("audios", "material_id", item.material_id)
         elif isinstance(item, AudioFade):
-            return item.fade_id in [fade.fade_id for fade in self.audio_fades]
+            return self._has_id("audio_fades", "fade_id", item.fade_id)
         elif isinstance(item, AudioEffect):
-            return item.effect_id in [effect.effect_id for effect in self.audio_effects]
+            return self._has_id("audio_effects", "effect_id", item.effect_id)
         elif isinstance(item, SegmentAnimations):
-            return item.animation_id in [ani.animation_id for ani in self.animations]
+            return self._has_id("animations", "animation_id", item.animation_id)
         elif isinstance(item, VideoEffect):
-            return item.global_id in [effect.global_id for effect in self.video_effects]
+            return self._has_id("video_effects", "global_id", item.global_id)
         elif isinstance(item, Transition):
-            return item.global_id in [transition.global_id for transition in self.transitions]
+            return self._has_id("transitions", "global_id", item.global_id)
         elif isinstance(item, Filter):
-            return item.global_id in [filter_.global_id for filter_ in self.filters]
+            return self._has_id("filters", "global_id", item.global_id)
         else:
             raise TypeError("Invalid argument type '%s'" % type(item))
 
@@ -301,7 +321,37 @@ class ScriptFile:
         target.add_segment(segment)
         self.duration = max(self.duration, segment.end)
 
-        # 自动添加相关素材
+        self._add_segment_materials(segment)
+        return self
+
+    def add_segments(self, segments: Iterable[Union[VideoSegment, StickerSegment, AudioSegment, TextSegment]],
+                     track_name: Optional[str] = None) -> "ScriptFile":
+        """向指定轨道中批量添加同一类型的片段, 片段顺序任意; 任一片段不满足要求时不添加任何片段
+
+        Args:
+            segments (`Iterable[VideoSegment | StickerSegment | AudioSegment | TextSegment]`): 要添加的片段
+            track_name (`str`, optional): 添加到的轨道名称. 当此类型的轨道仅有一条时可省略.
+
+        Raises:
+            `NameError`: 未找到指定名称的轨道, 或必须提供`track_name`参数时未提供
+            `TypeError`: 片段类型不匹配轨道类型
+            `SegmentOverlap`: 新片段与已有片段或彼此之间重叠
+        """
+        segments = list(segments)
+        if len(segments) == 0:
+            return self
+        target = self._get_track(type(segments[0]), track_name)
+
+        # 加入轨道并更新时长
+        target.add_segments(segments)
+        self.duration = max(self.duration, max(segment.end for segment in segments))
+
+        for segment in segments:
+            self._add_segment_materials(segment)
+        return self
+
+    def _add_segment_materials(self, segment: Union[VideoSegment, StickerSegment, AudioSegment, TextSegment]) -> None:
+        """自动添加片段相关的素材"""
         if isinstance(segment, VideoSegment):
             # 出入场等动画
             if (segment.animations_instance is not None) and (segment.animations_instance not in self.materials):
@@ -356,9 +406,7 @@ class ScriptFile:
         if isinstance(segment, (VideoSegment, AudioSegment)):
             self.add_material(segment.material_instance)
 
-        return self
-
-    def add_effect(self, effect: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def add_effect(self, effect: Union["VideoSceneEffectType", "VideoCharacterEffectType"],
                    t_range: Timerange, track_name: Optional[str] = None, *,
                    params: Optional[List[Optional[float]]] = None) -> "ScriptFile":
         """向指定的特效轨道中添加一个特效片段
@@ -387,7 +435,7 @@ class ScriptFile:
             self.materials.video_effects.append(segment.effect_inst)
         return self
 
-    def add_filter(self, filter_meta: FilterType, t_range: Timerange,
+    def add_filter(self, filter_meta: "FilterType", t_range: Timerange,
                    track_name: Optional[str] = None, intensity: float = 100.0) -> "ScriptFile":
         """向指定的滤镜轨道中添加一个滤镜片段
 
@@ -444,6 +492,7 @@ class ScriptFile:
         with open(srt_path, "r", encoding="utf-8-sig") as srt_file:
             lines = srt_file.readlines()
 
+        segments: List[TextSegment] = []
         def __add_text_segment(text: str, t_range: Timerange) -> None:
             if style_reference:
                 seg = TextSegment.create_from_template(text, t_range, style_reference)
@@ -451,7 +500,7 @@ class ScriptFile:
                     seg.clip_settings = deepcopy(clip_settings)
             else:
                 seg = TextSegment(text, t_range, style=text_style, clip_settings=clip_settings)
-            self.add_segment(seg, track_name)
+            segments.append(seg)
 
         index = 0
         text: str = ""
@@ -490,6 +539,7 @@ class ScriptFile:
         if len(text) > 0:
             __add_text_segment(text.strip(), text_trange)
 
+        self.add_segments(segments, track_name)
         return self
 
     def get_imported_track(self, track_type: Literal[TrackType.video, TrackType.audio, TrackType.text],
@@ -774,8 +824,8 @@ class ScriptFile:
             if effect["type"] == "text_effect":
                 print("\tResource id: %s '%s'" % (effect["resource_id"], effect.get("name", "")))
 
-    def dumps(self) -> str:
-        """将草稿文件内容导出为JSON字符串"""
+    def _export_content(self) -> Dict[str, Any]:
+        """整理并返回完整的草稿内容"""
         self.content["fps"] = self.fps
         self.content["duration"] = self.duration
         self.content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
@@ -793,12 +843,35 @@ class ScriptFile:
         track_list.sort(key=lambda track: track.render_index)
         self.content["tracks"] = [track.export_json() for track in track_list]
 
-        return json.dumps(self.content, ensure_ascii=False, indent=4)
+        return self.content
+
+    def dumps(self) -> str:
+        """将草稿文件内容导出为JSON字符串"""
+        return json.dumps(self._export_content(), ensure_ascii=False, indent=4)
 
     def dump(self, file_path: str) -> None:
-        """将草稿文件内容写入文件"""
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(self.dumps())
+        """将草稿文件内容写入文件(写入临时文件后原子替换)
+
+        项目提供`draft_writer`时流式写入, 独立使用本库时整体编码后写入, 两者输出一致
+        """
+        content = self._export_content()
+        try:
+            from draft_writer import write_draft_json
+        except ImportError:
+            write_draft_json = None
+        if write_draft_json is not None:
+            write_draft_json(file_path, content, indent=4)
+            return
+
+        tmp_path = "%s.%d.tmp" % (file_path, os.getpid())
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(content, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
     def save(self) -> None:
         """保存草稿文件至打开时的路径
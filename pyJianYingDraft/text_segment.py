@@ -4,15 +4,18 @@ import json
 import uuid
 from copy import deepcopy
 
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, TYPE_CHECKING
 from typing import Union, Optional, Literal
 
 from .time_util import Timerange, tim
 from .segment import ClipSettings, VisualSegment
 from .animation import SegmentAnimations, Text_animation
 
-from .metadata import FontType, EffectMeta
-from .metadata import TextIntro, TextOutro, TextLoopAnim
+from .metadata import EffectMeta
+from . import metadata
+if TYPE_CHECKING:
+    from .metadata import FontType
+    from .metadata import TextIntro, TextOutro, TextLoopAnim
 
 class TextStyle:
     """字体样式类"""
@@ -275,7 +278,7 @@ class TextSegment(VisualSegment):
     """文本花字效果, 在放入轨道时加入素材列表中, 目前仅支持一部分花字效果"""
 
     def __init__(self, text: str, timerange: Timerange, *,
-                 font: Optional[FontType] = None,
+                 font: Optional["FontType"] = None,
                  style: Optional[TextStyle] = None, clip_settings: Optional[ClipSettings] = None,
                  border: Optional[TextBorder] = None, background: Optional[TextBackground] = None,
                  shadow: Optional[TextShadow] = None):
@@ -325,7 +328,7 @@ class TextSegment(VisualSegment):
 
         return new_segment
 
-    def add_animation(self, animation_type: Union[TextIntro, TextOutro, TextLoopAnim],
+    def add_animation(self, animation_type: Union["TextIntro", "TextOutro", "TextLoopAnim"],
                       duration: Union[str, float, None] = None) -> "TextSegment":
         """将给定的入场/出场/循环动画添加到此片段的动画列表中, 出入场动画的持续时间可以自行设置, 循环动画则会自动填满其余无动画部分
 
@@ -340,11 +343,11 @@ class TextSegment(VisualSegment):
             duration = animation_type.value.duration
         duration = min(tim(duration), self.target_timerange.duration)
 
-        if isinstance(animation_type, TextIntro):
+        if metadata.is_member(animation_type, "TextIntro"):
             start = 0
-        elif isinstance(animation_type, TextOutro):
+        elif metadata.is_member(animation_type, "TextOutro"):
             start = self.target_timerange.duration - duration
-        elif isinstance(animation_type, TextLoopAnim):
+        elif metadata.is_member(animation_type, "TextLoopAnim"):
             intro_trange = self.animations_instance and self.animations_instance.get_animation_trange("in")
             outro_trange = self.animations_instance and self.animations_instance.get_animation_trange("out")
             start = intro_trange.start if intro_trange else 0
@@ -1,10 +1,11 @@
 """轨道类及其元数据"""
 
 import uuid
+import bisect
 
 from enum import Enum
 from typing import TypeVar, Generic, Type
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Union, Iterable
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
@@ -76,7 +77,10 @@ class Track(BaseTrack, Generic[Seg_type]):
     """是否静音"""
 
     segments: List[Seg_type]
-    """该轨道包含的片段列表"""
+    """该轨道包含的片段列表, 按开始时间排序"""
+
+    _starts: List[int]
+    """与`segments`一一对应的开始时间, 用于二分查找"""
 
     def __init__(self, track_type: TrackType, name: str, render_index: int, mute: bool):
         self.track_type = track_type
@@ -86,6 +90,7 @@ class Track(BaseTrack, Generic[Seg_type]):
 
         self.mute = mute
         self.segments = []
+        self._starts = []
 
     @property
     def end_time(self) -> int:
@@ -99,6 +104,26 @@ class Track(BaseTrack, Generic[Seg_type]):
         """返回该轨道允许的片段类型"""
         return self.track_type.value.segment_type  # type: ignore
 
+    def _check_type(self, segment: Seg_type) -> None:
+        if not isinstance(segment, self.accept_segment_type):
+            raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
+
+    def _overlap_at(self, segment: Seg_type) -> int:
+        """检查片段是否与现有片段重叠, 返回其按开始时间应插入的位置
+
+        现有片段互不重叠且按开始时间排序: 开始时间不晚于新片段的片段中, 只有最后一个非零时长的片段可能与之重叠
+        (零时长片段只与严格包含它的片段重叠); 其后的片段只需检查第一个
+        """
+        pos = bisect.bisect_right(self._starts, segment.target_timerange.start)
+        prev = pos - 1
+        while prev >= 0 and self.segments[prev].target_timerange.duration == 0:
+            prev -= 1
+        if (prev >= 0 and self.segments[prev].overlaps(segment)) or \
+                (pos < len(self.segments) and self.segments[pos].overlaps(segment)):
+            raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
+                                 .format(segment.target_timerange.start, segment.target_timerange.end))
+        return pos
+
     def add_segment(self, segment: Seg_type) -> "Track[Seg_type]":
         """向轨道中添加一个片段, 添加的片段必须匹配轨道类型且不与现有片段重叠
 
@@ -109,16 +134,41 @@ class Track(BaseTrack, Generic[Seg_type]):
             `TypeError`: 新片段类型与轨道类型不匹配
             `SegmentOverlap`: 新片段与现有片段重叠
         """
-        if not isinstance(segment, self.accept_segment_type):
-            raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
+        self._check_type(segment)
 
-        # 检查片段是否重叠
-        for seg in self.segments:
-            if seg.overlaps(segment):
+        pos = self._overlap_at(segment)
+        self.segments.insert(pos, segment)
+        self._starts.insert(pos, segment.target_timerange.start)
+        return self
+
+    def add_segments(self, segments: Iterable[Seg_type]) -> "Track[Seg_type]":
+        """向轨道中批量添加片段, 要求同`add_segment`; 任一片段不满足要求时不添加任何片段
+
+        Args:
+            segments (`Iterable[Seg_type]`): 要添加的片段, 顺序任意
+
+        Raises:
+            `TypeError`: 新片段类型与轨道类型不匹配
+            `SegmentOverlap`: 新片段与现有片段或彼此之间重叠
+        """
+        new_segments = sorted(segments, key=lambda seg: seg.target_timerange.start)
+        last_extent = None  # 之前的新片段中最后一个非零时长的片段, 理由同`_overlap_at`
+        for segment in new_segments:
+            self._check_type(segment)
+            if last_extent is not None and last_extent.overlaps(segment):
                 raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
                                      .format(segment.target_timerange.start, segment.target_timerange.end))
-
-        self.segments.append(segment)
+            self._overlap_at(segment)
+            if segment.target_timerange.duration > 0:
+                last_extent = segment
+
+        if len(self._starts) > 0 and len(new_segments) > 0 and new_segments[0].target_timerange.start < self._starts[-1]:
+            # 与现有片段交错, 合并两个有序序列
+            self.segments = sorted(self.segments + new_segments, key=lambda seg: seg.target_timerange.start)
+            self._starts = [seg.target_timerange.start for seg in self.segments]
+        else:
+            self.segments.extend(new_segments)
+            self._starts.extend(seg.target_timerange.start for seg in new_segments)
         return self
 
     def export_json(self) -> Dict[str, Any]:
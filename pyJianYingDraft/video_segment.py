@@ -6,7 +6,7 @@
 import uuid
 from copy import deepcopy
 
-from typing import Optional, Literal, Union
+from typing import Optional, Literal, Union, TYPE_CHECKING
 from typing import Dict, List, Tuple, Any
 
 from .time_util import tim, Timerange
@@ -14,10 +14,12 @@ from .segment import VisualSegment, ClipSettings, AudioFade
 from .local_materials import VideoMaterial
 from .animation import SegmentAnimations, VideoAnimation
 
-from .metadata import EffectMeta, EffectParamInstance
-from .metadata import MaskMeta, MaskType, FilterType, TransitionType
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType
+from .metadata import EffectMeta, EffectParamInstance, MaskMeta
+from . import metadata
+if TYPE_CHECKING:
+    from .metadata import MaskType, FilterType, TransitionType
+    from .metadata import IntroType, OutroType, GroupAnimationType
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType
 
 class Mask:
     """蒙版对象"""
@@ -98,7 +100,7 @@ class VideoEffect:
 
     adjust_params: List[EffectParamInstance]
 
-    def __init__(self, effect_meta: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def __init__(self, effect_meta: Union["VideoSceneEffectType", "VideoCharacterEffectType"],
                  params: Optional[List[Optional[float]]] = None, *,
                  apply_target_type: Literal[0, 2] = 0):
         """根据给定的特效元数据及参数列表构造一个视频特效对象, params的范围是0~100"""
@@ -109,9 +111,9 @@ class VideoEffect:
         self.resource_id = effect_meta.value.resource_id
         self.adjust_params = []
 
-        if isinstance(effect_meta, VideoSceneEffectType):
+        if metadata.is_member(effect_meta, "VideoSceneEffectType"):
             self.effect_type = "video_effect"
-        elif isinstance(effect_meta, VideoCharacterEffectType):
+        elif metadata.is_member(effect_meta, "VideoCharacterEffectType"):
             self.effect_type = "face_effect"
         else:
             raise TypeError("Invalid effect meta type %s" % type(effect_meta))
@@ -218,7 +220,7 @@ class Transition:
     is_overlap: bool
     """是否与上一个片段重叠(?)"""
 
-    def __init__(self, effect_meta: TransitionType, duration: Optional[int] = None):
+    def __init__(self, effect_meta: "TransitionType", duration: Optional[int] = None):
         """根据给定的转场元数据及持续时间构造一个转场对象"""
         self.name = effect_meta.value.name
         self.global_id = uuid.uuid4().hex
@@ -353,7 +355,7 @@ class VideoSegment(VisualSegment):
         self.background_filling = None
         self.fade = None
 
-    def add_animation(self, animation_type: Union[IntroType, OutroType, GroupAnimationType],
+    def add_animation(self, animation_type: Union["IntroType", "OutroType", "GroupAnimationType"],
                       duration: Optional[Union[int, str]] = None) -> "VideoSegment":
         """将给定的入场/出场/组合动画添加到此片段的动画列表中
 
@@ -364,13 +366,13 @@ class VideoSegment(VisualSegment):
         """
         if duration is not None:
             duration = tim(duration)
-        if isinstance(animation_type, IntroType):
+        if metadata.is_member(animation_type, "IntroType"):
             start = 0
             duration = duration or animation_type.value.duration
-        elif isinstance(animation_type, OutroType):
+        elif metadata.is_member(animation_type, "OutroType"):
             duration = duration or animation_type.value.duration
             start = self.target_timerange.duration - duration
-        elif isinstance(animation_type, GroupAnimationType):
+        elif metadata.is_member(animation_type, "GroupAnimationType"):
             start = 0
             duration = duration or self.target_timerange.duration
         else:
@@ -384,7 +386,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_effect(self, effect_type: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def add_effect(self, effect_type: Union["VideoSceneEffectType", "VideoCharacterEffectType"],
                    params: Optional[List[Optional[float]]] = None) -> "VideoSegment":
         """为视频片段添加一个作用于整个片段的特效
 
@@ -426,7 +428,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_filter(self, filter_type: FilterType, intensity: float = 100.0) -> "VideoSegment":
+    def add_filter(self, filter_type: "FilterType", intensity: float = 100.0) -> "VideoSegment":
         """为视频片段添加一个滤镜
 
         Args:
@@ -439,7 +441,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_mask(self, mask_type: MaskType, *, center_x: float = 0.0, center_y: float = 0.0, size: float = 0.5,
+    def add_mask(self, mask_type: "MaskType", *, center_x: float = 0.0, center_y: float = 0.0, size: float = 0.5,
                  rotation: float = 0.0, feather: float = 0.0, invert: bool = False,
                  rect_width: Optional[float] = None, round_corner: Optional[float] = None) -> "VideoSegment":
         """为视频片段添加蒙版
@@ -459,6 +461,8 @@ class VideoSegment(VisualSegment):
             `ValueError`: 试图添加多个蒙版或不正确地设置了`rect_width`及`round_corner`
         """
 
+        from .metadata import MaskType
+
         if self.mask is not None:
             raise ValueError("当前片段已有蒙版, 不能再添加新的蒙版")
         if (rect_width is not None or round_corner is not None) and mask_type != MaskType.矩形:
@@ -475,7 +479,7 @@ class VideoSegment(VisualSegment):
         self.extra_material_refs.append(self.mask.global_id)
         return self
 
-    def add_transition(self, transition_type: TransitionType, *, duration: Optional[Union[int, str]] = None) -> "VideoSegment":
+    def add_transition(self, transition_type: "TransitionType", *, duration: Optional[Union[int, str]] = None) -> "VideoSegment":
         """为视频片段添加转场, 注意转场应当添加在**前面的**片段上
 
         Args:
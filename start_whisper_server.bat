@@ -0,0 +1,22 @@
+@echo off
+chcp 65001 >nul
+title Whisper Model Server
+cd /d "%~dp0"
+set PYTHONIOENCODING=utf-8
+echo ============================================
+echo   Whisper Model Server
+echo ============================================
+echo.
+echo Models stay loaded between runs.
+echo Set "whisper.server.enabled" to true in translation_config.json
+echo.
+echo Press Ctrl+C to stop the server
+echo ============================================
+echo.
+python whisper_server.py --preload
+if errorlevel 1 (
+    echo.
+    echo [Error] Server failed to start
+    echo.
+    pause
+)
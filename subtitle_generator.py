@@ -7,11 +7,16 @@
 
 import os
 import json
+import time
+import threading
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Union, Generator
+from typing import Callable, List, Optional, Union, Generator
 import re
 
+from translation_memory import TranslationMemory, normalize_source
+from pipeline_telemetry import current_recorder
+
 
 @dataclass
 class SubtitleEntry:
@@ -38,6 +43,48 @@ class SubtitleEntry:
         return self.end_time_us - self.start_time_us
 
 
+class _ProgressRelay:
+    """
+    在背景執行緒呼叫 on_progress
+
+    翻譯引擎的 on_result 在事件迴圈執行緒執行；進度保存（寫檔、journal commit）放在這裡做，
+    才不會卡住其他請求。尚未處理的多次通知會合併成一次。
+    """
+
+    def __init__(self, callback: Callable[[], None]):
+        self.callback = callback
+        self._condition = threading.Condition()
+        self._pending = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="translate-progress", daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        with self._condition:
+            self._pending = True
+            self._condition.notify()
+
+    def close(self):
+        """處理完尚未處理的通知後結束"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                self._pending = False
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"   [Warning] 保存翻譯進度失敗: {e}")
+
+
 class SubtitleGenerator:
     """
     字幕生成器 - Whisper 語音識別
@@ -60,7 +107,17 @@ class SubtitleGenerator:
                 "min_speech_duration_ms": 250,
                 "min_silence_duration_ms": 100
             },
-            "max_words_per_segment": 8
+            "max_words_per_segment": 8,
+            "split_punctuation": ".?!,", # 遇到這些結尾標點就斷句
+            "server": {                  # 常駐模型伺服器 (whisper_server.py)
+                "enabled": false,
+                "host": "127.0.0.1",
+                "port": 8770
+            },
+            "cache": {                   # 轉錄快取 (音訊雜湊 + 轉錄設定)
+                "enabled": true,
+                "folder": "cache/transcripts"
+            }
         }
     }
     """
@@ -68,16 +125,24 @@ class SubtitleGenerator:
     # 支援的引擎列表
     SUPPORTED_ENGINES = ["openai-whisper", "faster-whisper"]
 
+    # 預設斷句標點
+    DEFAULT_SPLIT_PUNCTUATION = ".?!,"
+
     # 預設 compute_type 對應
     DEFAULT_COMPUTE_TYPES = {
         "cuda": "float16",
         "cpu": "int8"
     }
 
-    def __init__(self, config_path: str = "translation_config.json"):
-        self.config = self._load_config(config_path)
+    # 翻譯 prompt 版本（修改 prompt 或解析方式時遞增，翻譯記憶隨之失效）
+    TRANSLATION_PROMPT_VERSION = "3"
+
+    def __init__(self, config_path: str = "translation_config.json", config: Optional[dict] = None):
+        self.config = config if config is not None else self._load_config(config_path)
         self.whisper_model = None
         self._engine = None  # 實際使用的引擎
+        self._transcription_cache = None
+        self._translation_memory = None
 
     def _load_config(self, config_path: str) -> dict:
         """載入設定檔"""
@@ -151,6 +216,10 @@ class SubtitleGenerator:
         try:
             import whisper
 
+            device_index = self.config.get("whisper", {}).get("device_index")
+            if device == "cuda" and device_index is not None:
+                device = f"cuda:{device_index}"
+
             self.whisper_model = whisper.load_model(model_name, device=device)
             print(f"[OK] OpenAI Whisper 模型載入完成 (device: {device})")
 
@@ -168,12 +237,14 @@ class SubtitleGenerator:
             # 取得額外參數
             cpu_threads = whisper_config.get("cpu_threads", 0)  # 0 = 自動
             num_workers = whisper_config.get("num_workers", 1)
+            device_index = whisper_config.get("device_index", 0)  # 多 GPU 時指定顯示卡
 
             print(f"   compute_type: {compute_type}")
 
             self.whisper_model = WhisperModel(
                 model_name,
                 device=device,
+                device_index=device_index,
                 compute_type=compute_type,
                 cpu_threads=cpu_threads,
                 num_workers=num_workers
@@ -184,128 +255,254 @@ class SubtitleGenerator:
             print("[Error] 請先安裝 faster-whisper: pip install faster-whisper")
             raise
 
-    def transcribe(self, video_path: str, language: str = None) -> List[SubtitleEntry]:
+    def transcribe(self, video_path: str, language: str = None,
+                   audio_path: str = None) -> List[SubtitleEntry]:
         """
         使用 Whisper 轉錄影片
 
         Args:
             video_path: 影片路徑
             language: 語言代碼 (預設從設定檔讀取)
+            audio_path: 預先解碼的 16kHz int16 PCM 檔（見 audio_prefetch.py），可省略
 
         Returns:
             字幕條目列表
         """
+        entries = list(self.iter_transcribe(video_path, language, audio_path))
+        print(f"[OK] 識別完成，共 {len(entries)} 條字幕")
+        return entries
+
+    def iter_transcribe(self, video_path: str, language: str = None,
+                        audio_path: str = None) -> Generator[SubtitleEntry, None, None]:
+        """
+        使用 Whisper 轉錄影片，邊解碼邊產出字幕條目
+
+        faster-whisper 本地轉錄時，每個 segment 解碼完成即斷句產出，
+        呼叫端可以在轉錄進行中就開始翻譯已完成的部分。
+
+        Args:
+            video_path: 影片路徑
+            language: 語言代碼 (預設從設定檔讀取)
+            audio_path: 預先解碼的 PCM 檔；有提供時模型與音訊雜湊都直接使用，不再解碼影片
+
+        Yields:
+            字幕條目（index 依序遞增）
+        """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"找不到影片: {video_path}")
 
         print(f"[Audio] 開始語音識別: {os.path.basename(video_path)}")
 
+        whisper_config = self.config.get("whisper", {})
+        lang = language or whisper_config.get("language", "en")
+
+        # 轉錄快取（音訊內容雜湊 + 轉錄設定）
+        cache = self._get_transcription_cache()
+        cache_key = None
+        segments = None
+        if cache is not None:
+            settings = cache.transcribe_settings(whisper_config, lang)
+            cache_key = cache.cache_key(video_path, settings, pcm_path=audio_path)
+            segments = cache.load(cache_key)
+            if segments is not None:
+                print(f"   使用轉錄快取: {cache_key[:12]}")
+
+        recorded = None
+        if segments is None:
+            # 優先使用常駐模型伺服器（模型已預熱，省去載入時間）
+            segments = self._transcribe_via_server(video_path, lang, audio_path)
+        if segments is None:
+            # 本地模型：邊解碼邊斷句，同時記錄原始 segments 供快取
+            recorded = []
+            segments = self._record_segments(self.iter_transcribe_raw(video_path, lang, audio_path), recorded)
+        elif cache is not None and cache_key is not None and not cache.has(cache_key):
+            cache.save(cache_key, segments, settings)
+
+        segmentation = self.segmentation_settings()
+        print(f"   每段最大字數: {segmentation['max_words_per_segment']}")
+        yield from self._iter_entries(segments, **segmentation)
+
+        if recorded is not None and cache is not None:
+            cache.save(cache_key, recorded, settings)
+
+    @staticmethod
+    def _record_segments(segments, recorded: list):
+        """轉發 segments 並同時記錄到 recorded"""
+        for segment in segments:
+            recorded.append(segment)
+            yield segment
+
+    def resegment(self, video_path: str, max_words_per_segment: int = None,
+                  split_punctuation: str = None, language: str = None) -> List[SubtitleEntry]:
+        """
+        由轉錄快取的 word timestamps 重新斷句（不需要載入模型）
+
+        Args:
+            video_path: 影片路徑（用於查詢快取）
+            max_words_per_segment: 每段最大字數 (預設從設定檔讀取)
+            split_punctuation: 斷句標點 (預設從設定檔讀取)
+            language: 語言代碼 (預設從設定檔讀取)
+
+        Returns:
+            字幕條目列表
+
+        Raises:
+            LookupError: 快取中沒有此影片的轉錄結果
+        """
+        cache = self._get_transcription_cache()
+        if cache is None:
+            raise LookupError("轉錄快取未啟用 (whisper.cache.enabled)")
+
+        whisper_config = self.config.get("whisper", {})
+        lang = language or whisper_config.get("language", "en")
+        settings = cache.transcribe_settings(whisper_config, lang)
+        segments = cache.load(cache.cache_key(video_path, settings))
+        if segments is None:
+            raise LookupError(f"找不到轉錄快取，請先執行轉錄: {os.path.basename(video_path)}")
+
+        segmentation = self.segmentation_settings()
+        if max_words_per_segment is not None:
+            segmentation["max_words_per_segment"] = max_words_per_segment
+        if split_punctuation is not None:
+            segmentation["split_punctuation"] = split_punctuation
+
+        return self._process_segments(segments, **segmentation)
+
+    def _get_transcription_cache(self):
+        """取得轉錄快取（延遲建立，停用時返回 None）"""
+        if self._transcription_cache is None:
+            from transcription_cache import TranscriptionCache
+            self._transcription_cache = TranscriptionCache.from_config(self.config.get("whisper", {})) or False
+        return self._transcription_cache or None
+
+    def segmentation_settings(self) -> dict:
+        """斷句設定（變更後已輸出的字幕需要重新斷句）"""
+        whisper_config = self.config.get("whisper", {})
+        return {
+            "max_words_per_segment": whisper_config.get("max_words_per_segment", 8),
+            "split_punctuation": whisper_config.get("split_punctuation", self.DEFAULT_SPLIT_PUNCTUATION)
+        }
+
+    def _transcribe_via_server(self, video_path: str, language: str,
+                               audio_path: str = None) -> Optional[List[dict]]:
+        """
+        透過常駐 Whisper 模型伺服器轉錄
+
+        Returns:
+            segment dict 列表（與 openai-whisper 格式相同），
+            伺服器未啟用或無法連線時返回 None（改用本地模型）
+        """
+        server_config = self.config.get("whisper", {}).get("server", {})
+        if not server_config.get("enabled", False):
+            return None
+
+        from whisper_server import WhisperServerClient, WhisperServerUnavailable
+
+        client = WhisperServerClient(
+            host=server_config.get("host", "127.0.0.1"),
+            port=server_config.get("port", 8770),
+            timeout=server_config.get("timeout", 3600)
+        )
+        try:
+            segments = client.transcribe(
+                os.path.abspath(video_path),
+                language,
+                self.config.get("whisper", {}),
+                audio_path=os.path.abspath(audio_path) if audio_path else None
+            )
+        except WhisperServerUnavailable as e:
+            print(f"[Warning] Whisper 伺服器無法使用，改用本地模型: {e}")
+            return None
+
+        print(f"   使用 Whisper 伺服器: {client.host}:{client.port}")
+        return segments
+
+    def transcribe_raw(self, video_path: str, language: str = None, audio_path: str = None) -> List[dict]:
+        """
+        使用本地模型轉錄並返回原始 segments（含 word-level timestamps）
+
+        格式統一為 openai-whisper 的 dict 結構:
+        [{"start", "end", "text", "words": [{"word", "start", "end", "probability"}]}]
+        """
+        return list(self.iter_transcribe_raw(video_path, language, audio_path))
+
+    def iter_transcribe_raw(self, video_path: str, language: str = None,
+                            audio_path: str = None) -> Generator[dict, None, None]:
+        """使用本地模型轉錄，逐一產出原始 segment（faster-whisper 為邊解碼邊產出）"""
         # 載入模型（會設定 self._engine）
         self._load_whisper_model()
         lang = language or self.config.get("whisper", {}).get("language", "en")
 
+        # 有預先解碼的 PCM 時直接交給模型，省去模型內部的解碼與重取樣
+        audio = video_path
+        if audio_path:
+            from audio_prefetch import load_pcm
+            audio = load_pcm(str(audio_path))
+
         # 根據引擎選擇轉錄方法
         if self._engine == "faster-whisper":
-            entries = self._transcribe_faster(video_path, lang)
+            yield from self._transcribe_faster(audio, lang)
         else:
-            entries = self._transcribe_openai(video_path, lang)
-
-        print(f"[OK] 識別完成，共 {len(entries)} 條字幕")
-        return entries
+            yield from self._transcribe_openai(audio, lang)
 
-    def _transcribe_openai(self, video_path: str, language: str) -> List[SubtitleEntry]:
+    def _transcribe_openai(self, audio, language: str) -> List[dict]:
         """
         使用 OpenAI Whisper 轉錄
 
         Args:
-            video_path: 影片路徑
+            audio: 影片路徑或 16kHz float32 音訊陣列
             language: 語言代碼
 
         Returns:
-            字幕條目列表
+            原始 segment dict 列表
         """
-        max_words_per_segment = self.config.get("whisper", {}).get("max_words_per_segment", 8)
-
         print(f"   語言: {language}")
-        print(f"   每段最大字數: {max_words_per_segment}")
 
         # OpenAI Whisper 轉錄
         result = self.whisper_model.transcribe(
-            video_path,
+            audio,
             language=language,
             task="transcribe",
             verbose=False,
             word_timestamps=True
         )
 
-        # 轉換為 SubtitleEntry 列表
-        return self._process_openai_segments(
-            result.get("segments", []),
-            max_words_per_segment
-        )
-
-    def _process_openai_segments(self, segments: list, max_words_per_segment: int) -> List[SubtitleEntry]:
-        """
-        處理 OpenAI Whisper 的 segments
-
-        Args:
-            segments: Whisper 返回的 segments 列表
-            max_words_per_segment: 每段最大字數
-
-        Returns:
-            字幕條目列表
-        """
-        entries = []
-        entry_index = 1
-
-        for segment in segments:
-            words = segment.get("words", [])
-
-            if not words:
-                # 如果沒有 word-level timestamps，使用整個 segment
-                entry = SubtitleEntry(
-                    index=entry_index,
-                    start_time=segment["start"],
-                    end_time=segment["end"],
-                    text_original=segment["text"].strip()
-                )
-                entries.append(entry)
-                entry_index += 1
-            else:
-                # 分割成較短的句子
-                sub_entries = self._split_words_into_entries(
-                    words,
-                    entry_index,
-                    max_words_per_segment,
-                    word_text_key="word",
-                    fallback_start=segment["start"],
-                    fallback_end=segment["end"]
-                )
-                entries.extend(sub_entries)
-                entry_index += len(sub_entries)
-
-        return entries
+        return [
+            {
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"],
+                "words": [
+                    {
+                        "word": w["word"],
+                        "start": w["start"],
+                        "end": w["end"],
+                        "probability": w.get("probability", 1.0)
+                    }
+                    for w in segment.get("words", [])
+                ]
+            }
+            for segment in result.get("segments", [])
+        ]
 
-    def _transcribe_faster(self, video_path: str, language: str) -> List[SubtitleEntry]:
+    def _transcribe_faster(self, audio, language: str) -> Generator[dict, None, None]:
         """
         使用 Faster Whisper 轉錄
 
         Args:
-            video_path: 影片路徑
+            audio: 影片路徑或 16kHz float32 音訊陣列
             language: 語言代碼
 
-        Returns:
-            字幕條目列表
+        Yields:
+            原始 segment dict（解碼完成一個就產出一個）
         """
         whisper_config = self.config.get("whisper", {})
-        max_words_per_segment = whisper_config.get("max_words_per_segment", 8)
 
         # VAD 設定
         vad_filter = whisper_config.get("vad_filter", False)
         vad_parameters = whisper_config.get("vad_parameters", None)
 
         print(f"   語言: {language}")
-        print(f"   每段最大字數: {max_words_per_segment}")
         print(f"   VAD 過濾: {'啟用' if vad_filter else '停用'}")
 
         # 準備轉錄參數
@@ -322,72 +519,81 @@ class SubtitleGenerator:
 
         # Faster Whisper 轉錄（返回 generator）
         segments_generator, info = self.whisper_model.transcribe(
-            video_path,
+            audio,
             **transcribe_options
         )
 
         print(f"   偵測語言: {info.language} (機率: {info.language_probability:.2%})")
 
-        # 處理 segments generator
-        return self._process_faster_segments(
-            segments_generator,
-            max_words_per_segment
-        )
+        # 實際解碼在消耗 generator 時進行
+        for segment in segments_generator:
+            yield self._faster_segment_to_dict(segment)
+
+    @staticmethod
+    def _faster_segment_to_dict(segment) -> dict:
+        """將 faster-whisper Segment 物件轉換為 dict 格式"""
+        return {
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text,
+            "words": [
+                {
+                    "word": w.word,
+                    "start": w.start,
+                    "end": w.end,
+                    "probability": getattr(w, "probability", 1.0)
+                }
+                for w in (segment.words or [])
+            ]
+        }
 
-    def _process_faster_segments(self, segments_generator, max_words_per_segment: int) -> List[SubtitleEntry]:
+    def _process_segments(self, segments: list, max_words_per_segment: int,
+                          split_punctuation: str = DEFAULT_SPLIT_PUNCTUATION) -> List[SubtitleEntry]:
         """
-        處理 Faster Whisper 的 segments generator
+        將原始 segments 斷句為字幕條目
 
         Args:
-            segments_generator: Faster Whisper 返回的 segments generator
+            segments: 原始 segment dict 列表
             max_words_per_segment: 每段最大字數
+            split_punctuation: 斷句標點
 
         Returns:
             字幕條目列表
         """
-        entries = []
+        return list(self._iter_entries(segments, max_words_per_segment, split_punctuation))
+
+    def _iter_entries(self, segments, max_words_per_segment: int,
+                      split_punctuation: str = DEFAULT_SPLIT_PUNCTUATION) -> Generator[SubtitleEntry, None, None]:
+        """逐一斷句 segments（可為 generator），每個 segment 處理完即產出其字幕條目"""
         entry_index = 1
 
-        for segment in segments_generator:
-            # faster-whisper segment 有 .words 屬性（可能為 None）
-            words = segment.words
+        for segment in segments:
+            words = segment.get("words", [])
 
             if not words:
                 # 如果沒有 word-level timestamps，使用整個 segment
                 entry = SubtitleEntry(
                     index=entry_index,
-                    start_time=segment.start,
-                    end_time=segment.end,
-                    text_original=segment.text.strip()
+                    start_time=segment["start"],
+                    end_time=segment["end"],
+                    text_original=segment["text"].strip()
                 )
-                entries.append(entry)
+                yield entry
                 entry_index += 1
             else:
-                # 轉換 faster-whisper Word 物件為 dict 格式
-                words_list = [
-                    {
-                        "word": w.word,
-                        "start": w.start,
-                        "end": w.end,
-                        "probability": getattr(w, "probability", 1.0)
-                    }
-                    for w in words
-                ]
-
                 # 分割成較短的句子
                 sub_entries = self._split_words_into_entries(
-                    words_list,
+                    words,
                     entry_index,
                     max_words_per_segment,
                     word_text_key="word",
-                    fallback_start=segment.start,
-                    fallback_end=segment.end
+                    fallback_start=segment["start"],
+                    fallback_end=segment["end"],
+                    split_punctuation=split_punctuation
                 )
-                entries.extend(sub_entries)
+                yield from sub_entries
                 entry_index += len(sub_entries)
 
-        return entries
-
     def _split_words_into_entries(
         self,
         words: list,
@@ -395,7 +601,8 @@ class SubtitleGenerator:
         max_words_per_segment: int,
         word_text_key: str = "word",
         fallback_start: float = 0.0,
-        fallback_end: float = 0.0
+        fallback_end: float = 0.0,
+        split_punctuation: str = DEFAULT_SPLIT_PUNCTUATION
     ) -> List[SubtitleEntry]:
         """
         將 word 列表分割成較短的字幕條目
@@ -407,6 +614,7 @@ class SubtitleGenerator:
             word_text_key: word dict 中文字的 key
             fallback_start: 備用開始時間
             fallback_end: 備用結束時間
+            split_punctuation: 斷句標點（word 以其中任一字元結尾時斷句）
 
         Returns:
             字幕條目列表
@@ -415,6 +623,7 @@ class SubtitleGenerator:
         entry_index = start_index
         current_words = []
         current_start = None
+        split_endings = tuple(split_punctuation)
 
         for word in words:
             if current_start is None:
@@ -426,7 +635,7 @@ class SubtitleGenerator:
             # 檢查是否需要分割
             should_split = (
                 len(current_words) >= max_words_per_segment or
-                word_text.rstrip().endswith(('.', '?', '!', ','))
+                word_text.rstrip().endswith(split_endings)
             )
 
             if should_split and current_words:
@@ -458,13 +667,15 @@ class SubtitleGenerator:
         return entries
 
     def translate_entries(self, entries: List[SubtitleEntry],
-                          target_lang: str = None) -> List[SubtitleEntry]:
+                          target_lang: str = None,
+                          on_progress: Optional[Callable[[], None]] = None) -> List[SubtitleEntry]:
         """
         翻譯字幕條目
 
         Args:
             entries: 字幕條目列表
             target_lang: 目標語言 (預設從設定檔讀取)
+            on_progress: 每完成一批翻譯時呼叫（在背景執行緒，不在翻譯引擎的事件迴圈上），供呼叫端保存進度
 
         Returns:
             翻譯後的字幕條目列表
@@ -479,62 +690,90 @@ class SubtitleGenerator:
         print(f"   目標語言: {target}")
         print(f"   字幕數量: {len(entries)}")
 
+        memory = self._get_translation_memory()
+        if memory is None:
+            self._translate_with_provider(provider, entries, target, on_progress)
+            return entries
+
+        # 先查翻譯記憶，只把未命中的原文送出（同一原文只送一次）
+        model = self._translation_model(provider)
+        version = self.TRANSLATION_PROMPT_VERSION
+        sources = [normalize_source(e.text_original) for e in entries]
+        hits = memory.lookup(sources, target, model, version)
+
+        representatives = {}
+        for entry, source in zip(entries, sources):
+            if source in hits:
+                entry.text_translated = hits[source]
+            elif source:
+                representatives.setdefault(source, entry)
+
+        print(f"   翻譯記憶命中: {sum(1 for s in sources if s in hits)}/{len(entries)}")
+
+        misses = list(representatives.values())
+        if misses:
+            self._translate_with_provider(provider, misses, target, on_progress)
+
+        learned = {
+            source: entry.text_translated
+            for source, entry in representatives.items()
+            if entry.text_translated and entry.text_translated.strip()
+            and entry.text_translated != entry.text_original
+        }
+        memory.store(learned, target, model, version)
+
+        for entry, source in zip(entries, sources):
+            if source in representatives and entry is not representatives[source]:
+                entry.text_translated = representatives[source].text_translated
+
+        return entries
+
+    def _translate_with_provider(self, provider: str, entries: List[SubtitleEntry], target: str,
+                                 on_progress: Optional[Callable[[], None]] = None):
+        """依 provider 翻譯（直接修改 entries）"""
         if provider == "openai":
-            entries = self._translate_with_openai(entries, target)
+            self._translate_with_openai(entries, target, on_progress)
         elif provider == "deepseek":
-            entries = self._translate_with_deepseek(entries, target)
+            self._translate_with_deepseek(entries, target, on_progress)
         elif provider == "google":
-            entries = self._translate_with_google(entries, target)
+            self._translate_with_google(entries, target, on_progress)
         else:
             print(f"[Warning]  不支援的翻譯提供者: {provider}，跳過翻譯")
 
-        return entries
+    def _translation_model(self, provider: str) -> str:
+        """翻譯記憶使用的模型名稱"""
+        if provider == "deepseek":
+            return "deepseek:" + self.config.get("translation", {}).get("model", "deepseek-chat")
+        if provider == "openai":
+            return "openai:gpt-3.5-turbo"
+        return provider
 
-    def _translate_with_openai(self, entries: List[SubtitleEntry],
-                                target_lang: str) -> List[SubtitleEntry]:
+    def _get_translation_memory(self):
+        """取得翻譯記憶（延遲建立，停用時返回 None）"""
+        if self._translation_memory is None:
+            self._translation_memory = TranslationMemory.from_config(self.config.get("translation", {})) or False
+        return self._translation_memory or None
+
+    def _translate_with_openai(self, entries: List[SubtitleEntry], target_lang: str,
+                               on_progress: Optional[Callable[[], None]] = None) -> List[SubtitleEntry]:
         """使用 OpenAI API 翻譯"""
         try:
-            from openai import OpenAI
+            from translation_engine import get_engine
 
-            api_key_env = self.config.get("translation", {}).get("api_key_env", "OPENAI_API_KEY")
+            translation_config = self.config.get("translation", {})
+            api_key_env = translation_config.get("api_key_env", "OPENAI_API_KEY")
             api_key = os.environ.get(api_key_env)
 
             if not api_key:
                 print(f"[Warning]  未設定 {api_key_env} 環境變數，跳過翻譯")
                 return entries
 
-            client = OpenAI(api_key=api_key)
-
-            # 批量翻譯 (每批最多 20 條)
-            batch_size = 20
-            for i in range(0, len(entries), batch_size):
-                batch = entries[i:i + batch_size]
-                texts = [e.text_original for e in batch]
-
-                prompt = f"""將以下英文字幕翻譯成繁體中文（台灣用語）。
-保持原有的編號格式，每行一條翻譯。
-只輸出翻譯結果，不要加任何解釋。
-
-{chr(10).join([f"{j+1}. {t}" for j, t in enumerate(texts)])}"""
-
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.3
-                )
-
-                # 解析翻譯結果
-                translated_text = response.choices[0].message.content
-                lines = translated_text.strip().split('\n')
-
-                for j, line in enumerate(lines):
-                    if j < len(batch):
-                        # 移除編號前綴
-                        clean_text = re.sub(r'^\d+\.\s*', '', line.strip())
-                        batch[j].text_translated = clean_text
-
-                print(f"   翻譯進度: {min(i + batch_size, len(entries))}/{len(entries)}")
+            engine = get_engine(api_key, None, translation_config)
+            instruction = "將以下英文字幕翻譯成繁體中文（台灣用語）。"
 
+            # 每批最多 20 條（同時受 token_budget 限制）
+            self._translate_in_batches(engine, entries, "gpt-3.5-turbo", instruction, max_entries=20,
+                                       on_progress=on_progress)
             print("[OK] 翻譯完成")
 
         except ImportError:
@@ -544,12 +783,11 @@ class SubtitleGenerator:
 
         return entries
 
-    def _translate_with_deepseek(self, entries: List[SubtitleEntry],
-                                  target_lang: str) -> List[SubtitleEntry]:
-        """使用 DeepSeek API 翻譯 (兼容 OpenAI SDK) - 並行優化版"""
+    def _translate_with_deepseek(self, entries: List[SubtitleEntry], target_lang: str,
+                                 on_progress: Optional[Callable[[], None]] = None) -> List[SubtitleEntry]:
+        """使用 DeepSeek API 翻譯 (兼容 OpenAI SDK) - 共用非同步引擎"""
         try:
-            from openai import OpenAI
-            from concurrent.futures import ThreadPoolExecutor, as_completed
+            from translation_engine import get_engine
 
             translation_config = self.config.get("translation", {})
             # 優先使用 config 中的 api_key，否則從環境變數讀取
@@ -561,62 +799,15 @@ class SubtitleGenerator:
                 print(f"[Warning]  未設定 API Key，跳過翻譯")
                 return entries
 
-            client = OpenAI(api_key=api_key, base_url=base_url)
-
-            # 優化參數
-            batch_size = translation_config.get("batch_size", 50)  # 增加到 50
-            max_workers = translation_config.get("max_workers", 3)  # 並行 3 個請求
-
-            # 準備所有批次
-            batches = []
-            for i in range(0, len(entries), batch_size):
-                batch = entries[i:i + batch_size]
-                batches.append((i, batch))
-
-            print(f"   批次大小: {batch_size}, 並行數: {max_workers}, 總批次: {len(batches)}")
-
-            def translate_batch(batch_info):
-                """翻譯單一批次"""
-                batch_idx, batch = batch_info
-                texts = [e.text_original for e in batch]
-
-                prompt = f"""翻譯成繁體中文（台灣用語），每行一條，只輸出翻譯：
-
-{chr(10).join([f"{j+1}. {t}" for j, t in enumerate(texts)])}"""
-
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.3
-                )
-
-                translated_text = response.choices[0].message.content
-                lines = translated_text.strip().split('\n')
-
-                results = []
-                for j, line in enumerate(lines):
-                    if j < len(batch):
-                        clean_text = re.sub(r'^\d+\.\s*', '', line.strip())
-                        results.append((batch_idx + j, clean_text))
-
-                return results
-
-            # 並行翻譯
-            completed = 0
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(translate_batch, b): b for b in batches}
-
-                for future in as_completed(futures):
-                    try:
-                        results = future.result()
-                        for idx, text in results:
-                            if idx < len(entries):
-                                entries[idx].text_translated = text
-                        completed += len(futures[future][1])
-                        print(f"   翻譯進度: {completed}/{len(entries)}")
-                    except Exception as e:
-                        print(f"   [Warning] 批次翻譯失敗: {e}")
+            # 整個行程共用同一個引擎（連線池 + 並行上限）
+            engine = get_engine(api_key, base_url, translation_config)
+            instruction = "翻譯成繁體中文（台灣用語）："
 
+            self._translate_in_batches(
+                engine, entries, model, instruction,
+                max_entries=translation_config.get("batch_size", 50),
+                on_progress=on_progress
+            )
             print("[OK] 翻譯完成")
 
         except ImportError:
@@ -626,8 +817,220 @@ class SubtitleGenerator:
 
         return entries
 
-    def _translate_with_google(self, entries: List[SubtitleEntry],
-                                target_lang: str) -> List[SubtitleEntry]:
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """粗估 token 數：拉丁字母約 4 字元 1 token，CJK 約 1 字 1 token"""
+        cjk = sum(1 for ch in text if ord(ch) >= 0x2E80)
+        return cjk + (len(text) - cjk + 3) // 4
+
+    def _plan_translation_batches(self, entries: List[SubtitleEntry], token_budget: int,
+                                  max_entries: int) -> List[List[SubtitleEntry]]:
+        """
+        依估計 token 數分批
+
+        每批累加到 token_budget 或 max_entries 為止；單條超過預算時獨立成一批。
+        """
+        batches: List[List[SubtitleEntry]] = []
+        current: List[SubtitleEntry] = []
+        current_tokens = 0
+
+        for entry in entries:
+            # 編號前綴與換行約 3 token
+            tokens = self._estimate_tokens(entry.text_original) + 3
+            if current and (current_tokens + tokens > token_budget or len(current) >= max_entries):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(entry)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    # 要求模型以 JSON 回傳，以字幕編號對應翻譯
+    JSON_OUTPUT_INSTRUCTION = (
+        '以 JSON 物件輸出，key 為字幕編號、value 為該條翻譯，例如 {"1": "...", "2": "..."}。'
+        "每個編號都要有翻譯，不要合併或拆分字幕，不要加任何解釋。"
+    )
+
+    _NUMBERED_LINE = re.compile(r'^\s*(\d+)\s*[.、:：)]\s*(.*)$')
+    _CODE_FENCE = re.compile(r'^\s*```[\w-]*\s*$', re.MULTILINE)
+
+    @staticmethod
+    def _json_translation_items(data) -> list:
+        """{"1": "..."}、[{"index": 1, "text": "..."}] 或包一層的 {"translations": [...]} -> [(編號, 翻譯)]"""
+        if isinstance(data, dict) and len(data) == 1 and isinstance(next(iter(data.values())), (dict, list)):
+            data = next(iter(data.values()))
+        if isinstance(data, dict):
+            return list(data.items())
+        if isinstance(data, list):
+            return [
+                (item.get("index", item.get("i", item.get("id"))),
+                 item.get("text", item.get("t", item.get("translation"))))
+                for item in data if isinstance(item, dict)
+            ]
+        return []
+
+    @classmethod
+    def _parse_indexed_translations(cls, content: str, expected: List[int]) -> dict:
+        """
+        解析模型回應，返回 {編號: 翻譯}
+
+        優先解析 JSON（{"1": "..."} 或 [{"index": 1, "text": "..."}]，可包在 ``` 程式碼區塊中），
+        失敗時退回「編號. 翻譯」逐行解析；只保留預期編號且內容非空的項目。
+        """
+        parsed = {}
+        text = cls._CODE_FENCE.sub('', content).strip()
+
+        # 整段 JSON -> 最外層 [...] -> 最外層 {...}（陣列優先，避免單一元素陣列被當成物件）
+        candidates = [text]
+        for opener, closer in (('[', ']'), ('{', '}')):
+            start, end = text.find(opener), text.rfind(closer)
+            if start != -1 and end > start:
+                candidates.append(text[start:end + 1])
+
+        items = []
+        for candidate in candidates:
+            try:
+                items = cls._json_translation_items(json.loads(candidate))
+            except ValueError:
+                continue
+            if items:
+                break
+        if not items:
+            for line in text.split('\n'):
+                match = cls._NUMBERED_LINE.match(line)
+                if match:
+                    items.append((match.group(1), match.group(2)))
+
+        wanted = set(expected)
+        for key, value in items:
+            try:
+                index = int(key)
+            except (TypeError, ValueError):
+                continue
+            if index in wanted and isinstance(value, str) and value.strip():
+                parsed[index] = value.strip()
+        return parsed
+
+    def _build_translation_request(self, model: str, instruction: str,
+                                   items: List[tuple], context: List[SubtitleEntry]) -> dict:
+        """建立單一批次的 chat 請求；items 為 (編號, 條目)"""
+        lines = "\n".join(f"{index}. {entry.text_original}" for index, entry in items)
+        prompt = f"{instruction}\n{self.JSON_OUTPUT_INSTRUCTION}\n\n"
+        if context:
+            context_text = "\n".join(e.text_original for e in context)
+            prompt += f"前文（僅供參考，不需翻譯）：\n{context_text}\n\n要翻譯的字幕：\n"
+        prompt += lines
+
+        request = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3
+        }
+        if self.config.get("translation", {}).get("json_mode", True):
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    def _translate_in_batches(self, engine, entries: List[SubtitleEntry], model: str,
+                              instruction: str, max_entries: int,
+                              on_progress: Optional[Callable[[], None]] = None):
+        """
+        依 token 預算分批、附帶前文後透過翻譯引擎並行送出，並回報各批 token 與延遲
+
+        前一批最後 context_overlap 條原文會放在「前文」區塊，只供模型理解語境，不需翻譯。
+        回應以編號驗證；缺漏或格式錯誤的編號會在下一輪只針對那幾條重新請求
+        （最多 repair_rounds 輪），不會整批重翻。
+        """
+        translation_config = self.config.get("translation", {})
+        token_budget = translation_config.get("token_budget", 1500)
+        overlap = translation_config.get("context_overlap", 2)
+        repair_rounds = translation_config.get("repair_rounds", 2)
+
+        batches = self._plan_translation_batches(entries, token_budget, max_entries)
+        print(f"   Token 預算: {token_budget}, 條數上限: {max_entries}, 前文: {overlap}, "
+              f"總批次: {len(batches)}, 並行上限: {engine.snapshot()['limit']}")
+
+        # 每個工作單位: (批次編號, [(編號, 條目)], 前文)
+        jobs = []
+        previous: List[SubtitleEntry] = []
+        for number, batch in enumerate(batches):
+            context = previous[-overlap:] if overlap > 0 else []
+            jobs.append((number, list(enumerate(batch, start=1)), context))
+            previous = batch
+
+        progress = {"completed": 0}
+        total = len(entries)
+        started = time.monotonic()
+        all_results = []
+        # 在 pipeline 中執行時，每批的延遲與 token 記錄到該影片的遙測
+        recorder = current_recorder()
+        relay = _ProgressRelay(on_progress) if on_progress is not None else None
+
+        try:
+            for round_number in range(repair_rounds + 1):
+                if not jobs:
+                    break
+                if round_number > 0:
+                    missing = sum(len(items) for _, items, _ in jobs)
+                    print(f"   [Retry] 第 {round_number} 輪補翻: {missing} 條缺漏/格式錯誤")
+
+                requests = [self._build_translation_request(model, instruction, items, context)
+                            for _, items, context in jobs]
+                estimates = [self._estimate_tokens(r["messages"][0]["content"]) for r in requests]
+                retry_jobs = []
+
+                def on_result(index: int, result):
+                    number, items, context = jobs[index]
+                    if isinstance(result, Exception):
+                        print(f"   [Warning] 批次 {number + 1} 翻譯失敗: {result}")
+                        retry_jobs.append((number, items, context))
+                        return
+
+                    translations = self._parse_indexed_translations(result.content, [i for i, _ in items])
+                    missing_items = []
+                    for item_index, entry in items:
+                        if item_index in translations:
+                            entry.text_translated = translations[item_index]
+                        else:
+                            missing_items.append((item_index, entry))
+                    if missing_items:
+                        retry_jobs.append((number, missing_items, context))
+                    progress["completed"] += len(items) - len(missing_items)
+                    if recorder is not None:
+                        recorder("translate.batch", result.latency, entries=len(items), missing=len(missing_items),
+                                 attempts=result.attempts, prompt_tokens=result.prompt_tokens,
+                                 completion_tokens=result.completion_tokens, repair_round=round_number)
+
+                    tokens_in = result.prompt_tokens if result.prompt_tokens is not None else f"~{estimates[index]}"
+                    tokens_out = result.completion_tokens if result.completion_tokens is not None else "?"
+                    retry = f", 重試 {result.attempts - 1}" if result.attempts > 1 else ""
+                    invalid = f", 缺漏 {len(missing_items)}" if missing_items else ""
+                    print(f"   批次 {number + 1}/{len(batches)}: {len(items)} 條, tokens {tokens_in}/{tokens_out}, "
+                          f"{result.latency:.1f}s{retry}{invalid} | 翻譯進度: {progress['completed']}/{total}")
+                    if relay is not None:
+                        relay.notify()
+
+                all_results.extend(engine.chat_many(requests, on_result))
+                jobs = sorted(retry_jobs, key=lambda job: job[0])
+        finally:
+            # 等最後一次進度保存完成，呼叫端之後的強制 checkpoint 才不會被舊資料覆蓋
+            if relay is not None:
+                relay.close()
+
+        if jobs:
+            print(f"   [Warning] {sum(len(items) for _, items, _ in jobs)} 條字幕未能取得翻譯")
+
+        elapsed = time.monotonic() - started
+        ok = [r for r in all_results if not isinstance(r, Exception)]
+        completion_tokens = sum(r.completion_tokens or 0 for r in ok)
+        if ok and elapsed > 0:
+            avg_latency = sum(r.latency for r in ok) / len(ok)
+            print(f"   批次統計: {len(ok)}/{len(all_results)} 請求成功, 平均延遲 {avg_latency:.1f}s, "
+                  f"輸出 {completion_tokens} tokens ({completion_tokens / elapsed:.0f} tokens/s)")
+
+    def _translate_with_google(self, entries: List[SubtitleEntry], target_lang: str,
+                               on_progress: Optional[Callable[[], None]] = None) -> List[SubtitleEntry]:
         """使用 Google Translate 翻譯 (免費但不穩定)"""
         try:
             from googletrans import Translator
@@ -641,6 +1044,8 @@ class SubtitleGenerator:
 
                     if (i + 1) % 10 == 0:
                         print(f"   翻譯進度: {i + 1}/{len(entries)}")
+                        if on_progress is not None:
+                            on_progress()
 
                 except Exception as e:
                     print(f"   [Warning]  第 {i + 1} 條翻譯失敗: {e}")
@@ -685,15 +1090,40 @@ class SubtitleGenerator:
         print(f"[File] 字幕已輸出: {output_path}")
 
     def export_json(self, entries: List[SubtitleEntry], output_path: str):
-        """輸出 JSON 格式字幕檔"""
+        """輸出 JSON 格式字幕檔（同時記錄斷句設定於 .meta.json）"""
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
         data = [asdict(e) for e in entries]
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
+        with open(self._meta_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump({"segmentation": self.segmentation_settings()}, f, ensure_ascii=False)
+
         print(f"[File] JSON 已輸出: {output_path}")
 
+    @staticmethod
+    def _meta_path(json_path: str) -> str:
+        """字幕 JSON 對應的 meta 檔路徑"""
+        root, _ = os.path.splitext(json_path)
+        return f"{root}.meta.json"
+
+    def is_segmentation_current(self, json_path: str) -> bool:
+        """
+        檢查已輸出的字幕 JSON 是否使用目前的斷句設定
+
+        沒有 meta 檔的舊字幕視為有效（避免全部重跑）。
+        """
+        meta_path = self._meta_path(json_path)
+        if not os.path.exists(meta_path):
+            return True
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta.get("segmentation") == self.segmentation_settings()
+
     def load_from_json(self, json_path: str) -> List[SubtitleEntry]:
         """從 JSON 載入字幕"""
         with open(json_path, 'r', encoding='utf-8') as f:
@@ -702,16 +1132,70 @@ class SubtitleGenerator:
         return [SubtitleEntry(**item) for item in data]
 
 
+def resegment_main(args):
+    """重新斷句模式：由轉錄快取重建字幕，不載入模型"""
+    generator = SubtitleGenerator(args.config)
+    whisper_config = generator.config.setdefault("whisper", {})
+    if args.max_words is not None:
+        whisper_config["max_words_per_segment"] = args.max_words
+    if args.punctuation is not None:
+        whisper_config["split_punctuation"] = args.punctuation
+
+    target = Path(args.resegment)
+    if target.is_dir():
+        video_files = sorted(
+            f for f in target.iterdir()
+            if f.suffix.lower() in (".mp4", ".avi", ".mov", ".mkv")
+        )
+    else:
+        video_files = [target]
+
+    output_folder = Path(args.output)
+    done = 0
+    for video_file in video_files:
+        try:
+            entries = generator.resegment(str(video_file))
+        except LookupError as e:
+            print(f"[Skip] {e}")
+            continue
+
+        generator.export_srt(entries, str(output_folder / f"{video_file.stem}_en.srt"), use_translated=False)
+        generator.export_json(entries, str(output_folder / f"{video_file.stem}.json"))
+        done += 1
+
+    print(f"[OK] 重新斷句完成: {done}/{len(video_files)}")
+
+
 def main():
-    """測試用主函數"""
-    import sys
+    """
+    測試用主函數
+
+    使用方式:
+        python subtitle_generator.py <video_path>
+        python subtitle_generator.py --resegment <video_or_folder> --max-words 6
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="字幕生成（Whisper 語音識別 + 翻譯）")
+    parser.add_argument("video", nargs="?", help="影片路徑")
+    parser.add_argument("--config", default="translation_config.json", help="設定檔路徑")
+    parser.add_argument("--resegment", metavar="PATH",
+                        help="由轉錄快取重新斷句（影片或資料夾），不重新轉錄")
+    parser.add_argument("--max-words", type=int, help="每段最大字數（覆寫設定檔）")
+    parser.add_argument("--punctuation", help="斷句標點，例如 \".?!\"（覆寫設定檔）")
+    parser.add_argument("--output", default="subtitles", help="字幕輸出資料夾")
+    args = parser.parse_args()
+
+    if args.resegment:
+        resegment_main(args)
+        return
 
-    if len(sys.argv) < 2:
-        print("使用方式: python subtitle_generator.py <video_path>")
+    if not args.video:
+        parser.print_help()
         return
 
-    video_path = sys.argv[1]
-    generator = SubtitleGenerator()
+    video_path = args.video
+    generator = SubtitleGenerator(args.config)
 
     # 轉錄
     entries = generator.transcribe(video_path)
@@ -4,13 +4,23 @@
 
 import os
 import json
-import random
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import threading
+from http.server import SimpleHTTPRequestHandler
 from pathlib import Path
 
+from web_server import KeepAliveHandlerMixin, create_server
+from draft_index import get_draft_index
+from draft_batch import apply_style, apply_replace, run_batch
+from draft_writer import write_draft_json
+
 PROJECT_ROOT = Path(__file__).parent
 CONFIG_PATH = PROJECT_ROOT / "translation_config.json"
 
+# 請求由執行緒池並行處理；讀取-修改-寫回草稿或設定檔的請求以此鎖依序執行，避免互相覆蓋
+WRITE_LOCK = threading.Lock()
+WRITE_PATHS = ('/api/position', '/api/update-draft', '/api/subtitles/replace',
+               '/api/drafts/batch', '/api/ig-examples')
+
 
 def get_jianying_draft_root():
     """取得剪映草稿根路徑"""
@@ -26,7 +36,7 @@ def get_jianying_draft_root():
     return Path(rf"C:\Users\{username}\AppData\Local\JianyingPro\User Data\Projects\com.lveditor.draft")
 
 
-class PositionEditorHandler(SimpleHTTPRequestHandler):
+class PositionEditorHandler(KeepAliveHandlerMixin, SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
             self.serve_html()
@@ -48,12 +58,21 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
             super().do_GET()
 
     def do_POST(self):
+        if self.path in WRITE_PATHS:
+            with WRITE_LOCK:
+                self._dispatch_post()
+        else:
+            self._dispatch_post()
+
+    def _dispatch_post(self):
         if self.path == '/api/position':
             self.handle_save_position()
         elif self.path == '/api/update-draft':
             self.handle_update_draft()
         elif self.path == '/api/subtitles/replace':
             self.handle_replace_subtitles()
+        elif self.path == '/api/drafts/batch':
+            self.handle_batch_drafts()
         elif self.path == '/api/ig-examples':
             self.handle_post_ig_examples()
         elif self.path == '/api/ig-generate':
@@ -64,33 +83,24 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
     def serve_html(self):
         html_path = PROJECT_ROOT / "subtitle_position_editor.html"
         if html_path.exists():
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/html; charset=utf-8')
-            self.end_headers()
             with open(html_path, 'rb') as f:
-                self.wfile.write(f.read())
+                self.send_bytes(f.read(), 'text/html; charset=utf-8')
         else:
             self.send_error(404)
 
     def serve_subtitle_editor(self):
         html_path = PROJECT_ROOT / "subtitle_editor.html"
         if html_path.exists():
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/html; charset=utf-8')
-            self.end_headers()
             with open(html_path, 'rb') as f:
-                self.wfile.write(f.read())
+                self.send_bytes(f.read(), 'text/html; charset=utf-8')
         else:
             self.send_error(404)
 
     def serve_ig_caption_editor(self):
         html_path = PROJECT_ROOT / "ig_caption_editor.html"
         if html_path.exists():
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/html; charset=utf-8')
-            self.end_headers()
             with open(html_path, 'rb') as f:
-                self.wfile.write(f.read())
+                self.send_bytes(f.read(), 'text/html; charset=utf-8')
         else:
             self.send_error(404)
 
@@ -106,8 +116,7 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
 
     def handle_save_position(self):
         try:
-            length = int(self.headers['Content-Length'])
-            data = json.loads(self.rfile.read(length).decode('utf-8'))
+            data = json.loads(self.read_body().decode('utf-8'))
             position_y = data.get('position_y', -0.45)
             font_size = data.get('font_size', 8.0)
             line_max_width = data.get('line_max_width', 0.82)
@@ -155,13 +164,10 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
                     config = json.load(f)
             prefix = config.get("output", {}).get("output_prefix", "翻譯專案_")
 
-            # 列出符合前綴的草稿
-            if draft_root.exists():
-                for folder in draft_root.iterdir():
-                    if folder.is_dir() and folder.name.startswith(prefix):
-                        draft_file = folder / "draft_content.json"
-                        if draft_file.exists():
-                            drafts.append(folder.name)
+            # 列出符合前綴的草稿（草稿根目錄未變更時直接使用索引）
+            for name in get_draft_index(draft_root).list_drafts():
+                if name.startswith(prefix):
+                    drafts.append(name)
 
             self.send_json({"drafts": sorted(drafts, reverse=True)})
         except Exception as e:
@@ -170,17 +176,14 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
     def handle_update_draft(self):
         """更新現有草稿的字幕位置、字號、寬度、背景、顏色"""
         try:
-            length = int(self.headers['Content-Length'])
-            data = json.loads(self.rfile.read(length).decode('utf-8'))
+            data = json.loads(self.read_body().decode('utf-8'))
             draft_name = data.get('draft_name')
             position_y = data.get('position_y', -0.45)
             font_size = data.get('font_size', 8.0)
             line_max_width = data.get('line_max_width', 0.82)
             background_alpha = data.get('background_alpha', 0.64)
-            background_style = 1 if background_alpha > 0 else 0
             text_color = data.get('text_color', '#FFFFFF')
             text_color_random = data.get('text_color_random', False)
-            color_options = ['#FFFFFF', '#ffe759', '#00ff00', '#00d4ff', '#ff6699']
 
             if not draft_name:
                 self.send_json({"error": "未指定草稿"}, 400)
@@ -197,84 +200,21 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
             with open(draft_path, 'r', encoding='utf-8') as f:
                 draft_data = json.load(f)
 
-            # 收集字幕軌道的素材 ID（根據內容識別，跳過標題和 @html_cat）
-            texts = draft_data.get("materials", {}).get("texts", [])
-            subtitle_material_ids = set()
-            skipped_count = 0
-
-            for i, text in enumerate(texts):
-                # 解析文字內容來識別類型
-                content_str = text.get("content", "")
-                try:
-                    content_data = json.loads(content_str)
-                    text_content = content_data.get("text", "")
-                except:
-                    text_content = ""
-
-                # 跳過 @html_cat（根據內容識別）
-                if "@html_cat" in text_content:
-                    skipped_count += 1
-                    print(f"   [Skip] 跳過 @html_cat (index={i})")
-                    continue
-
-                # 跳過標題（假設是前 2 個中的非 @html_cat）
-                if i < 2 and "@html_cat" not in text_content:
-                    skipped_count += 1
-                    print(f"   [Skip] 跳過標題 (index={i}): {text_content[:20]}...")
-                    continue
-
-                # 這是翻譯字幕，進行更新
-                subtitle_material_ids.add(text.get("id"))
-
-                # 決定這個字幕的顏色
-                if text_color_random:
-                    current_color = random.choice(color_options)
-                else:
-                    current_color = text_color
-
-                # 更新素材的字號、寬度、背景、顏色
-                text["font_size"] = font_size
-                text["line_max_width"] = line_max_width
-                text["background_alpha"] = background_alpha
-                text["background_style"] = background_style
-                text["background_color"] = "#000000"
-                text["text_color"] = current_color
-
-                # 更新 content 中的字號和顏色
-                try:
-                    content = json.loads(text.get("content", "{}"))
-                    if "styles" in content:
-                        # 將 hex 顏色轉換為 RGB (0-1)
-                        hex_color = current_color.lstrip('#')
-                        r = int(hex_color[0:2], 16) / 255
-                        g = int(hex_color[2:4], 16) / 255
-                        b = int(hex_color[4:6], 16) / 255
-
-                        for style in content["styles"]:
-                            style["size"] = font_size
-                            # 更新文字顏色
-                            if "fill" not in style:
-                                style["fill"] = {"content": {"solid": {"color": [r, g, b]}}}
-                            else:
-                                style["fill"]["content"]["solid"]["color"] = [r, g, b]
-                        text["content"] = json.dumps(content, ensure_ascii=False)
-                except:
-                    pass
-
-            # 更新字幕軌道片段的位置
-            updated_count = 0
-            for track in draft_data.get("tracks", []):
-                if track.get("type") != "text":
-                    continue
-                for segment in track.get("segments", []):
-                    if segment.get("material_id") in subtitle_material_ids:
-                        if "clip" in segment and "transform" in segment["clip"]:
-                            segment["clip"]["transform"]["y"] = position_y
-                            updated_count += 1
+            # 更新字幕素材（跳過標題和 @html_cat）與字幕片段的位置
+            result = apply_style(draft_data, {
+                "position_y": position_y,
+                "font_size": font_size,
+                "line_max_width": line_max_width,
+                "background_alpha": background_alpha,
+                "text_color": text_color,
+                "text_color_random": text_color_random
+            })
+            updated_count = result["segments"]
+            skipped_count = result["skipped"]
 
             # 儲存草稿
-            with open(draft_path, 'w', encoding='utf-8') as f:
-                json.dump(draft_data, f, ensure_ascii=False)
+            write_draft_json(draft_path, draft_data)
+            get_draft_index(draft_root).update(draft_name, draft_data)
 
             color_info = "隨機" if text_color_random else text_color
             print(f"[OK] 更新 {draft_name}: {updated_count} 字幕, 跳過 {skipped_count} 個 (pos={position_y}, color={color_info})")
@@ -296,40 +236,13 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
                 self.send_json({"error": "未指定草稿"}, 400)
                 return
 
-            draft_root = get_jianying_draft_root()
-            draft_path = draft_root / draft_name / "draft_content.json"
-
-            if not draft_path.exists():
+            # 字幕文字（跳過標題和 @html_cat）來自草稿索引，草稿未變更時不需讀檔
+            entry = get_draft_index(get_jianying_draft_root()).get(draft_name)
+            if entry is None:
                 self.send_json({"error": f"找不到草稿: {draft_name}"}, 404)
                 return
 
-            # 讀取草稿
-            with open(draft_path, 'r', encoding='utf-8') as f:
-                draft_data = json.load(f)
-
-            # 提取字幕文字（跳過標題和 @html_cat）
-            texts = draft_data.get("materials", {}).get("texts", [])
-            subtitles = []
-
-            for i, text in enumerate(texts):
-                # 解析文字內容
-                content_str = text.get("content", "")
-                try:
-                    content_data = json.loads(content_str)
-                    text_content = content_data.get("text", "")
-                except:
-                    text_content = ""
-
-                # 跳過 @html_cat
-                if "@html_cat" in text_content:
-                    continue
-
-                # 跳過標題（假設是前 2 個中的非 @html_cat）
-                if i < 2 and "@html_cat" not in text_content:
-                    continue
-
-                # 這是翻譯字幕
-                subtitles.append(text_content)
+            subtitles = [text or "" for text in entry.subtitles]
 
             print(f"[OK] 載入 {draft_name}: {len(subtitles)} 條字幕")
             self.send_json({"subtitles": subtitles})
@@ -340,8 +253,7 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
     def handle_replace_subtitles(self):
         """執行字幕文字批量取代並儲存"""
         try:
-            length = int(self.headers['Content-Length'])
-            data = json.loads(self.rfile.read(length).decode('utf-8'))
+            data = json.loads(self.read_body().decode('utf-8'))
             draft_name = data.get('draft_name')
             find_text = data.get('find')
             replace_text = data.get('replace', '')
@@ -356,55 +268,33 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
 
             draft_root = get_jianying_draft_root()
             draft_path = draft_root / draft_name / "draft_content.json"
+            index = get_draft_index(draft_root)
 
-            if not draft_path.exists():
+            entry = index.get(draft_name)
+            if entry is None:
                 self.send_json({"error": f"找不到草稿: {draft_name}"}, 404)
                 return
 
+            # 從索引找出包含尋找文字的字幕素材（跳過標題和 @html_cat），沒有時不需讀寫草稿
+            matched = {
+                item["index"] for item in entry.texts
+                if item["kind"] == "subtitle" and item["text"] and find_text in item["text"]
+            }
+            if not matched:
+                print(f"[OK] 取代 {draft_name}: 0 條字幕 ('{find_text}' -> '{replace_text}')")
+                self.send_json({"success": True, "replaced": 0})
+                return
+
             # 讀取草稿
             with open(draft_path, 'r', encoding='utf-8') as f:
                 draft_data = json.load(f)
 
             # 執行取代
-            texts = draft_data.get("materials", {}).get("texts", [])
-            replaced_count = 0
-
-            for i, text in enumerate(texts):
-                # 解析文字內容
-                content_str = text.get("content", "")
-                try:
-                    content_data = json.loads(content_str)
-                    text_content = content_data.get("text", "")
-                except:
-                    continue
-
-                # 跳過 @html_cat
-                if "@html_cat" in text_content:
-                    continue
-
-                # 跳過標題（假設是前 2 個中的非 @html_cat）
-                if i < 2 and "@html_cat" not in text_content:
-                    continue
-
-                # 檢查是否包含要尋找的文字
-                if find_text in text_content:
-                    # 執行取代
-                    new_text = text_content.replace(find_text, replace_text)
-                    content_data["text"] = new_text
-
-                    # 更新 styles 中的 range 以匹配新文字長度
-                    new_len = len(new_text)
-                    if "styles" in content_data:
-                        for style in content_data["styles"]:
-                            if "range" in style:
-                                style["range"] = [0, new_len]
-
-                    text["content"] = json.dumps(content_data, ensure_ascii=False)
-                    replaced_count += 1
+            replaced_count = apply_replace(draft_data, find_text, replace_text, matched)["replaced"]
 
             # 儲存草稿
-            with open(draft_path, 'w', encoding='utf-8') as f:
-                json.dump(draft_data, f, ensure_ascii=False)
+            write_draft_json(draft_path, draft_data)
+            index.update(draft_name, draft_data)
 
             print(f"[OK] 取代 {draft_name}: {replaced_count} 條字幕 ('{find_text}' -> '{replace_text}')")
             self.send_json({"success": True, "replaced": replaced_count})
@@ -412,6 +302,39 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_json({"error": str(e)}, 500)
 
+    def handle_batch_drafts(self):
+        """
+        批次修改多份草稿
+
+        {"drafts": [...], "pattern": "翻譯專案_*", "style": {...}, "find": "...", "replace": "...",
+         "dry_run": true, "workers": 4}
+        """
+        try:
+            data = json.loads(self.read_body().decode('utf-8'))
+            if not data.get('drafts') and not data.get('pattern'):
+                self.send_json({"error": "未指定草稿"}, 400)
+                return
+
+            summary = run_batch(
+                str(get_jianying_draft_root()),
+                names=data.get('drafts'),
+                pattern=data.get('pattern'),
+                style=data.get('style'),
+                find_text=data.get('find'),
+                replace_text=data.get('replace', ''),
+                dry_run=bool(data.get('dry_run', False)),
+                workers=data.get('workers')
+            )
+            mode = "[Dry Run] " if summary["dry_run"] else ""
+            print(f"[OK] {mode}批次修改: 選取 {summary['selected']} 份，變更 {summary['changed']} 份，"
+                  f"寫入 {summary['written']} 份，失敗 {summary['errors']} 份")
+            self.send_json(dict(summary, success=True))
+
+        except ValueError as e:
+            self.send_json({"error": str(e)}, 400)
+        except Exception as e:
+            self.send_json({"error": str(e)}, 500)
+
     def handle_get_ig_examples(self):
         """取得 IG 文案範例"""
         try:
@@ -427,8 +350,7 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
     def handle_post_ig_examples(self):
         """新增/刪除 IG 文案範例"""
         try:
-            length = int(self.headers['Content-Length'])
-            data = json.loads(self.rfile.read(length).decode('utf-8'))
+            data = json.loads(self.read_body().decode('utf-8'))
             action = data.get('action')
 
             # 讀取設定
@@ -489,8 +411,7 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
     def handle_ig_generate(self):
         """根據草稿重新生成 IG 文案"""
         try:
-            length = int(self.headers['Content-Length'])
-            data = json.loads(self.rfile.read(length).decode('utf-8'))
+            data = json.loads(self.read_body().decode('utf-8'))
             draft_name = data.get('draft_name')
 
             if not draft_name:
@@ -508,32 +429,13 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
                 self.send_json({"error": "請先新增文案範例"}, 400)
                 return
 
-            # 讀取草稿字幕
-            draft_root = get_jianying_draft_root()
-            draft_path = draft_root / draft_name / "draft_content.json"
-
-            if not draft_path.exists():
+            # 讀取草稿字幕（來自草稿索引）
+            entry = get_draft_index(get_jianying_draft_root()).get(draft_name)
+            if entry is None:
                 self.send_json({"error": f"找不到草稿: {draft_name}"}, 404)
                 return
 
-            with open(draft_path, 'r', encoding='utf-8') as f:
-                draft_data = json.load(f)
-
-            # 提取字幕文字
-            texts = draft_data.get("materials", {}).get("texts", [])
-            subtitles = []
-            for i, text in enumerate(texts):
-                content_str = text.get("content", "")
-                try:
-                    content_data = json.loads(content_str)
-                    text_content = content_data.get("text", "")
-                except:
-                    continue
-                if "@html_cat" in text_content:
-                    continue
-                if i < 2:
-                    continue
-                subtitles.append(text_content)
+            subtitles = [text for text in entry.subtitles if text is not None]
 
             if not subtitles:
                 self.send_json({"error": "草稿中沒有字幕"}, 400)
@@ -623,10 +525,7 @@ class PositionEditorHandler(SimpleHTTPRequestHandler):
             return None
 
     def send_json(self, data, status=200):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        self.send_json_body(data, status)
 
     def log_message(self, format, *args):
         print(f"[Server] {args[0]}")
@@ -646,7 +545,7 @@ def main():
     import webbrowser
     webbrowser.open(f"http://localhost:{port}")
 
-    server = HTTPServer(('localhost', port), PositionEditorHandler)
+    server = create_server(PositionEditorHandler, 'localhost', port)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""draft_writer 串流輸出須與 json.dumps 逐位元組一致"""
+
+import json
+
+import pytest
+
+from draft_writer import iter_draft_json, write_draft_json
+
+DRAFT = {
+    "canvas_config": {"height": 1920, "ratio": "original", "width": 1080},
+    "duration": 5000000,
+    "empty_dict": {},
+    "empty_list": [],
+    "materials": {
+        "texts": [
+            {"id": "t1", "content": json.dumps({"text": "你好\n世界", "styles": [{"range": [0, 5]}]},
+                                                ensure_ascii=False)},
+            {"id": "t2", "content": "{\"text\": \"\\\"quoted\\\" \\u2028\"}", "nested": {"a": [1, [2, {}]]}},
+        ],
+        "videos": [],
+        "audios": [{"id": "a", "duration": 1.5, "flag": None, "mute": False}],
+    },
+    "tracks": [
+        {"id": "track", "segments": [{"clip": {"transform": {"x": 0.0, "y": -0.8}}, "speed": 1.0}]},
+        {"id": "empty", "segments": []},
+    ],
+    "unicode": "中文 émoji 😀",
+    "numbers": [0, -1, 1e-7, 3.14159, 10 ** 20],
+}
+
+
+@pytest.mark.parametrize("indent", [None, 0, 2, 4])
+def test_stream_matches_json_dumps(indent):
+    expected = json.dumps(DRAFT, ensure_ascii=False, indent=indent)
+    assert "".join(iter_draft_json(DRAFT, indent)) == expected
+
+
+@pytest.mark.parametrize("value", [{}, [], "text", 1, None, [{}], {"a": {}}])
+def test_edge_values(value):
+    assert "".join(iter_draft_json(value, 4)) == json.dumps(value, ensure_ascii=False, indent=4)
+
+
+def test_write_is_byte_identical(tmp_path):
+    path = tmp_path / "draft_content.json"
+    path.write_text("old", encoding="utf-8")
+    write_draft_json(path, DRAFT, indent=4)
+    assert path.read_bytes() == json.dumps(DRAFT, ensure_ascii=False, indent=4).encode("utf-8")
+    assert [p.name for p in tmp_path.iterdir()] == ["draft_content.json"]
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""SubtitleGenerator 翻譯回應解析的測試"""
+
+import pytest
+
+from subtitle_generator import SubtitleGenerator
+
+parse = SubtitleGenerator._parse_indexed_translations
+
+
+def test_json_object():
+    assert parse('{"1": "你好", "2": "世界"}', [1, 2]) == {1: "你好", 2: "世界"}
+
+
+def test_json_object_with_surrounding_text():
+    assert parse('翻譯如下：\n{"3": "早安"}\n以上。', [3]) == {3: "早安"}
+
+
+def test_single_element_array():
+    assert parse('[{"index": 1, "text": "你好"}]', [1]) == {1: "你好"}
+
+
+@pytest.mark.parametrize("fence", ["```json", "```"])
+def test_fenced_array(fence):
+    content = f'{fence}\n[{{"index": 1, "text": "你好"}}, {{"index": 2, "text": "世界"}}]\n```'
+    assert parse(content, [1, 2]) == {1: "你好", 2: "世界"}
+
+
+def test_fenced_object():
+    assert parse('```json\n{"1": "你好"}\n```', [1]) == {1: "你好"}
+
+
+def test_wrapped_array():
+    assert parse('{"translations": [{"i": 4, "t": "再見"}]}', [4]) == {4: "再見"}
+
+
+def test_numbered_lines_fallback():
+    content = "1. 你好\n2、世界\n3) [笑聲]\n無編號的行"
+    assert parse(content, [1, 2, 3]) == {1: "你好", 2: "世界", 3: "[笑聲]"}
+
+
+def test_only_expected_and_non_empty():
+    assert parse('{"1": "你好", "2": " ", "9": "多餘"}', [1, 2]) == {1: "你好"}
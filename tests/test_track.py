@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Track 片段重疊檢查（含零時長片段）的回歸測試"""
+
+import random
+
+import pytest
+
+from pyJianYingDraft import Timerange, TrackType
+from pyJianYingDraft.exceptions import SegmentOverlap
+from pyJianYingDraft.effect_segment import EffectSegment
+from pyJianYingDraft.track import Track
+
+
+class _Segment(EffectSegment):
+    """只帶時間範圍的片段（略過特效素材的建立）"""
+
+    def __init__(self, start: int, duration: int):
+        self.target_timerange = Timerange(start, duration)
+
+
+def _track() -> Track:
+    return Track(TrackType.effect, "effect", 0, False)
+
+
+def _ranges(track: Track):
+    return [(seg.target_timerange.start, seg.target_timerange.duration) for seg in track.segments]
+
+
+def test_zero_length_segment_does_not_hide_enclosing_segment():
+    track = _track()
+    track.add_segment(_Segment(0, 10))
+    track.add_segment(_Segment(0, 0))
+    with pytest.raises(SegmentOverlap):
+        track.add_segment(_Segment(5, 3))
+    assert _ranges(track) == [(0, 10), (0, 0)]
+
+
+def test_add_segments_zero_length_between_overlapping_segments():
+    with pytest.raises(SegmentOverlap):
+        _track().add_segments([_Segment(0, 100), _Segment(0, 0), _Segment(50, 10)])
+
+
+def test_add_segments_is_atomic():
+    track = _track()
+    track.add_segment(_Segment(0, 10))
+    with pytest.raises(SegmentOverlap):
+        track.add_segments([_Segment(20, 10), _Segment(5, 1)])
+    assert _ranges(track) == [(0, 10)]
+
+
+def test_zero_length_segments_at_boundaries_are_accepted():
+    track = _track()
+    track.add_segments([_Segment(0, 10), _Segment(0, 0), _Segment(10, 0), _Segment(10, 5)])
+    track.add_segment(_Segment(15, 0))
+    assert _ranges(track) == sorted(_ranges(track), key=lambda r: r[0])
+    assert len(track.segments) == 5
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_matches_pairwise_overlap_check(bulk):
+    rng = random.Random(0)
+    for _ in range(200):
+        track = _track()
+        accepted = []
+        for _ in range(30):
+            candidate = _Segment(rng.randrange(50), rng.choice([0, 0, 1, 3, 7]))
+            expected = not any(seg.overlaps(candidate) for seg in accepted)
+            try:
+                if bulk:
+                    track.add_segments([candidate])
+                else:
+                    track.add_segment(candidate)
+                added = True
+            except SegmentOverlap:
+                added = False
+            assert added == expected
+            if added:
+                accepted.append(candidate)
+        starts = [seg.target_timerange.start for seg in track.segments]
+        assert starts == sorted(starts) and len(track.segments) == len(accepted)
+
+
+def test_add_segments_batch_matches_pairwise_overlap_check():
+    rng = random.Random(1)
+    for _ in range(500):
+        existing = [_Segment(rng.randrange(40), rng.choice([0, 2, 5]))]
+        batch = [_Segment(rng.randrange(40), rng.choice([0, 0, 1, 4])) for _ in range(rng.randrange(1, 5))]
+        everything = existing + batch
+        expected = not any(a.overlaps(b) for i, a in enumerate(everything) for b in everything[i + 1:])
+
+        track = _track()
+        track.add_segment(existing[0])
+        try:
+            track.add_segments(batch)
+            added = True
+        except SegmentOverlap:
+            added = False
+        assert added == expected
+        assert len(track.segments) == (len(everything) if added else 1)
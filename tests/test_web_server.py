@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Range 標頭解析與 If-None-Match 比對的單元測試"""
+
+import pytest
+
+from web_server import KeepAliveHandlerMixin, MAX_RANGES, parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", [(0, 99)]),
+    ("bytes=500-", [(500, 999)]),
+    ("bytes=-200", [(800, 999)]),
+    ("bytes=-5000", [(0, 999)]),
+    ("bytes=900-5000", [(900, 999)]),
+    ("bytes=0-0", [(0, 0)]),
+    (" Bytes = 10-19", [(10, 19)]),
+])
+def test_single_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+def test_multiple_ranges_are_sorted_and_merged():
+    assert parse_range("bytes=500-599,0-99,90-199,200-299", 1000) == [(0, 299), (500, 599)]
+    assert parse_range("bytes=0-9,20-29", 1000) == [(0, 9), (20, 29)]
+
+
+@pytest.mark.parametrize("header", [
+    "items=0-99",
+    "bytes=",
+    "bytes=abc",
+    "bytes=a-b",
+    "bytes=10-5",
+    "bytes=-x",
+])
+def test_malformed_or_unsupported_returns_none(header):
+    assert parse_range(header, 1000) is None
+
+
+def test_too_many_ranges_returns_none():
+    header = "bytes=" + ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(MAX_RANGES + 1))
+    assert parse_range(header, 10000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0"])
+def test_unsatisfiable_returns_empty(header):
+    assert parse_range(header, 1000) == []
+
+
+@pytest.mark.parametrize("header", ["bytes=-1", "bytes=-500", "bytes=0-", "bytes=0-99"])
+def test_empty_file_is_unsatisfiable(header):
+    assert parse_range(header, 0) == []
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('"xyz",W/"abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+    ('"ab"', False),
+    ("", False),
+])
+def test_etag_matches(header, expected):
+    assert KeepAliveHandlerMixin._etag_matches(header, '"abc"') is expected
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+轉錄快取 - 以音訊內容雜湊 + Whisper 設定為 key
+
+快取內容為 Whisper 原始 segments（含 word-level timestamps），因此：
+- 影片重新命名後不需要重新轉錄（內容雜湊不變）
+- 調整 max_words_per_segment 等斷句設定只需重新斷句，不需要載入模型
+
+儲存格式為欄位式 .npz（float32 時間陣列 + 字串表），
+未安裝 numpy 時改用 JSON。
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_CACHE_FOLDER = "cache/transcripts"
+
+# 影響轉錄結果的 whisper 設定（斷句設定不在此列，斷句由快取的 word timestamps 重建）
+TRANSCRIBE_KEYS = ("engine", "model", "compute_type", "language", "vad_filter", "vad_parameters")
+
+CACHE_VERSION = 1
+
+
+def encode_columnar(segments: List[dict]) -> Dict[str, "np.ndarray"]:
+    """
+    將 segments 轉為欄位式陣列
+
+    - seg_*: 每個 segment 一筆；seg_word_offsets[i]:seg_word_offsets[i+1] 為其 words
+    - word_*: 每個 word 一筆，時間與機率為 float32
+    - 文字以字串表儲存（去重後 UTF-8 串接 + 位移），*_text 為字串表索引
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    seg_start, seg_end, seg_text, seg_word_offsets = [], [], [], [0]
+    word_start, word_end, word_prob, word_text = [], [], [], []
+
+    for segment in segments:
+        seg_start.append(segment["start"])
+        seg_end.append(segment["end"])
+        seg_text.append(intern(segment["text"]))
+        for w in segment.get("words") or []:
+            word_start.append(w["start"])
+            word_end.append(w["end"])
+            word_prob.append(w.get("probability", 1.0))
+            word_text.append(intern(w["word"]))
+        seg_word_offsets.append(len(word_text))
+
+    encoded = [text.encode('utf-8') for text in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+
+    return {
+        "seg_start": np.asarray(seg_start, dtype=np.float32),
+        "seg_end": np.asarray(seg_end, dtype=np.float32),
+        "seg_text": np.asarray(seg_text, dtype=np.int32),
+        "seg_word_offsets": np.asarray(seg_word_offsets, dtype=np.int64),
+        "word_start": np.asarray(word_start, dtype=np.float32),
+        "word_end": np.asarray(word_end, dtype=np.float32),
+        "word_prob": np.asarray(word_prob, dtype=np.float32),
+        "word_text": np.asarray(word_text, dtype=np.int32),
+        "string_blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "string_offsets": string_offsets,
+    }
+
+
+def decode_columnar(arrays) -> List[dict]:
+    """將欄位式陣列還原為 segment dict 列表"""
+    blob = arrays["string_blob"].tobytes()
+    offsets = arrays["string_offsets"].tolist()
+    strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    def times(name: str) -> list:
+        # float32 -> 毫秒精度的 Python float，避免 0.30000001 之類的尾數
+        return np.round(arrays[name].astype(np.float64), 3).tolist()
+
+    seg_start = times("seg_start")
+    seg_end = times("seg_end")
+    seg_text = arrays["seg_text"].tolist()
+    seg_word_offsets = arrays["seg_word_offsets"].tolist()
+    word_start = times("word_start")
+    word_end = times("word_end")
+    word_prob = times("word_prob")
+    word_text = arrays["word_text"].tolist()
+
+    segments = []
+    for i in range(len(seg_start)):
+        lo, hi = seg_word_offsets[i], seg_word_offsets[i + 1]
+        segments.append({
+            "start": seg_start[i],
+            "end": seg_end[i],
+            "text": strings[seg_text[i]],
+            "words": [
+                {
+                    "word": strings[word_text[j]],
+                    "start": word_start[j],
+                    "end": word_end[j],
+                    "probability": word_prob[j]
+                }
+                for j in range(lo, hi)
+            ]
+        })
+    return segments
+
+
+class TranscriptionCache:
+    """
+    內容定址的轉錄快取
+
+    檔案結構:
+        {cache_folder}/fingerprints.sqlite  路徑 + 大小 + mtime -> 音訊雜湊（多個轉錄行程共用）
+        {cache_folder}/{key}.npz            原始 segments（欄位式，見 encode_columnar）
+        {cache_folder}/{key}.json           原始 segments（未安裝 numpy 時）
+    """
+
+    def __init__(self, cache_folder: str = DEFAULT_CACHE_FOLDER):
+        folder = Path(cache_folder)
+        self.cache_folder = folder if folder.is_absolute() else PROJECT_ROOT / folder
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, dict] = {}
+        self._conn = self._open_fingerprints()
+
+    @classmethod
+    def from_config(cls, whisper_config: dict) -> Optional['TranscriptionCache']:
+        """依 whisper 設定建立快取，停用時返回 None"""
+        cache_config = whisper_config.get("cache", {})
+        if not cache_config.get("enabled", True):
+            return None
+        return cls(cache_config.get("folder", DEFAULT_CACHE_FOLDER))
+
+    # ------------------------------------------------------------------
+    # 音訊雜湊
+    # ------------------------------------------------------------------
+
+    def _open_fingerprints(self) -> Optional[sqlite3.Connection]:
+        """
+        開啟 fingerprints.sqlite（平行轉錄的每個行程各自連線，由 SQLite 處理並行寫入）
+
+        首次開啟時匯入舊版的 fingerprints.json；無法開啟時只使用記憶體中的記錄
+        """
+        try:
+            conn = sqlite3.connect(str(self.cache_folder / "fingerprints.sqlite"),
+                                   timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL,
+                    audio_hash TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[Warning] 無法開啟音訊雜湊記錄，本次不保存: {e}")
+            return None
+
+        legacy_path = self.cache_folder / "fingerprints.json"
+        if legacy_path.exists():
+            try:
+                with open(legacy_path, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO fingerprints (path, size, mtime, audio_hash) VALUES (?, ?, ?, ?)",
+                    [(path, r["size"], r["mtime"], r["audio_hash"]) for path, r in legacy.items()]
+                )
+                conn.commit()
+                legacy_path.unlink()
+            except (OSError, ValueError, KeyError, AttributeError, sqlite3.Error):
+                pass
+        return conn
+
+    def _get_fingerprint(self, video_path: str) -> Optional[dict]:
+        with self._lock:
+            record = self._fingerprints.get(video_path)
+            if record is not None or self._conn is None:
+                return record
+            try:
+                row = self._conn.execute(
+                    "SELECT size, mtime, audio_hash FROM fingerprints WHERE path = ?", (video_path,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+            if row is None:
+                return None
+            record = self._fingerprints[video_path] = {"size": row[0], "mtime": row[1], "audio_hash": row[2]}
+            return record
+
+    def _put_fingerprint(self, video_path: str, record: dict, old_path: Optional[str] = None):
+        """保存雜湊記錄；寫入失敗只印出警告，不影響轉錄"""
+        with self._lock:
+            self._fingerprints[video_path] = record
+            if self._conn is None:
+                return
+            try:
+                if old_path is not None:
+                    self._conn.execute("DELETE FROM fingerprints WHERE path = ?", (old_path,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints (path, size, mtime, audio_hash) VALUES (?, ?, ?, ?)",
+                    (video_path, record["size"], record["mtime"], record["audio_hash"])
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"[Warning] 無法保存音訊雜湊記錄: {e}")
+
+    @staticmethod
+    def _file_signature(video_path: str) -> dict:
+        stat = os.stat(video_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    def audio_hash(self, video_path: str, pcm_path: Optional[str] = None) -> str:
+        """
+        取得影片的音訊內容雜湊
+
+        同一路徑且大小、修改時間未變時直接使用記錄，否則重新計算；
+        有預先解碼的 PCM 檔（與 ffmpeg 輸出相同）時直接讀取，不再解碼。
+        """
+        video_path = os.path.abspath(video_path)
+        signature = self._file_signature(video_path)
+
+        record = self._get_fingerprint(video_path)
+        if record and record.get("size") == signature["size"] and record.get("mtime") == signature["mtime"]:
+            return record["audio_hash"]
+
+        if pcm_path and os.path.exists(pcm_path):
+            digest = "pcm:" + self._hash_file(pcm_path)
+        else:
+            digest = self._compute_audio_hash(video_path)
+
+        self._put_fingerprint(video_path, dict(signature, audio_hash=digest))
+        return digest
+
+    @staticmethod
+    def _compute_audio_hash(video_path: str) -> str:
+        """解碼為 16kHz 單聲道 PCM 後計算 SHA-256（無 ffmpeg 時改用檔案內容）"""
+        hasher = hashlib.sha256()
+        try:
+            process = subprocess.Popen(
+                ['ffmpeg', '-nostdin', '-v', 'error', '-i', video_path,
+                 '-vn', '-ac', '1', '-ar', '16000', '-f', 's16le', '-'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            process = None
+
+        if process is not None:
+            for chunk in iter(lambda: process.stdout.read(1024 * 1024), b""):
+                hasher.update(chunk)
+            process.stdout.close()
+            if process.wait() == 0:
+                return "pcm:" + hasher.hexdigest()
+            hasher = hashlib.sha256()
+
+        return "file:" + TranscriptionCache._hash_file(video_path)
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def rename_source(self, old_path: str, new_path: str):
+        """影片重新命名時搬移雜湊記錄，避免重新解碼"""
+        old_path = os.path.abspath(old_path)
+        new_path = os.path.abspath(new_path)
+        record = self._get_fingerprint(old_path)
+        if record is None:
+            return
+        with self._lock:
+            self._fingerprints.pop(old_path, None)
+        self._put_fingerprint(new_path, record, old_path=old_path)
+
+    # ------------------------------------------------------------------
+    # 轉錄結果
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def transcribe_settings(whisper_config: dict, language: str) -> dict:
+        """擷取影響轉錄結果的設定"""
+        settings = {k: whisper_config.get(k) for k in TRANSCRIBE_KEYS}
+        settings["language"] = language
+        if not settings.get("vad_filter"):
+            settings["vad_parameters"] = None
+        return settings
+
+    def cache_key(self, video_path: str, settings: dict, pcm_path: Optional[str] = None) -> str:
+        """音訊雜湊 + 轉錄設定 -> 快取 key"""
+        payload = json.dumps(
+            {"audio": self.audio_hash(video_path, pcm_path), "settings": settings, "version": CACHE_VERSION},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def has(self, key: str) -> bool:
+        """快取中是否有此 key"""
+        return (self.cache_folder / f"{key}.npz").exists() or (self.cache_folder / f"{key}.json").exists()
+
+    def load(self, key: str) -> Optional[List[dict]]:
+        """讀取快取的原始 segments，不存在時返回 None"""
+        npz_path = self.cache_folder / f"{key}.npz"
+        if NUMPY_AVAILABLE and npz_path.exists():
+            try:
+                with np.load(npz_path, allow_pickle=False) as arrays:
+                    return decode_columnar(arrays)
+            except (OSError, ValueError, KeyError):
+                return None
+
+        json_path = self.cache_folder / f"{key}.json"
+        if not json_path.exists():
+            return None
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)["segments"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, key: str, segments: List[dict], settings: dict):
+        """寫入原始 segments"""
+        suffix = ".npz" if NUMPY_AVAILABLE else ".json"
+        path = self.cache_folder / f"{key}{suffix}"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        if NUMPY_AVAILABLE:
+            arrays = encode_columnar(segments)
+            settings_blob = json.dumps(settings, sort_keys=True, ensure_ascii=False).encode('utf-8')
+            arrays["settings"] = np.frombuffer(settings_blob, dtype=np.uint8)
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"settings": settings, "segments": segments}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -2,16 +2,27 @@
 # -*- coding: utf-8 -*-
 """
 翻譯專案編輯器 - 後端 API 伺服器
+
+批次處理在背景執行，進度以事件回報：
+- POST /api/start                  開始批次（可帶 {"force": true}），立即返回工作 ID
+- GET  /api/jobs                   最近的工作
+- GET  /api/jobs/<id>?since=N      工作狀態、各階段計數、各影片狀態與 ID 大於 N 的事件
+- GET  /api/jobs/<id>/events       Server-Sent Events 即時串流（支援 Last-Event-ID 續讀）
+- POST /api/jobs/<id>/cancel       取消工作（處理中的階段完成後停止）
 """
 
 import os
 import sys
 import json
-import subprocess
 import threading
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import SimpleHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
+from typing import Optional
+
+from web_server import KeepAliveHandlerMixin, create_server
+from job_runner import Job, JobManager
+from draft_writer import write_draft_json
 
 # 設定專案根目錄
 PROJECT_ROOT = Path(__file__).parent
@@ -19,27 +30,50 @@ CONFIG_PATH = PROJECT_ROOT / "translation_config.json"
 TEMPLATE_PATH = PROJECT_ROOT / "翻譯專案" / "draft_content.json"
 VIDEOS_FOLDER = PROJECT_ROOT / "videos" / "translate_raw"
 
+# SSE 沒有新事件時送出註解行的間隔（秒），避免代理或瀏覽器判定連線逾時
+SSE_KEEPALIVE = 10
+
+JOBS = JobManager()
 
-class TranslateEditorHandler(SimpleHTTPRequestHandler):
+# 請求由執行緒池並行處理；讀取-修改-寫回設定檔與模板的請求以此鎖依序執行
+WRITE_LOCK = threading.Lock()
+
+
+class TranslateEditorHandler(KeepAliveHandlerMixin, SimpleHTTPRequestHandler):
     """翻譯編輯器 API Handler"""
 
+    def __init__(self, *args, **kwargs):
+        # 背景工作執行時會切換工作目錄，靜態檔案固定從專案資料夾提供
+        super().__init__(*args, directory=str(PROJECT_ROOT), **kwargs)
+
     def do_GET(self):
         parsed = urlparse(self.path)
+        parts = parsed.path.strip('/').split('/')
 
         if parsed.path == '/' or parsed.path == '/index.html':
             self.serve_html()
         elif parsed.path == '/api/config':
             self.handle_get_config()
+        elif parsed.path == '/api/jobs':
+            self.send_json_response({"jobs": JOBS.list()})
+        elif len(parts) == 3 and parts[:2] == ['api', 'jobs']:
+            self.handle_get_job(parts[2], parse_qs(parsed.query))
+        elif len(parts) == 4 and parts[:2] == ['api', 'jobs'] and parts[3] == 'events':
+            self.handle_job_events(parts[2], parse_qs(parsed.query))
         else:
             super().do_GET()
 
     def do_POST(self):
         parsed = urlparse(self.path)
+        parts = parsed.path.strip('/').split('/')
 
         if parsed.path == '/api/config':
-            self.handle_save_config()
+            with WRITE_LOCK:
+                self.handle_save_config()
         elif parsed.path == '/api/start':
             self.handle_start_process()
+        elif len(parts) == 4 and parts[:2] == ['api', 'jobs'] and parts[3] == 'cancel':
+            self.handle_cancel_job(parts[2])
         else:
             self.send_error(404)
 
@@ -47,11 +81,8 @@ class TranslateEditorHandler(SimpleHTTPRequestHandler):
         """提供 HTML 頁面"""
         html_path = PROJECT_ROOT / "translate_editor.html"
         if html_path.exists():
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/html; charset=utf-8')
-            self.end_headers()
             with open(html_path, 'rb') as f:
-                self.wfile.write(f.read())
+                self.send_bytes(f.read(), 'text/html; charset=utf-8')
         else:
             self.send_error(404, "HTML file not found")
 
@@ -103,8 +134,7 @@ class TranslateEditorHandler(SimpleHTTPRequestHandler):
     def handle_save_config(self):
         """儲存設定檔"""
         try:
-            content_length = int(self.headers['Content-Length'])
-            body = self.rfile.read(content_length)
+            body = self.read_body()
             data = json.loads(body.decode('utf-8'))
 
             # 讀取現有設定
@@ -158,91 +188,139 @@ class TranslateEditorHandler(SimpleHTTPRequestHandler):
                     except:
                         pass
 
-            with open(TEMPLATE_PATH, 'w', encoding='utf-8') as f:
-                json.dump(template_data, f, ensure_ascii=False)
+            write_draft_json(TEMPLATE_PATH, template_data)
 
         except Exception as e:
             print(f"更新模板文字失敗: {e}")
 
     def handle_start_process(self):
-        """開始執行翻譯流程 - 直接在程序中執行避免編碼問題"""
-        import io
-        from contextlib import redirect_stdout, redirect_stderr
-
-        # 捕獲輸出
-        output_buffer = io.StringIO()
-
+        """在背景開始翻譯批次，立即返回工作 ID"""
         try:
-            # 切換工作目錄
-            old_cwd = os.getcwd()
-            os.chdir(str(PROJECT_ROOT))
-
-            # 確保 DEEPSEEK_API_KEY 存在
-            if "DEEPSEEK_API_KEY" not in os.environ:
-                # 從 translate.bat 讀取
-                bat_path = PROJECT_ROOT / "translate.bat"
-                if bat_path.exists():
-                    with open(bat_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            if 'DEEPSEEK_API_KEY=' in line:
-                                key = line.split('=', 1)[1].strip()
-                                os.environ['DEEPSEEK_API_KEY'] = key
-                                break
-
-            # 動態 import 並執行
-            with redirect_stdout(output_buffer), redirect_stderr(output_buffer):
-                # 重新載入模組以獲取最新代碼
-                import importlib
-                if 'translate_video' in sys.modules:
-                    del sys.modules['translate_video']
-                if 'subtitle_generator' in sys.modules:
-                    del sys.modules['subtitle_generator']
-
-                from translate_video import TranslationWorkflow
-                workflow = TranslationWorkflow()
-                workflow.batch_process()
-
-            output = output_buffer.getvalue()
-            output += "\n\n=== 處理完成 ==="
-
-        except Exception as e:
-            output = output_buffer.getvalue()
-            output += f"\n\n=== 錯誤: {str(e)} ==="
-            import traceback
-            output += f"\n{traceback.format_exc()}"
-
-        finally:
-            os.chdir(old_cwd)
+            body = self.read_body()
+            options = json.loads(body.decode('utf-8')) if body.strip() else {}
+        except ValueError as e:
+            self.send_json_response({"error": f"無效的 JSON: {e}"}, status=400)
+            return
+
+        force = bool(options.get("force", False))
+        job = JOBS.start("batch_process (force)" if force else "batch_process",
+                         lambda job: run_batch_job(job, force))
+        self.send_json_response({
+            "job_id": job.id,
+            "status": job.status,
+            "events": f"/api/jobs/{job.id}/events"
+        }, status=202)
+
+    def _get_job_or_404(self, job_id: str) -> Optional[Job]:
+        job = JOBS.get(job_id)
+        if job is None:
+            self.send_json_response({"error": f"找不到工作: {job_id}"}, status=404)
+        return job
+
+    @staticmethod
+    def _since(query: dict, default: int = 0) -> int:
+        try:
+            return int(query.get('since', [default])[0])
+        except (TypeError, ValueError):
+            return default
+
+    def handle_get_job(self, job_id: str, query: dict):
+        """工作狀態與 since 之後的事件（不支援 SSE 時輪詢用）"""
+        job = self._get_job_or_404(job_id)
+        if job is None:
+            return
+        events, _ = job.events_since(self._since(query))
+        self.send_json_response(dict(job.summary(), events=events))
+
+    def handle_job_events(self, job_id: str, query: dict):
+        """以 Server-Sent Events 串流工作事件，工作結束後關閉連線"""
+        job = self._get_job_or_404(job_id)
+        if job is None:
+            return
+
+        # 瀏覽器重新連線時以 Last-Event-ID 續讀
+        since = self._since(query)
+        try:
+            since = int(self.headers.get('Last-Event-ID', since))
+        except ValueError:
+            pass
 
-        # 發送回應
+        # 串流長度未知，結束時以關閉連線表示
+        self.close_connection = True
         self.send_response(200)
-        self.send_header('Content-Type', 'text/plain; charset=utf-8')
-        response_bytes = output.encode('utf-8')
-        self.send_header('Content-Length', len(response_bytes))
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
         self.end_headers()
-        self.wfile.write(response_bytes)
+
+        while True:
+            events, finished = job.events_since(since, timeout=SSE_KEEPALIVE)
+            if events:
+                chunk = ''.join(
+                    f"id: {event['id']}\nevent: {event['type']}\n"
+                    f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+                    for event in events
+                )
+                since = events[-1]['id']
+            elif finished:
+                break
+            else:
+                chunk = ': keep-alive\n\n'
+            self.wfile.write(chunk.encode('utf-8'))
+            self.wfile.flush()
+
+    def handle_cancel_job(self, job_id: str):
+        """取消工作"""
+        job = JOBS.cancel(job_id)
+        if job is None:
+            self.send_json_response({"error": f"找不到工作: {job_id}"}, status=404)
+            return
+        self.send_json_response({"job_id": job.id, "status": job.status})
 
     def send_error_response(self, message):
         """發送錯誤回應"""
-        self.send_response(500)
-        self.send_header('Content-Type', 'text/plain; charset=utf-8')
-        response_bytes = message.encode('utf-8')
-        self.send_header('Content-Length', len(response_bytes))
-        self.end_headers()
-        self.wfile.write(response_bytes)
+        self.send_bytes(message.encode('utf-8'), 'text/plain; charset=utf-8', 500)
 
     def send_json_response(self, data, status=200):
         """傳送 JSON 回應"""
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        self.send_json_body(data, status)
 
     def log_message(self, format, *args):
         """自訂日誌格式"""
         print(f"[Server] {args[0]}")
 
 
+def load_api_key():
+    """確保 DEEPSEEK_API_KEY 存在（未設定時從 translate.bat 讀取）"""
+    if "DEEPSEEK_API_KEY" in os.environ:
+        return
+    bat_path = PROJECT_ROOT / "translate.bat"
+    if bat_path.exists():
+        with open(bat_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if 'DEEPSEEK_API_KEY=' in line:
+                    os.environ['DEEPSEEK_API_KEY'] = line.split('=', 1)[1].strip()
+                    break
+
+
+def run_batch_job(job: Job, force: bool = False):
+    """背景工作：執行翻譯批次，進度與取消透過 job 傳遞"""
+    old_cwd = os.getcwd()
+    os.chdir(str(PROJECT_ROOT))
+    try:
+        load_api_key()
+
+        # 重新載入模組以獲取最新代碼（同時只有一個工作在執行）
+        for module in ('translate_video', 'subtitle_generator'):
+            sys.modules.pop(module, None)
+
+        from translate_video import TranslationWorkflow
+        workflow = TranslationWorkflow()
+        return workflow.batch_process(force=force, on_event=job.on_video_event, stop_event=job.cancel_event)
+    finally:
+        os.chdir(old_cwd)
+
+
 def main():
     port = 8765
     print("=" * 50)
@@ -260,11 +338,12 @@ def main():
     webbrowser.open(f"http://localhost:{port}")
 
     # 啟動伺服器
-    server = HTTPServer(('localhost', port), TranslateEditorHandler)
+    server = create_server(TranslateEditorHandler, 'localhost', port)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\n伺服器已停止")
+        JOBS.shutdown()
         server.shutdown()
 
 
@@ -35,13 +35,15 @@ import copy
 import random
 import time
 import threading
+import multiprocessing
 from queue import Queue, Empty
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Callable, Tuple
 from datetime import datetime
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from enum import Enum, auto
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, Future, FIRST_COMPLETED
 
 try:
     from tqdm import tqdm
@@ -68,6 +70,61 @@ except ImportError:
             pass
 
 from subtitle_generator import SubtitleGenerator, SubtitleEntry
+from media_probe import get_media_probe
+from audio_prefetch import AudioPrefetcher
+from pipeline_telemetry import PipelineTelemetry
+from job_journal import JobJournal
+from folder_watcher import FolderWatcher
+from draft_writer import write_draft_json
+
+
+def _copy_json(value):
+    """複製 JSON 結構（dict / list），比 copy.deepcopy 少了 memo 與型別分派的開銷"""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def _probe_material_tracks(path: str):
+    """供 pyJianYingDraft 素材使用的探測函數：走共用的快取探測服務
+
+    ffprobe 有時只給容器時長、軌道沒有 duration，此時以容器時長補上；
+    兩者都沒有時保留 None，由素材類別拋出 ValueError。
+    """
+    result = get_media_probe().probe(path)
+    video, audio = result.video, result.audio
+    if result.duration_ms is not None:
+        if video is not None and video.get("duration_ms") is None:
+            video = dict(video, duration_ms=result.duration_ms)
+        if audio is not None and audio.get("duration_ms") is None:
+            audio = dict(audio, duration_ms=result.duration_ms)
+    return video, result.image, audio
+
+
+# Per-process SubtitleGenerator used by transcription replicas (see TranscriptionPipeline)
+_replica_generator: Optional[SubtitleGenerator] = None
+
+
+def _init_transcribe_replica(config: dict, slot_queue, replica_overrides: List[dict]):
+    """Initializer for a transcription replica process: claim a slot and configure its model"""
+    global _replica_generator
+    slot = slot_queue.get()
+    config = copy.deepcopy(config)
+    config.setdefault("whisper", {}).update(replica_overrides[slot])
+    _replica_generator = SubtitleGenerator(config=config)
+
+
+def _transcribe_in_replica(video_path: str) -> Tuple[List[SubtitleEntry], float, float]:
+    """
+    Transcribe one video inside a replica process (model stays loaded between calls).
+
+    Returns the entries with the wall-clock start/end of the inference for telemetry.
+    """
+    started = time.time()
+    entries = _replica_generator.transcribe(video_path)
+    return entries, started, time.time()
 
 
 class TaskStatus(Enum):
@@ -93,6 +150,13 @@ class PipelineTask:
     created_at: float = field(default_factory=time.time)
     started_at: Optional[float] = None
     completed_at: Optional[float] = None
+    # When the task was last put on a stage queue (queue wait telemetry)
+    queued_at: Optional[float] = None
+    # Journal checkpoints of the entries (throttled, one writer at a time)
+    last_checkpoint: float = 0.0
+    checkpoint_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # Translation windows submitted while the video was still being transcribed
+    translation_futures: List[Future] = field(default_factory=list)
 
     def __hash__(self):
         return hash(self.video_path)
@@ -110,7 +174,8 @@ class TranscriptionPipeline:
     Pipeline for parallel video translation processing.
 
     Architecture:
-    - Transcription: Sequential (GPU-bound, one at a time)
+    - Transcription: One in-process worker, or N process-isolated model replicas
+      (``transcribe_workers``) scheduled longest-video-first
     - Translation: Parallel (I/O-bound, multiple workers)
     - Draft Generation: Parallel (I/O-bound, multiple workers)
 
@@ -120,24 +185,48 @@ class TranscriptionPipeline:
     Video 3:                         transcribe -> translate -> generate draft
 
     While Video 1 is translating, Video 2 can start transcribing.
+
+    With ``stream_translation`` the in-process transcription worker also hands
+    every ``stream_window`` finished entries to the translation executor while
+    Whisper is still decoding, so a long video's translation overlaps its own
+    transcription.
     """
 
-    def __init__(self, workflow: 'TranslationWorkflow', config: dict):
+    def __init__(self, workflow: 'TranslationWorkflow', config: dict,
+                 on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 stop_event: Optional[threading.Event] = None):
         """
         Initialize the pipeline.
 
         Args:
             workflow: The TranslationWorkflow instance
             config: Pipeline configuration dict
+            on_event: Called with a progress event dict (video, stage, status,
+                stats) whenever a video enters or leaves a stage
+            stop_event: Setting this event cancels the run; workers stop taking
+                new videos and the in-flight stage of each video finishes
         """
         self.workflow = workflow
         self.config = config
+        self.on_event = on_event
 
         # Worker configuration
+        self.transcribe_workers = max(1, config.get("transcribe_workers", 1))
+        self.transcribe_devices = config.get("transcribe_devices", [])
         self.translate_workers = config.get("translate_workers", 4)
         self.draft_workers = config.get("draft_workers", 2)
         self.max_retries = config.get("max_retries", 3)
         self.retry_delay = config.get("retry_delay", 1.0)
+        self.stream_translation = config.get("stream_translation", True)
+        self.stream_window = config.get(
+            "stream_window",
+            workflow.config.get("translation", {}).get("batch_size", 50)
+        )
+        self._stream_executor: Optional[ThreadPoolExecutor] = None
+        self._prefetcher: Optional[AudioPrefetcher] = None
+        self.telemetry: Optional[PipelineTelemetry] = None
+        self.journal: Optional[JobJournal] = None
+        self.checkpoint_interval = config.get("journal", {}).get("checkpoint_interval", 5.0)
 
         # Queues for pipeline stages
         self.transcription_queue: Queue[PipelineTask] = Queue()
@@ -152,7 +241,11 @@ class TranscriptionPipeline:
         self.progress_bars: Dict[str, Any] = {}
 
         # Control flags
-        self._stop_event = threading.Event()
+        self._stop_event = stop_event or threading.Event()
+        # Set while more videos may still be submitted (watch mode)
+        self._accepting = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._force = False
         self._transcription_done = threading.Event()
         self._translation_done = threading.Event()
 
@@ -163,7 +256,8 @@ class TranscriptionPipeline:
             "failed": 0,
             "transcribed": 0,
             "translated": 0,
-            "drafts_generated": 0
+            "drafts_generated": 0,
+            "resumed": 0
         }
 
     def _create_progress_bars(self, total: int) -> Dict[str, Any]:
@@ -190,6 +284,12 @@ class TranscriptionPipeline:
 
     def add_video(self, video_path: str) -> PipelineTask:
         """Add a video to the pipeline queue"""
+        task = self._register_task(video_path)
+        self._enqueue(self.transcription_queue, task)
+        return task
+
+    def _register_task(self, video_path: str) -> PipelineTask:
+        """Create and track the task for a video without queueing it"""
         video_path = str(Path(video_path).resolve())
         video_name = Path(video_path).stem
 
@@ -202,9 +302,146 @@ class TranscriptionPipeline:
             self.tasks[video_path] = task
             self.stats["total"] += 1
 
-        self.transcription_queue.put(task)
+        self._emit(task, "pipeline", "queued")
         return task
 
+    def _resume_task(self, video_path: str, point: Dict[str, Any]) -> bool:
+        """
+        Re-enter a journaled video after its last completed stage.
+
+        Returns False when the recorded artifact is gone, in which case the
+        video starts over from transcription.
+        """
+        stage, status, artifact = point["stage"], point["status"], point["artifact"]
+        if not artifact or not Path(artifact).exists():
+            return False
+
+        if stage == "draft":
+            task = self._register_task(video_path)
+            task.status = TaskStatus.COMPLETED
+            task.draft_name = Path(artifact).name
+            with self.lock:
+                self.stats["completed"] += 1
+                self.stats["resumed"] += 1
+            if self.progress_bars:
+                for bar in self.progress_bars.values():
+                    bar.update(1)
+            self._emit(task, "draft", "done", draft=task.draft_name, resumed=True)
+            return True
+
+        if stage == "translate" and status == "done":
+            entries = self.workflow.subtitle_gen.load_from_json(artifact)
+        else:
+            data = self.journal.load_checkpoint(artifact)
+            if data is None:
+                return False
+            entries = [SubtitleEntry(**item) for item in data]
+
+        task = self._register_task(video_path)
+        task.entries = entries
+        task.started_at = time.time()
+        with self.lock:
+            self.stats["resumed"] += 1
+
+        if stage == "translate" and status == "done":
+            with self.lock:
+                self.stats["transcribed"] += 1
+            if self.progress_bars:
+                self.progress_bars["transcribe"].update(1)
+            self._on_translated(task)
+        else:
+            self._on_transcribed(task)
+        return True
+
+    def _journal(self, task: PipelineTask, stage: str, status: str,
+                 artifact: Optional[str] = None, **detail):
+        """Append a stage transition for the task (no-op when the journal is off)"""
+        if self.journal is not None:
+            self.journal.record(task.video_path, stage, status, artifact, detail or None)
+
+    def _checkpoint(self, task: PipelineTask, stage: str, status: str, force: bool = False):
+        """Persist the task's current entries and journal them as ``stage``/``status``"""
+        if self.journal is None or not task.entries:
+            return
+        with task.checkpoint_lock:
+            now = time.time()
+            if not force and now - task.last_checkpoint < self.checkpoint_interval:
+                return
+            task.last_checkpoint = now
+            entries = [asdict(entry) for entry in task.entries]
+            path = self.journal.write_checkpoint(task.video_path, entries)
+            translated = sum(1 for entry in entries if (entry["text_translated"] or "").strip())
+            self._journal(task, stage, status, str(path), translated=translated, total=len(entries))
+
+    def _emit(self, task: PipelineTask, stage: str, status: str, **data):
+        """Report a stage transition of the task to ``on_event``"""
+        if self.on_event is None:
+            return
+        with self.lock:
+            stats = dict(self.stats)
+        try:
+            self.on_event(dict(data, video=task.video_name, stage=stage, status=status, stats=stats))
+        except Exception as e:
+            print(f"   [Warning] Progress callback failed: {e}")
+
+    def _enqueue(self, queue: Queue, task: PipelineTask):
+        """Put a task on a stage queue, remembering when it started waiting"""
+        task.queued_at = time.time()
+        queue.put(task)
+
+    def _dequeued(self, task: PipelineTask, stage: str):
+        """Record how long a task waited in the queue of ``stage`` and report that it started"""
+        if self.telemetry is not None and task.queued_at is not None:
+            self.telemetry.record(task.video_name, f"{stage}.queue", task.queued_at, time.time())
+        self._emit(task, stage, "started")
+
+    def _span(self, task: PipelineTask, stage: str, **attrs):
+        """Telemetry span for one unit of work on a task (no-op when telemetry is off)"""
+        if self.telemetry is None:
+            return nullcontext()
+        return self.telemetry.span(task.video_name, stage, **attrs)
+
+    def _load_existing_subtitles(self, task: PipelineTask, force: bool) -> bool:
+        """Load subtitles from disk if they exist and are current. Returns True if loaded."""
+        subtitle_json = self.workflow.subtitle_folder / f"{task.video_name}.json"
+        if force or not self.workflow._has_current_subtitles(subtitle_json):
+            return False
+
+        print(f"\n[Pipeline] Loading existing subtitles for: {task.video_name}")
+        with self._span(task, "transcribe.load"):
+            task.entries = self.workflow.subtitle_gen.load_from_json(str(subtitle_json))
+        return True
+
+    def _save_original_subtitles(self, task: PipelineTask):
+        """Save freshly transcribed (untranslated) subtitles"""
+        with self._span(task, "transcribe.write"):
+            self.workflow.subtitle_gen.export_srt(
+                task.entries,
+                str(self.workflow.subtitle_folder / f"{task.video_name}_en.srt"),
+                use_translated=False
+            )
+            self._checkpoint(task, "transcribe", "done", force=True)
+
+    def _on_transcribed(self, task: PipelineTask):
+        """Record a finished transcription and hand the task to the translation stage"""
+        with self.lock:
+            self.stats["transcribed"] += 1
+
+        if self.progress_bars:
+            self.progress_bars["transcribe"].update(1)
+            self.progress_bars["transcribe"].set_postfix(current=task.video_name)
+        self._emit(task, "transcribe", "done", entries=len(task.entries or []))
+
+        # Move to translation queue
+        self._enqueue(self.translation_queue, task)
+
+    def _finish_transcription(self):
+        """Signal transcription is complete and release the translation workers"""
+        self._transcription_done.set()
+        # Add poison pills for translation workers
+        for _ in range(self.translate_workers):
+            self.translation_queue.put(None)
+
     def _transcribe_worker(self, force: bool = False):
         """
         Worker for transcription (runs sequentially - GPU bound).
@@ -216,7 +453,7 @@ class TranscriptionPipeline:
                 task = self.transcription_queue.get(timeout=1.0)
             except Empty:
                 # Check if all videos have been added and queue is empty
-                if self.transcription_queue.empty():
+                if self.transcription_queue.empty() and not self._accepting.is_set():
                     break
                 continue
 
@@ -225,50 +462,241 @@ class TranscriptionPipeline:
 
             task.status = TaskStatus.TRANSCRIBING
             task.started_at = time.time()
+            self._dequeued(task, "transcribe")
 
             try:
-                video_name = task.video_name
-                subtitle_json = self.workflow.subtitle_folder / f"{video_name}.json"
+                if not self._load_existing_subtitles(task, force):
+                    audio_path = None
+                    if self._prefetcher is not None:
+                        # Time spent here is the GPU waiting on audio decoding
+                        with self._span(task, "transcribe.decode"):
+                            audio_path = self._prefetcher.get(task.video_path)
+                    print(f"\n[Pipeline] Transcribing: {task.video_name}")
+                    with self._span(task, "transcribe.inference", prefetched=audio_path is not None):
+                        if self._stream_executor is not None:
+                            self._transcribe_streaming(task, audio_path)
+                        else:
+                            task.entries = self.workflow.subtitle_gen.transcribe(task.video_path, audio_path=audio_path)
+                    self._save_original_subtitles(task)
 
-                # Check if we should skip transcription
-                if not force and subtitle_json.exists():
-                    print(f"\n[Pipeline] Loading existing subtitles for: {video_name}")
-                    task.entries = self.workflow.subtitle_gen.load_from_json(str(subtitle_json))
-                else:
-                    print(f"\n[Pipeline] Transcribing: {video_name}")
-                    task.entries = self.workflow.subtitle_gen.transcribe(task.video_path)
+                self._on_transcribed(task)
 
-                    # Save original subtitles
-                    self.workflow.subtitle_gen.export_srt(
-                        task.entries,
-                        str(self.workflow.subtitle_folder / f"{video_name}_en.srt"),
-                        use_translated=False
-                    )
+            except Exception as e:
+                self._handle_task_error(task, f"Transcription failed: {str(e)}")
+
+            finally:
+                self.transcription_queue.task_done()
+
+        self._finish_transcription()
+
+    def _transcribe_streaming(self, task: PipelineTask, audio_path: Optional[Path] = None):
+        """
+        Transcribe while translating finished windows in the background.
 
-                with self.lock:
-                    self.stats["transcribed"] += 1
+        Every ``stream_window`` entries are submitted to the stream executor as
+        soon as Whisper has produced them; the translation stage only waits for
+        the outstanding windows instead of translating the whole video.
+        """
+        entries: List[SubtitleEntry] = []
+        window_start = 0
+
+        for entry in self.workflow.subtitle_gen.iter_transcribe(task.video_path, audio_path=audio_path):
+            entries.append(entry)
+            if len(entries) - window_start >= self.stream_window:
+                task.translation_futures.append(
+                    self._stream_executor.submit(self._translate_window, task, entries[window_start:])
+                )
+                window_start = len(entries)
 
-                if self.progress_bars:
-                    self.progress_bars["transcribe"].update(1)
-                    self.progress_bars["transcribe"].set_postfix(current=video_name)
+        if window_start < len(entries):
+            task.translation_futures.append(
+                self._stream_executor.submit(self._translate_window, task, entries[window_start:])
+            )
 
-                # Move to translation queue
-                self.translation_queue.put(task)
+        task.entries = entries
+        print(f"[OK] 識別完成，共 {len(entries)} 條字幕 ({len(task.translation_futures)} translation windows)")
 
+    def _translate_window(self, task: PipelineTask, window: List[SubtitleEntry]):
+        """Translate one streamed window in place (entries are shared with the task)"""
+        with self._span(task, "stream.window", entries=len(window)):
+            self.workflow.subtitle_gen.translate_entries(
+                window, on_progress=lambda: self._checkpoint(task, "translate", "partial")
+            )
+
+    def _replica_overrides(self) -> List[dict]:
+        """
+        Per-replica whisper overrides.
+
+        GPU: replicas are spread over ``transcribe_devices`` (device indices).
+        CPU: the cores are split evenly so replicas don't oversubscribe the machine.
+        """
+        whisper_config = self.workflow.subtitle_gen.config.get("whisper", {})
+        device = self.workflow.subtitle_gen._get_device()
+        overrides = []
+
+        for slot in range(self.transcribe_workers):
+            override = {}
+            if device == "cuda" and self.transcribe_devices:
+                override["device_index"] = self.transcribe_devices[slot % len(self.transcribe_devices)]
+            if device == "cpu" and not whisper_config.get("cpu_threads"):
+                override["cpu_threads"] = max(1, (os.cpu_count() or 1) // self.transcribe_workers)
+            # Keep CTranslate2 from spawning its own parallel decoders inside each replica
+            override["num_workers"] = 1
+            # Each replica runs its own model; sending them all to the single shared server model
+            # would serialize them and ignore the per-replica device / thread settings
+            override["server"] = {"enabled": False}
+            overrides.append(override)
+
+        return overrides
+
+    @staticmethod
+    def _estimate_durations(video_paths: List[str]) -> Dict[str, float]:
+        """Video durations in seconds for scheduling (falls back to file size)"""
+        probes = get_media_probe().probe_many(video_paths)
+        durations = {}
+        for path in video_paths:
+            probe = probes.get(path)
+            if probe is not None and probe.duration:
+                durations[path] = probe.duration
+            else:
+                # Roughly 1 MB/s for typical H.264 uploads; only the ordering matters
+                durations[path] = os.path.getsize(path) / (1024 * 1024)
+        return durations
+
+    def _collect_transcription_tasks(self, force: bool, block: bool) -> Tuple[List[PipelineTask], bool]:
+        """
+        Drain the transcription queue for the replica pool.
+
+        Tasks whose subtitles already exist go straight to translation. With
+        ``block`` the first get waits up to a second so an idle worker does not spin.
+
+        Returns:
+            (tasks that need a model, whether a poison pill was seen)
+        """
+        pending: List[PipelineTask] = []
+
+        while not self._stop_event.is_set():
+            try:
+                if block and not pending:
+                    task = self.transcription_queue.get(timeout=1.0)
+                else:
+                    task = self.transcription_queue.get_nowait()
+            except Empty:
+                break
+
+            if task is None:  # Poison pill
+                self.transcription_queue.task_done()
+                return pending, True
+
+            task.status = TaskStatus.TRANSCRIBING
+            task.started_at = time.time()
+            self._dequeued(task, "transcribe")
+
+            try:
+                if self._load_existing_subtitles(task, force):
+                    self._on_transcribed(task)
+                else:
+                    pending.append(task)
             except Exception as e:
                 self._handle_task_error(task, f"Transcription failed: {str(e)}")
-
             finally:
                 self.transcription_queue.task_done()
 
-        # Signal transcription is complete
-        self._transcription_done.set()
-        # Add poison pills for translation workers
-        for _ in range(self.translate_workers):
-            self.translation_queue.put(None)
+        return pending, False
+
+    def _transcribe_pool_worker(self, force: bool = False):
+        """
+        Transcription stage backed by N process-isolated model replicas.
+
+        Videos that still need transcription are submitted longest-first
+        (LPT scheduling), so the batch finishes close to total_duration / N.
+        The replicas stay loaded while the pipeline keeps accepting videos
+        (watch mode); later arrivals are submitted as they are queued.
+        """
+        executor: Optional[ProcessPoolExecutor] = None
+        futures: Dict[Future, PipelineTask] = {}
+        stopping = False
+
+        try:
+            while not self._stop_event.is_set():
+                if not stopping:
+                    pending, stopping = self._collect_transcription_tasks(force, block=not futures)
+                else:
+                    pending = []
+
+                if pending:
+                    durations = self._estimate_durations([t.video_path for t in pending])
+                    pending.sort(key=lambda t: durations[t.video_path], reverse=True)
+
+                    if executor is None:
+                        replicas = self.transcribe_workers if self._accepting.is_set() \
+                            else min(self.transcribe_workers, len(pending))
+                        print(f"\n[Pipeline] Transcribing {len(pending)} videos on {replicas} replicas (longest first)")
+                        executor = self._create_replica_pool(replicas)
+                    else:
+                        print(f"\n[Pipeline] Transcribing {len(pending)} more videos")
+
+                    for task in pending:
+                        futures[executor.submit(_transcribe_in_replica, task.video_path)] = task
+
+                if not futures:
+                    if stopping or (not self._accepting.is_set() and self.transcription_queue.empty()):
+                        break
+                    continue
+
+                done, _ = wait(set(futures), timeout=1.0, return_when=FIRST_COMPLETED)
+                if self._stop_event.is_set():
+                    for future in futures:
+                        future.cancel()
+
+                for future in done:
+                    task = futures.pop(future)
+                    if future.cancelled():
+                        continue
+                    try:
+                        task.entries, started, finished = future.result()
+                        if self.telemetry is not None:
+                            self.telemetry.record(task.video_name, "transcribe.inference",
+                                                  started, finished, replica=True)
+                        self._save_original_subtitles(task)
+                        self._on_transcribed(task)
+                    except Exception as e:
+                        self._handle_task_error(task, f"Transcription failed: {str(e)}")
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=self._stop_event.is_set())
+
+        self._finish_transcription()
+
+    def _create_replica_pool(self, replicas: int) -> ProcessPoolExecutor:
+        """Start ``replicas`` spawned processes, each claiming one model slot"""
+        if self.workflow.subtitle_gen.config.get("whisper", {}).get("server", {}).get("enabled"):
+            print(f"[Pipeline] whisper.server is enabled but {replicas} transcription replicas were requested; "
+                  f"replicas load their own models and bypass the server")
+        context = multiprocessing.get_context("spawn")
+        slot_queue = context.Queue()
+        for slot in range(replicas):
+            slot_queue.put(slot)
+
+        return ProcessPoolExecutor(
+            max_workers=replicas,
+            mp_context=context,
+            initializer=_init_transcribe_replica,
+            initargs=(self.workflow.subtitle_gen.config, slot_queue, self._replica_overrides())
+        )
 
     def _translate_single(self, task: PipelineTask) -> bool:
         """Translate a single task with retry logic"""
+        # 等待轉錄期間已送出的翻譯視窗
+        if task.translation_futures:
+            with self._span(task, "translate.stream_wait", windows=len(task.translation_futures)):
+                for future in task.translation_futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"   [Warning] Streamed translation window failed for {task.video_name}: {e}")
+        task.translation_futures = []
+
         # 檢查是否已經翻譯過（避免浪費 API 額度）
         already_translated = all(
             entry.text_translated and entry.text_translated.strip()
@@ -285,6 +713,7 @@ class TranscriptionPipeline:
             )
             subtitle_json = self.workflow.subtitle_folder / f"{task.video_name}.json"
             self.workflow.subtitle_gen.export_json(task.entries, str(subtitle_json))
+            self._journal(task, "translate", "done", str(subtitle_json))
             return True
 
         for attempt in range(self.max_retries):
@@ -292,19 +721,29 @@ class TranscriptionPipeline:
                 task.status = TaskStatus.TRANSLATING
                 print(f"\n[Pipeline] Translating: {task.video_name} (attempt {attempt + 1})")
 
-                task.entries = self.workflow.subtitle_gen.translate_entries(task.entries)
+                # 只翻譯尚未完成的條目（串流視窗失敗或部分翻譯的情況）
+                pending = [
+                    entry for entry in task.entries
+                    if not (entry.text_translated and entry.text_translated.strip())
+                ]
+                with self._span(task, "translate.request", entries=len(pending), attempt=attempt + 1):
+                    self.workflow.subtitle_gen.translate_entries(
+                        pending, on_progress=lambda: self._checkpoint(task, "translate", "partial")
+                    )
 
-                # Save translated subtitles
-                self.workflow.subtitle_gen.export_srt(
-                    task.entries,
-                    str(self.workflow.subtitle_folder / f"{task.video_name}_zh.srt"),
-                    use_translated=True
-                )
+                with self._span(task, "translate.write"):
+                    # Save translated subtitles
+                    self.workflow.subtitle_gen.export_srt(
+                        task.entries,
+                        str(self.workflow.subtitle_folder / f"{task.video_name}_zh.srt"),
+                        use_translated=True
+                    )
 
-                # Save JSON
-                subtitle_json = self.workflow.subtitle_folder / f"{task.video_name}.json"
-                self.workflow.subtitle_gen.export_json(task.entries, str(subtitle_json))
+                    # Save JSON
+                    subtitle_json = self.workflow.subtitle_folder / f"{task.video_name}.json"
+                    self.workflow.subtitle_gen.export_json(task.entries, str(subtitle_json))
 
+                self._journal(task, "translate", "done", str(subtitle_json))
                 return True
 
             except Exception as e:
@@ -317,6 +756,19 @@ class TranscriptionPipeline:
 
         return False
 
+    def _on_translated(self, task: PipelineTask):
+        """Record a finished translation and hand the task to the draft stage"""
+        with self.lock:
+            self.stats["translated"] += 1
+
+        if self.progress_bars:
+            self.progress_bars["translate"].update(1)
+            self.progress_bars["translate"].set_postfix(current=task.video_name)
+        self._emit(task, "translate", "done")
+
+        # Move to draft generation queue
+        self._enqueue(self.draft_queue, task)
+
     def _translation_worker(self):
         """Worker for translation (parallel - I/O bound)"""
         while not self._stop_event.is_set():
@@ -332,17 +784,13 @@ class TranscriptionPipeline:
                 self.translation_queue.task_done()
                 break
 
-            try:
-                if self._translate_single(task):
-                    with self.lock:
-                        self.stats["translated"] += 1
-
-                    if self.progress_bars:
-                        self.progress_bars["translate"].update(1)
-                        self.progress_bars["translate"].set_postfix(current=task.video_name)
+            self._dequeued(task, "translate")
 
-                    # Move to draft generation queue
-                    self.draft_queue.put(task)
+            try:
+                with self._span(task, "translate"):
+                    translated = self._translate_single(task)
+                if translated:
+                    self._on_translated(task)
 
             except Exception as e:
                 self._handle_task_error(task, f"Translation failed: {str(e)}")
@@ -379,52 +827,50 @@ class TranscriptionPipeline:
                     print(f"   [Skip] Draft already exists: {output_name}")
                     return output_name
 
-                # Load template
-                template_data = self.workflow._load_template()
-                if not template_data:
-                    raise Exception("Failed to load template")
+                with self._span(task, "draft.build", attempt=attempt + 1):
+                    # Load template (synced and parsed once, shared by all draft workers)
+                    template_data = self.workflow._load_template()
+                    if not template_data:
+                        raise Exception("Failed to load template")
 
-                # Deep copy template
-                draft_data = copy.deepcopy(template_data)
+                    # Copy only the parts of the template that are modified per video
+                    draft_data = self.workflow._clone_template(template_data)
 
-                # Clean template texts
-                draft_data = self.workflow._clean_template_texts(draft_data, keep_count=2)
+                    # Replace video
+                    draft_data = self.workflow._replace_video_in_draft(draft_data, task.video_path)
 
-                # Replace video
-                draft_data = self.workflow._replace_video_in_draft(draft_data, task.video_path)
+                    # Get video duration
+                    video_duration = draft_data.get("duration", 0)
 
-                # Get video duration
-                video_duration = draft_data.get("duration", 0)
+                    # Update template texts
+                    draft_data = self.workflow._update_template_texts(draft_data, video_name, video_duration)
 
-                # Update template texts
-                draft_data = self.workflow._update_template_texts(draft_data, video_name, video_duration)
+                    # Add subtitles
+                    draft_data = self.workflow._add_subtitles_to_draft(draft_data, task.entries, template_data)
 
-                # Add subtitles
-                draft_data = self.workflow._add_subtitles_to_draft(draft_data, task.entries, template_data)
+                with self._span(task, "draft.write"):
+                    # Save draft
+                    if output_folder.exists():
+                        def remove_readonly(func, path, excinfo):
+                            import stat
+                            os.chmod(path, stat.S_IWRITE)
+                            func(path)
+                        try:
+                            shutil.rmtree(output_folder, onerror=remove_readonly)
+                        except Exception as e:
+                            print(f"   [Warning] Cannot fully delete old folder: {e}")
 
-                # Save draft
-                if output_folder.exists():
-                    def remove_readonly(func, path, excinfo):
-                        import stat
-                        os.chmod(path, stat.S_IWRITE)
-                        func(path)
-                    try:
-                        shutil.rmtree(output_folder, onerror=remove_readonly)
-                    except Exception as e:
-                        print(f"   [Warning] Cannot fully delete old folder: {e}")
+                    output_folder.mkdir(parents=True, exist_ok=True)
 
-                output_folder.mkdir(parents=True, exist_ok=True)
+                    # Write draft_content.json (streamed to a temp file, then atomically replaced)
+                    write_draft_json(output_folder / "draft_content.json", draft_data)
 
-                # Write draft_content.json
-                with open(output_folder / "draft_content.json", 'w', encoding='utf-8') as f:
-                    json.dump(draft_data, f, ensure_ascii=False)
-
-                # Copy other template files
-                template_folder = self.workflow.jianying_draft_root / self.workflow.template_name
-                for file in ["draft_meta_info.json", "draft_settings"]:
-                    src = template_folder / file
-                    if src.exists():
-                        shutil.copy(src, output_folder / file)
+                    # Copy other template files
+                    template_folder = self.workflow.jianying_draft_root / self.workflow.template_name
+                    for file in ["draft_meta_info.json", "draft_settings"]:
+                        src = template_folder / file
+                        if src.exists():
+                            shutil.copy(src, output_folder / file)
 
                 return output_name
 
@@ -453,13 +899,19 @@ class TranscriptionPipeline:
                 self.draft_queue.task_done()
                 break
 
+            self._dequeued(task, "draft")
+
             try:
-                draft_name = self._generate_draft_single(task, force)
+                with self._span(task, "draft"):
+                    draft_name = self._generate_draft_single(task, force)
 
                 if draft_name:
                     task.draft_name = draft_name
                     task.status = TaskStatus.COMPLETED
                     task.completed_at = time.time()
+                    self._journal(task, "draft", "done", str(self.workflow.jianying_draft_root / draft_name))
+                    # The draft is on disk; long-running (watch) pipelines should not keep every video's entries
+                    task.entries = None
 
                     with self.lock:
                         self.stats["drafts_generated"] += 1
@@ -475,6 +927,7 @@ class TranscriptionPipeline:
                         )
 
                     print(f"\n[Pipeline] Completed: {task.video_name} ({task.elapsed_time():.1f}s)")
+                    self._emit(task, "draft", "done", draft=draft_name, elapsed=round(task.elapsed_time(), 1))
 
             except Exception as e:
                 self._handle_task_error(task, f"Draft generation failed: {str(e)}")
@@ -484,6 +937,12 @@ class TranscriptionPipeline:
 
     def _handle_task_error(self, task: PipelineTask, error_msg: str):
         """Handle task error"""
+        stage = {
+            TaskStatus.TRANSCRIBING: "transcribe",
+            TaskStatus.TRANSLATING: "translate",
+            TaskStatus.GENERATING_DRAFT: "draft"
+        }.get(task.status, "pipeline")
+        self._journal(task, stage, "failed", error=error_msg)
         task.status = TaskStatus.FAILED
         task.error = error_msg
         task.completed_at = time.time()
@@ -493,6 +952,7 @@ class TranscriptionPipeline:
 
         if self.progress_bars:
             self.progress_bars["overall"].update(1)
+        self._emit(task, stage, "failed", error=error_msg)
 
         print(f"\n[Pipeline] FAILED: {task.video_name}")
         print(f"   Error: {error_msg}")
@@ -511,12 +971,13 @@ class TranscriptionPipeline:
             Dictionary with processing results and statistics
         """
         if not video_files:
-            return {"success": [], "failed": [], "stats": self.stats}
+            return {"success": [], "failed": [], "cancelled": [], "stats": self.stats}
 
         total = len(video_files)
         print(f"\n{'='*60}")
         print(f"[Pipeline] Starting parallel processing")
         print(f"   Videos: {total}")
+        print(f"   Transcribe workers: {self.transcribe_workers}")
         print(f"   Translate workers: {self.translate_workers}")
         print(f"   Draft workers: {self.draft_workers}")
         print(f"{'='*60}\n")
@@ -524,16 +985,61 @@ class TranscriptionPipeline:
         # Create progress bars
         self.progress_bars = self._create_progress_bars(total)
 
-        # Add all videos to the queue
-        for video_path in video_files:
-            self.add_video(video_path)
+        self.start(force, video_files)
+        return self.finish()
+
+    def start(self, force: bool = False, video_files: Optional[List[str]] = None, keep_open: bool = False):
+        """
+        Set up the shared stage resources, queue ``video_files`` and start the workers.
+
+        Args:
+            force: Force reprocessing even if drafts exist
+            video_files: Videos queued before the workers start (batch mode)
+            keep_open: Keep the workers (and loaded models) alive for later
+                ``submit()`` calls until ``finish()`` is called (watch mode)
+        """
+        self._force = force
+
+        # Per-stage spans, queue depths and worker utilization
+        self.telemetry = PipelineTelemetry.from_config(self.config)
+        if self.telemetry is not None:
+            self.telemetry.set_workers({
+                "transcribe": self.transcribe_workers,
+                "translate": self.translate_workers,
+                "stream": self.translate_workers if self.stream_translation and self.transcribe_workers == 1 else 0,
+                "draft": self.draft_workers
+            })
+            self.telemetry.set_stats_provider(lambda: dict(self.stats))
+            self.telemetry.watch_queues({
+                "transcribe": self.transcription_queue,
+                "translate": self.translation_queue,
+                "draft": self.draft_queue
+            })
+
+        self.journal = JobJournal.from_config(self.config)
+
+        # Executor for translation windows streamed out of the transcription worker
+        if self.stream_translation and self.transcribe_workers == 1:
+            self._stream_executor = ThreadPoolExecutor(
+                max_workers=self.translate_workers,
+                thread_name_prefix="stream-translate"
+            )
+
+        # Decode the audio of the next videos while Whisper works on the current one
+        if self.transcribe_workers == 1:
+            self._prefetcher = AudioPrefetcher.from_config(self.config)
+
+        if video_files:
+            self.submit(video_files)
+        if keep_open:
+            self._accepting.set()
 
         # Create worker threads
         threads = []
 
-        # Transcription worker (single thread - GPU bound)
+        # Transcription: single in-process worker, or a pool of model replicas
         transcribe_thread = threading.Thread(
-            target=self._transcribe_worker,
+            target=self._transcribe_pool_worker if self.transcribe_workers > 1 else self._transcribe_worker,
             args=(force,),
             name="transcribe-worker"
         )
@@ -559,10 +1065,66 @@ class TranscriptionPipeline:
         # Start all threads
         for thread in threads:
             thread.start()
+        self._threads = threads
+
+    def submit(self, video_files: List[str]) -> List[PipelineTask]:
+        """
+        Queue videos on a started pipeline.
+
+        Journaled videos resume after their last completed stage (unless
+        ``force``); the rest start from transcription.
+        """
+        video_files = [str(Path(p).resolve()) for p in video_files]
+        resume_points = {}
+        if self.journal is not None:
+            if self._force:
+                self.journal.reset(video_files)
+            else:
+                resume_points = self.journal.resume_points(video_files)
+
+        resumed = 0
+        to_transcribe = []
+        for video_path in video_files:
+            point = resume_points.get(video_path)
+            if point is not None and self._resume_task(video_path, point):
+                resumed += 1
+            else:
+                self.add_video(video_path)
+                to_transcribe.append(video_path)
+
+        if resumed:
+            print(f"[Pipeline] Resumed {resumed} videos from the job journal")
+
+        if self._prefetcher is not None:
+            self._prefetcher.append([
+                path for path in to_transcribe
+                if self._force or not self.workflow._has_current_subtitles(
+                    self.workflow.subtitle_folder / f"{Path(path).stem}.json")
+            ])
+
+        return [self.tasks[path] for path in video_files]
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Stop accepting videos, wait for every queued video to finish and
+        release the stage resources.
+
+        Returns:
+            Dictionary with processing results and statistics
+        """
+        self._accepting.clear()
 
         # Wait for all threads to complete
-        for thread in threads:
+        for thread in self._threads:
             thread.join()
+        self._threads = []
+
+        if self._stream_executor is not None:
+            self._stream_executor.shutdown(wait=True)
+            self._stream_executor = None
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown()
+            self._prefetcher = None
 
         # Close progress bars
         self._close_progress_bars()
@@ -570,6 +1132,8 @@ class TranscriptionPipeline:
         # Collect results
         success = []
         failed = []
+        cancelled = []
+        stopped = self._stop_event.is_set()
 
         for task in self.tasks.values():
             if task.status == TaskStatus.COMPLETED:
@@ -578,6 +1142,9 @@ class TranscriptionPipeline:
                     "draft": task.draft_name,
                     "time": task.elapsed_time()
                 })
+            elif stopped and task.status != TaskStatus.FAILED:
+                # Never reached (or never left) a stage before the run was cancelled
+                cancelled.append(task.video_name)
             else:
                 failed.append({
                     "video": task.video_name,
@@ -591,9 +1158,17 @@ class TranscriptionPipeline:
         print(f"   Total: {self.stats['total']}")
         print(f"   Completed: {self.stats['completed']}")
         print(f"   Failed: {self.stats['failed']}")
+        if cancelled:
+            print(f"   Cancelled: {len(cancelled)}")
         print(f"   Transcribed: {self.stats['transcribed']}")
         print(f"   Translated: {self.stats['translated']}")
         print(f"   Drafts generated: {self.stats['drafts_generated']}")
+        telemetry = None
+        if self.telemetry is not None:
+            self.telemetry.print_summary()
+            telemetry = self.telemetry.snapshot()
+            self.telemetry.close()
+            self.telemetry = None
         print(f"{'='*60}\n")
 
         # 如果有失敗的影片，生成失敗清單
@@ -614,12 +1189,18 @@ class TranscriptionPipeline:
                 err_msg = str(item['error'] or 'Unknown error')[:50]
                 print(f"   - {item['video']}: {err_msg}...")
             print(f"\n   重跑失敗影片:")
-            print(f"   python translate_video.py --batch --pipeline --force")
+            if self.journal is not None:
+                # 日誌會讓其餘影片從最後完成的階段繼續，不需要 --force
+                print(f"   python translate_video.py --batch --pipeline")
+            else:
+                print(f"   python translate_video.py --batch --pipeline --force")
 
         return {
             "success": success,
             "failed": failed,
-            "stats": self.stats
+            "cancelled": cancelled,
+            "stats": self.stats,
+            "telemetry": telemetry
         }
 
     def stop(self):
@@ -627,186 +1208,74 @@ class TranscriptionPipeline:
         self._stop_event.set()
 
 
-class TranslationWorkflow:
-    """翻譯影片工作流程"""
-
-    def __init__(self, config_path: str = "translation_config.json"):
-        self.config = self._load_config(config_path)
-        self.subtitle_gen = SubtitleGenerator(config_path)
-
-        # 路徑設定
-        self.project_root = Path(__file__).parent
-        self.jianying_draft_root = self._get_jianying_draft_root()
-        self.template_name = self.config.get("output", {}).get("template_name", "翻譯專案")
-        self.output_prefix = self.config.get("output", {}).get("output_prefix", "翻譯專案_")
-        self.subtitle_folder = self.project_root / self.config.get("output", {}).get("subtitle_folder", "subtitles")
-
-        # 確保字幕資料夾存在
-        self.subtitle_folder.mkdir(exist_ok=True)
-
-    def _load_config(self, config_path: str) -> dict:
-        """載入設定檔"""
-        if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
-
-    def _get_jianying_draft_root(self) -> Path:
-        """取得剪映草稿根路徑"""
-        # 優先從 config.json 讀取
-        config_path = self.project_root / "config.json"
-        if config_path.exists():
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    return Path(config.get("jianying_draft_folder", ""))
-            except:
-                pass
-
-        username = os.environ.get("USERNAME") or os.getlogin()
-        return Path(rf"C:\Users\{username}\AppData\Local\JianyingPro\User Data\Projects\com.lveditor.draft")
-
-    def _load_template(self) -> Optional[dict]:
-        """載入翻譯專案模板 - 每次都從本地強制複製到剪映草稿夾"""
-        local_template_folder = self.project_root / self.template_name
-        local_template_file = local_template_folder / "draft_content.json"
-        dest_folder = self.jianying_draft_root / self.template_name
-
-        # 檢查本地模板是否存在
-        if not local_template_file.exists():
-            print(f"[Error] 找不到本地模板: {local_template_folder}")
-            return None
-
-        # 強制從本地複製到剪映草稿夾（每次都覆蓋）
-        print(f"[Template] 同步模板到剪映草稿夾...")
-        if dest_folder.exists():
-            shutil.rmtree(dest_folder, ignore_errors=True)
-        shutil.copytree(local_template_folder, dest_folder)
-
-        template_path = dest_folder / "draft_content.json"
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-
-    def _hex_to_rgb(self, hex_color: str) -> list:
-        """將 HEX 顏色轉換為 RGB (0-1 範圍)"""
-        hex_color = hex_color.lstrip('#')
-        r = int(hex_color[0:2], 16) / 255
-        g = int(hex_color[2:4], 16) / 255
-        b = int(hex_color[4:6], 16) / 255
-        return [r, g, b]
+def _hex_to_rgb(hex_color: str) -> list:
+    """將 HEX 顏色轉換為 RGB (0-1 範圍)"""
+    hex_color = hex_color.lstrip('#')
+    return [int(hex_color[i:i + 2], 16) / 255 for i in (0, 2, 4)]
 
-    def _remove_punctuation(self, text: str) -> str:
-        """移除標點符號"""
-        import re
-        # 移除中英文標點符號
-        punctuation = r'[，。！？、；：""''（）【】《》\.,!?\-\'\";:\(\)\[\]<>]'
-        return re.sub(punctuation, '', text)
 
-    def _auto_line_break(self, text: str, max_chars: int = 20) -> str:
-        """自動換行 - 每 max_chars 個字元插入換行"""
-        if len(text) <= max_chars:
-            return text
-
-        # 中文字幕自動換行
-        lines = []
-        current_line = ""
-        for char in text:
-            current_line += char
-            if len(current_line) >= max_chars:
-                lines.append(current_line)
-                current_line = ""
-        if current_line:
-            lines.append(current_line)
-
-        return "\n".join(lines)
-
-    def _create_subtitle_material(self, entry: SubtitleEntry, template_style: dict) -> dict:
-        """創建單個字幕素材 - 從模板提取樣式值"""
-        material_id = str(uuid.uuid4()).upper()
-
-        # 使用翻譯後的文字，如果沒有則用原文
-        text = entry.text_translated if entry.text_translated else entry.text_original
-
-        # 移除標點符號
-        text = self._remove_punctuation(text)
+class SubtitleEmitter:
+    """
+    依字幕樣式編譯的素材 / 片段產生器
 
-        # 自動換行處理
-        max_chars = self.config.get("subtitle_style", {}).get("max_chars_per_line", 18)
-        text = self._auto_line_break(text, max_chars)
-
-        # 從模板提取樣式值
-        font_size = template_style.get("font_size", 8.0)
-        font_resource_id = template_style.get("font_resource_id", "")
-        font_path = template_style.get("font_path", "")
-        border_width = template_style.get("border_width", 0.1166)
-        border_color = template_style.get("border_color", "#000000")
-        bold_width = template_style.get("bold_width", 0.008)
-        shadow_alpha = template_style.get("shadow_alpha", 0.618)
-        shadow_distance = template_style.get("shadow_distance", 5.0)
-        shadow_smoothing = template_style.get("shadow_smoothing", 0.45)
-        line_max_width = template_style.get("line_max_width", 0.82)
-        fonts = template_style.get("fonts", [])
-        # 背景設定
-        background_alpha = template_style.get("background_alpha", 0.64)
-        background_style = template_style.get("background_style", 1)
-        background_color = template_style.get("background_color", "#000000")
-
-        # 描邊設定
-        stroke_width = template_style.get("stroke_width", 0.173)
-        stroke_color = template_style.get("stroke_color", "#000000")
-        stroke_rgb = self._hex_to_rgb(stroke_color)
-
-        # 文字顏色設定
-        text_color = template_style.get("text_color", "#FFFFFF")
-        text_color_random = template_style.get("text_color_random", False)
-        text_color_options = template_style.get("text_color_options", ["#FFFFFF"])
-
-        # 如果啟用隨機顏色
-        if text_color_random and text_color_options:
-            text_color = random.choice(text_color_options)
-
-        text_rgb = self._hex_to_rgb(text_color)
-
-        # 建立 content JSON（包含 strokes 描邊）
-        style_entry = {
-            "fill": {"content": {"solid": {"color": text_rgb}}},
-            "font": {
-                "id": font_resource_id,
-                "path": font_path
-            },
-            "strokes": [
-                {
-                    "content": {"solid": {"color": stroke_rgb}},
-                    "width": stroke_width
-                }
-            ],
-            "size": font_size,
-            "useLetterColor": True,
-            "range": [0, len(text)]
-        }
+    樣式在建立時解析一次，產生原型；每條字幕替換 id、文字與時間範圍，
+    巢狀物件（words、fonts、clip、responsive_layout...）每次另外複製，
+    輸出的素材 / 片段之間不共用可變物件，之後修改草稿不會互相影響。
+    content 內層 JSON 也預先序列化，每條字幕只拼接文字與 range。
+    """
 
-        content_data = {
-            "text": text,
-            "styles": [style_entry]
-        }
+    def __init__(self, style: dict):
+        font_size = style.get("font_size", 8.0)
+        font_resource_id = style.get("font_resource_id", "")
+        font_path = style.get("font_path", "")
+        stroke_rgb = _hex_to_rgb(style.get("stroke_color", "#000000"))
+
+        # 文字顏色：啟用隨機時每條字幕從選項中挑一個
+        text_color = style.get("text_color", "#FFFFFF")
+        text_color_options = style.get("text_color_options", ["#FFFFFF"])
+        if style.get("text_color_random", False) and text_color_options:
+            colors = list(text_color_options)
+        else:
+            colors = [text_color]
+
+        # 每個顏色一組 content 前綴；range 在最後，結尾由每條字幕補上
+        self._color_variants = []
+        for color in colors:
+            style_entry = {
+                "fill": {"content": {"solid": {"color": _hex_to_rgb(color)}}},
+                "font": {
+                    "id": font_resource_id,
+                    "path": font_path
+                },
+                "strokes": [
+                    {
+                        "content": {"solid": {"color": stroke_rgb}},
+                        "width": style.get("stroke_width", 0.173)
+                    }
+                ],
+                "size": font_size,
+                "useLetterColor": True
+            }
+            style_prefix = json.dumps(style_entry, ensure_ascii=False)[:-1]
+            self._color_variants.append((color, f', "styles": [{style_prefix}, "range": [0, '))
 
-        return {
-            "id": material_id,
+        self._material_prototype = {
+            "id": "",
             "type": "text",
-            "content": json.dumps(content_data, ensure_ascii=False),
+            "content": "",
             "font_size": font_size,
             "text_color": text_color,
-            "background_color": background_color,
-            "background_alpha": background_alpha,
-            "background_style": background_style,
+            "background_color": style.get("background_color", "#000000"),
+            "background_alpha": style.get("background_alpha", 0.64),
+            "background_style": style.get("background_style", 1),
             "alignment": 1,
             "add_type": 0,
             "check_flag": 63,
             "combo_info": {"text_templates": []},
             "border_alpha": 1.0,
-            "border_color": border_color,
-            "border_width": border_width,
-            "bold_width": bold_width,
+            "border_color": style.get("border_color", "#000000"),
+            "border_width": style.get("border_width", 0.1166),
+            "bold_width": style.get("bold_width", 0.008),
             "font_category_id": "",
             "font_category_name": "",
             "font_id": "",
@@ -817,7 +1286,7 @@ class TranslationWorkflow:
             "font_team_id": "",
             "font_title": "none",
             "font_url": "",
-            "fonts": fonts,
+            "fonts": style.get("fonts", []),
             "force_apply_line_max_width": True,
             "global_alpha": 1.0,
             "has_shadow": True,
@@ -828,7 +1297,7 @@ class TranslationWorkflow:
             "layer_weight": 1,
             "letter_spacing": 0.0,
             "line_feed": 1,
-            "line_max_width": line_max_width,
+            "line_max_width": style.get("line_max_width", 0.82),
             "line_spacing": 0.02,
             "multi_language_current": "none",
             "name": "",
@@ -841,12 +1310,12 @@ class TranslationWorkflow:
             "recognize_task_id": "",
             "recognize_type": 0,
             "relevance_segment": [],
-            "shadow_alpha": shadow_alpha,
+            "shadow_alpha": style.get("shadow_alpha", 0.618),
             "shadow_angle": -45.0,
             "shadow_color": "#000000",
-            "shadow_distance": shadow_distance,
+            "shadow_distance": style.get("shadow_distance", 5.0),
             "shadow_point": {"x": 0.636, "y": -0.636},
-            "shadow_smoothing": shadow_smoothing,
+            "shadow_smoothing": style.get("shadow_smoothing", 0.45),
             "shape_clip_x": False,
             "shape_clip_y": False,
             "style_name": "",
@@ -863,10 +1332,7 @@ class TranslationWorkflow:
             "words": {"end_time": [], "start_time": [], "text": []}
         }
 
-    def _create_subtitle_segment(self, entry: SubtitleEntry, material_id: str,
-                                  style: dict, render_index: int) -> dict:
-        """創建字幕軌道片段"""
-        return {
+        self._segment_prototype = {
             "caption_info": None,
             "cartoon": False,
             "clip": {
@@ -887,14 +1353,14 @@ class TranslationWorkflow:
             "extra_material_refs": [],
             "group_id": "",
             "hdr_settings": None,
-            "id": str(uuid.uuid4()).upper(),
+            "id": "",
             "intensifies_audio": False,
             "is_placeholder": False,
             "is_tone_modify": False,
             "keyframe_refs": [],
             "last_nonzero_volume": 1.0,
-            "material_id": material_id,
-            "render_index": render_index,
+            "material_id": "",
+            "render_index": 0,
             "responsive_layout": {
                 "enable": False,
                 "horizontal_pos_layout": 0,
@@ -905,10 +1371,7 @@ class TranslationWorkflow:
             "reverse": False,
             "source_timerange": None,
             "speed": 1.0,
-            "target_timerange": {
-                "duration": entry.duration_us,
-                "start": entry.start_time_us
-            },
+            "target_timerange": None,
             "template_id": "",
             "template_scene": "default",
             "track_attribute": 0,
@@ -918,11 +1381,218 @@ class TranslationWorkflow:
             "volume": 1.0
         }
 
+        # 需要每次複製的巢狀欄位（dict / list）
+        self._material_nested = [key for key, value in self._material_prototype.items()
+                                 if isinstance(value, (dict, list))]
+        self._segment_nested = [key for key, value in self._segment_prototype.items()
+                                if isinstance(value, (dict, list))]
+
+    def emit(self, text: str, start_us: int, duration_us: int, render_index: int) -> Tuple[dict, dict]:
+        """產生一條字幕的 (素材, 片段)"""
+        if len(self._color_variants) == 1:
+            color, styles_json = self._color_variants[0]
+        else:
+            color, styles_json = random.choice(self._color_variants)
+
+        material_id = str(uuid.uuid4()).upper()
+        material = self._material_prototype.copy()
+        for key in self._material_nested:
+            material[key] = _copy_json(material[key])
+        material["id"] = material_id
+        material["text_color"] = color
+        material["content"] = (
+            '{"text": ' + json.dumps(text, ensure_ascii=False)
+            + styles_json + str(len(text)) + ']}]}'
+        )
+
+        segment = self._segment_prototype.copy()
+        for key in self._segment_nested:
+            segment[key] = _copy_json(segment[key])
+        segment["id"] = str(uuid.uuid4()).upper()
+        segment["material_id"] = material_id
+        segment["render_index"] = render_index
+        segment["target_timerange"] = {"duration": duration_us, "start": start_us}
+
+        return material, segment
+
+
+class TranslationWorkflow:
+    """翻譯影片工作流程"""
+
+    def __init__(self, config_path: str = "translation_config.json"):
+        self.config = self._load_config(config_path)
+        self.subtitle_gen = SubtitleGenerator(config_path)
+
+        # 路徑設定
+        self.project_root = Path(__file__).parent
+        self.jianying_draft_root = self._get_jianying_draft_root()
+        self.template_name = self.config.get("output", {}).get("template_name", "翻譯專案")
+        self.output_prefix = self.config.get("output", {}).get("output_prefix", "翻譯專案_")
+        self.subtitle_folder = self.project_root / self.config.get("output", {}).get("subtitle_folder", "subtitles")
+
+        # 確保字幕資料夾存在
+        self.subtitle_folder.mkdir(exist_ok=True)
+
+        # 模板快取: (本地模板檔案簽章, 已清理的模板資料)；多個草稿執行緒共用
+        self._template_lock = threading.Lock()
+        self._template_cache: Optional[Tuple[tuple, dict]] = None
+        self._subtitle_emitter: Optional[Tuple[str, SubtitleEmitter]] = None
+
+    def _load_config(self, config_path: str) -> dict:
+        """載入設定檔"""
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _has_current_subtitles(self, subtitle_json: Path) -> bool:
+        """字幕 JSON 存在且斷句設定未變更（變更時由轉錄快取重新斷句，不需重新跑模型）"""
+        if not subtitle_json.exists():
+            return False
+        if not self.subtitle_gen.is_segmentation_current(str(subtitle_json)):
+            print(f"[Cache] 斷句設定已變更，重新斷句: {subtitle_json.stem}")
+            return False
+        return True
+
+    def _get_jianying_draft_root(self) -> Path:
+        """取得剪映草稿根路徑"""
+        # 優先從 config.json 讀取
+        config_path = self.project_root / "config.json"
+        if config_path.exists():
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                    return Path(config.get("jianying_draft_folder", ""))
+            except:
+                pass
+
+        username = os.environ.get("USERNAME") or os.getlogin()
+        return Path(rf"C:\Users\{username}\AppData\Local\JianyingPro\User Data\Projects\com.lveditor.draft")
+
+    @staticmethod
+    def _template_signature(folder: Path) -> tuple:
+        """本地模板資料夾的簽章（所有檔案的相對路徑、大小、修改時間）"""
+        signature = []
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                signature.append((os.path.relpath(path, folder), stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(signature))
+
+    def _load_template(self) -> Optional[dict]:
+        """
+        載入翻譯專案模板
+
+        每次執行第一次載入時（或本地模板變更後）才從本地強制複製到剪映草稿夾並解析，
+        之後直接返回快取。返回的模板已清理英文字幕（保留前 2 個模板文字），
+        呼叫端不可修改，需先用 _clone_template 複製。
+        """
+        local_template_folder = self.project_root / self.template_name
+        local_template_file = local_template_folder / "draft_content.json"
+        dest_folder = self.jianying_draft_root / self.template_name
+
+        # 檢查本地模板是否存在
+        if not local_template_file.exists():
+            print(f"[Error] 找不到本地模板: {local_template_folder}")
+            return None
+
+        with self._template_lock:
+            signature = self._template_signature(local_template_folder)
+            if self._template_cache is not None and self._template_cache[0] == signature:
+                return self._template_cache[1]
+
+            # 強制從本地複製到剪映草稿夾（覆蓋）
+            print(f"[Template] 同步模板到剪映草稿夾...")
+            if dest_folder.exists():
+                shutil.rmtree(dest_folder, ignore_errors=True)
+            shutil.copytree(local_template_folder, dest_folder, dirs_exist_ok=True)
+
+            with open(dest_folder / "draft_content.json", 'r', encoding='utf-8') as f:
+                template_data = json.load(f)
+
+            # 清理模板中的英文字幕，保留前 2 個模板文字（標題、@html_cat）
+            template_data = self._clean_template_texts(template_data, keep_count=2)
+
+            self._template_cache = (signature, template_data)
+            return template_data
+
+    def _clone_template(self, template_data: dict) -> dict:
+        """
+        複製模板供單一影片使用
+
+        只複製每支影片會修改的部分（文字 / 影片素材、文字 / 影片軌道），
+        其餘素材與軌道直接共用，成本與模板大小無關。
+        """
+        draft_data = dict(template_data)
+
+        materials = dict(template_data.get("materials", {}))
+        for key in ("texts", "videos"):
+            if key in materials:
+                materials[key] = _copy_json(materials[key])
+        draft_data["materials"] = materials
+
+        draft_data["tracks"] = [
+            _copy_json(track) if track.get("type") in ("text", "video") else track
+            for track in template_data.get("tracks", [])
+        ]
+        return draft_data
+
+    def _hex_to_rgb(self, hex_color: str) -> list:
+        """將 HEX 顏色轉換為 RGB (0-1 範圍)"""
+        return _hex_to_rgb(hex_color)
+
+    def _remove_punctuation(self, text: str) -> str:
+        """移除標點符號"""
+        import re
+        # 移除中英文標點符號
+        punctuation = r'[，。！？、；：""''（）【】《》\.,!?\-\'\";:\(\)\[\]<>]'
+        return re.sub(punctuation, '', text)
+
+    def _auto_line_break(self, text: str, max_chars: int = 20) -> str:
+        """自動換行 - 每 max_chars 個字元插入換行"""
+        if len(text) <= max_chars:
+            return text
+
+        # 中文字幕自動換行
+        lines = []
+        current_line = ""
+        for char in text:
+            current_line += char
+            if len(current_line) >= max_chars:
+                lines.append(current_line)
+                current_line = ""
+        if current_line:
+            lines.append(current_line)
+
+        return "\n".join(lines)
+
+    def _get_subtitle_emitter(self) -> 'SubtitleEmitter':
+        """取得依目前 subtitle_style 編譯的字幕產生器（樣式不變時重複使用）"""
+        style = self.config.get("subtitle_style", {})
+        style_key = json.dumps(style, sort_keys=True, ensure_ascii=False)
+        with self._template_lock:
+            if self._subtitle_emitter is None or self._subtitle_emitter[0] != style_key:
+                self._subtitle_emitter = (style_key, SubtitleEmitter(style))
+            return self._subtitle_emitter[1]
+
+    def _format_subtitle_text(self, entry: SubtitleEntry, max_chars: int) -> str:
+        """字幕顯示文字：翻譯（沒有則原文）、移除標點、自動換行"""
+        # 使用翻譯後的文字，如果沒有則用原文
+        text = entry.text_translated if entry.text_translated else entry.text_original
+
+        # 移除標點符號
+        text = self._remove_punctuation(text)
+
+        # 自動換行處理
+        return self._auto_line_break(text, max_chars)
+
     def _add_subtitles_to_draft(self, draft_data: dict,
                                  entries: List[SubtitleEntry],
                                  template_data: dict = None) -> dict:
         """將字幕添加到草稿 - 使用設定檔的樣式"""
-        style = self.config.get("subtitle_style", {})
+        emitter = self._get_subtitle_emitter()
+        max_chars = self.config.get("subtitle_style", {}).get("max_chars_per_line", 18)
 
         # 創建字幕素材和片段
         subtitle_materials = []
@@ -931,14 +1601,11 @@ class TranslationWorkflow:
         base_render_index = 20000  # 字幕在較高層級
 
         for i, entry in enumerate(entries):
-            # 創建素材
-            material = self._create_subtitle_material(entry, style)
-            subtitle_materials.append(material)
-
-            # 創建片段
-            segment = self._create_subtitle_segment(
-                entry, material["id"], style, base_render_index + i
+            material, segment = emitter.emit(
+                self._format_subtitle_text(entry, max_chars),
+                entry.start_time_us, entry.duration_us, base_render_index + i
             )
+            subtitle_materials.append(material)
             subtitle_segments.append(segment)
 
         # 添加素材到 materials.texts
@@ -1321,6 +1988,7 @@ class TranslationWorkflow:
     def _replace_video_in_draft(self, draft_data: dict, video_path: str) -> dict:
         """替換草稿中的影片 - 使用與面相專案相同的邏輯"""
         import pyJianYingDraft as pjy
+        pjy.set_media_probe(_probe_material_tracks)
 
         # 確保使用絕對路徑
         video_path = os.path.abspath(video_path)
@@ -1442,7 +2110,7 @@ class TranslationWorkflow:
         # Step 1: 語音識別
         subtitle_json = self.subtitle_folder / f"{video_name}.json"
 
-        if skip_transcribe and subtitle_json.exists():
+        if skip_transcribe and self._has_current_subtitles(subtitle_json):
             print("[File] 載入現有字幕檔...")
             entries = self.subtitle_gen.load_from_json(str(subtitle_json))
         else:
@@ -1483,15 +2151,13 @@ class TranslationWorkflow:
         # Step 3: 生成剪映草稿
         print("[Note] Step 3: 生成剪映草稿")
 
+        # 模板只在首次使用（或變更）時同步與解析，已清理英文字幕
         template_data = self._load_template()
         if not template_data:
             return None
 
-        # 深度複製模板
-        draft_data = copy.deepcopy(template_data)
-
-        # 清理模板中的英文字幕，保留前 2 個模板文字（標題、@html_cat）
-        draft_data = self._clean_template_texts(draft_data, keep_count=2)
+        # 複製每支影片會修改的部分
+        draft_data = self._clone_template(template_data)
 
         # 替換影片
         draft_data = self._replace_video_in_draft(draft_data, str(video_path))
@@ -1520,9 +2186,8 @@ class TranslationWorkflow:
                 print(f"   [Warning] 無法完全刪除舊資料夾，將覆蓋檔案: {e}")
         output_folder.mkdir(parents=True, exist_ok=True)
 
-        # 寫入 draft_content.json
-        with open(output_folder / "draft_content.json", 'w', encoding='utf-8') as f:
-            json.dump(draft_data, f, ensure_ascii=False)
+        # 寫入 draft_content.json（串流寫入暫存檔後原子替換）
+        write_draft_json(output_folder / "draft_content.json", draft_data)
 
         # 複製其他模板檔案
         template_folder = self.jianying_draft_root / self.template_name
@@ -1539,7 +2204,9 @@ class TranslationWorkflow:
 
     def batch_process(self, video_folder: str = None, force: bool = False,
                       parallel: bool = None, max_workers: int = None,
-                      pipeline_mode: bool = None):
+                      pipeline_mode: bool = None,
+                      on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      stop_event: Optional[threading.Event] = None) -> Optional[Dict[str, int]]:
         """批量處理影片
 
         Args:
@@ -1548,6 +2215,11 @@ class TranslationWorkflow:
             parallel: 是否啟用並行處理（None 表示使用設定檔）
             max_workers: 最大並行數量（None 表示使用設定檔）
             pipeline_mode: 是否使用 pipeline 模式（None 表示使用設定檔）
+            on_event: 進度回呼，每支影片進入 / 離開階段時以 {video, stage, status, ...} 呼叫
+            stop_event: 設定後停止處理尚未開始的影片（處理中的階段會執行完畢）
+
+        Returns:
+            {"total", "completed", "failed", "cancelled"}；找不到影片時為 None
         """
         if video_folder is None:
             # 使用翻譯專案專屬的影片資料夾
@@ -1578,7 +2250,7 @@ class TranslationWorkflow:
             print("[Mode] 一般模式：跳過已存在的草稿")
 
         if pipeline_mode:
-            print(f"[Pipeline] Pipeline 模式：transcribe(1) -> translate({parallel_config.get('translate_workers', 4)}) -> draft({parallel_config.get('draft_workers', 2)})")
+            print(f"[Pipeline] Pipeline 模式：transcribe({parallel_config.get('transcribe_workers', 1)}) -> translate({parallel_config.get('translate_workers', 4)}) -> draft({parallel_config.get('draft_workers', 2)})")
         elif parallel:
             print(f"[Parallel] 並行處理模式：同時處理 {max_workers} 個影片")
         else:
@@ -1599,14 +2271,25 @@ class TranslationWorkflow:
 
         success_count = 0
         failed_count = 0
+        cancelled_count = 0
+
+        def notify(video_file: Path, status: str, **data):
+            # 非 pipeline 模式以整支影片為單位回報
+            if on_event is not None:
+                on_event(dict(data, video=video_file.stem, stage="video", status=status,
+                              stats={"total": len(video_files), "completed": success_count, "failed": failed_count}))
+
+        def cancelled() -> bool:
+            return stop_event is not None and stop_event.is_set()
 
         if pipeline_mode and len(video_files) > 1:
             # Pipeline 模式 - 使用 TranscriptionPipeline
-            pipeline = TranscriptionPipeline(self, parallel_config)
+            pipeline = TranscriptionPipeline(self, parallel_config, on_event=on_event, stop_event=stop_event)
             results = pipeline.process([str(f) for f in video_files], force=force)
 
             success_count = results["stats"]["completed"]
             failed_count = results["stats"]["failed"]
+            cancelled_count = len(results["cancelled"])
 
             # 結果已在 pipeline.process() 中打印
 
@@ -1627,44 +2310,119 @@ class TranslationWorkflow:
                     video_file = future_to_video[future]
                     completed += 1
 
+                    if cancelled():
+                        # 尚未開始的影片不再處理
+                        for pending in future_to_video:
+                            pending.cancel()
+                    if future.cancelled():
+                        cancelled_count += 1
+                        notify(video_file, "cancelled")
+                        continue
+
                     try:
                         result = future.result()
                         if result:
                             success_count += 1
                             print(f"\n[Progress] {completed}/{len(video_files)} - 成功: {video_file.name}")
+                            notify(video_file, "done", draft=result)
                         else:
                             failed_count += 1
                             print(f"\n[Progress] {completed}/{len(video_files)} - 失敗: {video_file.name}")
+                            notify(video_file, "failed")
                     except Exception as e:
                         failed_count += 1
                         print(f"\n[Error] {completed}/{len(video_files)} - 處理失敗: {video_file.name}")
                         print(f"   錯誤: {str(e)}")
+                        notify(video_file, "failed", error=str(e))
 
             print(f"\n{'='*60}")
             print(f"[Done] 批量處理完成!")
             print(f"   成功: {success_count}/{len(video_files)}")
             if failed_count > 0:
                 print(f"   失敗: {failed_count}/{len(video_files)}")
+            if cancelled_count > 0:
+                print(f"   已取消: {cancelled_count}/{len(video_files)}")
         else:
             # 單執行緒處理模式
             for i, video_file in enumerate(video_files, 1):
+                if cancelled():
+                    cancelled_count += 1
+                    notify(video_file, "cancelled")
+                    continue
                 print(f"\n[{i}/{len(video_files)}]")
+                notify(video_file, "started")
                 try:
                     result = self.process_video(str(video_file), force=force)
                     if result:
                         success_count += 1
+                        notify(video_file, "done", draft=result)
                     else:
                         failed_count += 1
+                        notify(video_file, "failed")
                 except Exception as e:
                     failed_count += 1
                     print(f"[Error] 處理失敗: {video_file.name}")
                     print(f"   錯誤: {str(e)}")
+                    notify(video_file, "failed", error=str(e))
 
             print(f"\n{'='*60}")
             print(f"[Done] 批量處理完成!")
             print(f"   成功: {success_count}/{len(video_files)}")
             if failed_count > 0:
                 print(f"   失敗: {failed_count}/{len(video_files)}")
+            if cancelled_count > 0:
+                print(f"   已取消: {cancelled_count}/{len(video_files)}")
+
+        return {
+            "total": len(video_files),
+            "completed": success_count,
+            "failed": failed_count,
+            "cancelled": cancelled_count
+        }
+
+    def watch_folder(self, video_folder: str = None, force: bool = False):
+        """
+        監看模式：持續偵測影片資料夾中新放入（且已寫入完成）的影片，送進常駐的 pipeline
+
+        模型、模板與各種快取在整個執行期間保持載入；按 Ctrl+C 停止監看，
+        並等待已送出的影片處理完成（再按一次則立即中止）。
+
+        Args:
+            video_folder: 影片資料夾路徑（預設從設定檔讀取）
+            force: 強制重新處理
+        """
+        if video_folder is None:
+            video_folder = self.config.get("input", {}).get("videos_folder", "videos/translate_raw")
+
+        parallel_config = self.config.get("parallel", {})
+        watch_config = self.config.get("watch", {})
+        watcher = FolderWatcher(
+            video_folder,
+            settle_seconds=watch_config.get("settle_seconds", 5.0),
+            poll_interval=watch_config.get("poll_interval", 2.0)
+        )
+
+        print(f"[Watch] 監看影片資料夾: {video_folder} ({watcher.backend})")
+        print(f"[Watch] 檔案停止寫入 {watcher.settle_seconds:g} 秒後開始處理，按 Ctrl+C 停止")
+        print("=" * 60)
+
+        pipeline = TranscriptionPipeline(self, parallel_config)
+        pipeline.start(force, keep_open=True)
+
+        try:
+            for video_path in watcher.watch():
+                print(f"\n[Watch] 新影片: {Path(video_path).name}")
+                pipeline.submit([video_path])
+        except KeyboardInterrupt:
+            print("\n[Watch] 停止監看，等待處理中的影片完成（再按 Ctrl+C 立即中止）...")
+        finally:
+            watcher.close()
+
+        try:
+            return pipeline.finish()
+        except KeyboardInterrupt:
+            pipeline.stop()
+            return pipeline.finish()
 
     def _process_video_safe(self, video_path: str, force: bool = False) -> Optional[str]:
         """安全地處理影片（用於並行處理，捕獲例外）
@@ -1705,7 +2463,9 @@ def main():
     parser.add_argument("--force", action="store_true", help="強制重新處理（即使草稿已存在）")
     parser.add_argument("--parallel", "-p", action="store_true", help="啟用並行處理（舊版模式）")
     parser.add_argument("--pipeline", action="store_true", help="啟用 Pipeline 模式（推薦）")
+    parser.add_argument("--watch", "-w", action="store_true", help="監看模式：持續處理放入影片資料夾的新影片")
     parser.add_argument("--workers", type=int, help="並行處理的執行緒數量（預設使用設定檔）")
+    parser.add_argument("--transcribe-workers", type=int, help="語音識別模型副本數量（Pipeline 模式，預設 1）")
     parser.add_argument("--translate-workers", type=int, help="翻譯並行數量（Pipeline 模式，預設 4）")
     parser.add_argument("--draft-workers", type=int, help="草稿生成並行數量（Pipeline 模式，預設 2）")
 
@@ -1714,15 +2474,19 @@ def main():
     workflow = TranslationWorkflow()
 
     # 如果指定了 pipeline 相關參數，更新設定
-    if args.translate_workers or args.draft_workers:
+    if args.transcribe_workers or args.translate_workers or args.draft_workers:
         parallel_config = workflow.config.get("parallel", {})
+        if args.transcribe_workers:
+            parallel_config["transcribe_workers"] = args.transcribe_workers
         if args.translate_workers:
             parallel_config["translate_workers"] = args.translate_workers
         if args.draft_workers:
             parallel_config["draft_workers"] = args.draft_workers
         workflow.config["parallel"] = parallel_config
 
-    if args.batch or args.folder:
+    if args.watch:
+        workflow.watch_folder(args.folder, force=args.force)
+    elif args.batch or args.folder:
         workflow.batch_process(
             args.folder,
             force=args.force,
@@ -1750,9 +2514,10 @@ def main():
         print("  python translate_video.py --batch --pipeline             # Pipeline 模式（推薦）")
         print("  python translate_video.py --batch --pipeline --translate-workers 6 --draft-workers 3")
         print("  python translate_video.py --folder <path>                # 指定資料夾")
+        print("  python translate_video.py --watch                        # 監看模式（持續處理新放入的影片）")
         print()
         print("Pipeline 模式說明:")
-        print("  - 語音識別：單執行緒（GPU bound）")
+        print(f"  - 語音識別：{parallel_config.get('transcribe_workers', 1)} 個模型副本（GPU/CPU bound，長影片優先）")
         print(f"  - 翻譯：{parallel_config.get('translate_workers', 4)} 個執行緒（I/O bound）")
         print(f"  - 草稿生成：{parallel_config.get('draft_workers', 2)} 個執行緒（I/O bound）")
         print("  - 各階段可並行處理不同影片")
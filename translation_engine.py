@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+翻譯請求引擎 - 整個行程共用一個 asyncio 事件迴圈與 HTTP 連線池
+
+- 同一組 (api_key, base_url) 只建立一個 AsyncOpenAI client（keep-alive 連線重複使用）
+- 所有執行緒（pipeline 翻譯 worker、串流翻譯視窗、GUI）的請求共用同一個並行上限
+- 並行上限以 AIMD 調整：回應正常時逐步加一，遇到 429 或延遲超過目標時倍數降低
+"""
+
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    from openai import AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+DEFAULT_INITIAL_CONCURRENCY = 3
+DEFAULT_MAX_CONCURRENCY = 12
+DEFAULT_TARGET_LATENCY = 30.0
+
+# 視為可重試的 HTTP 狀態碼
+RETRY_STATUS = (408, 409, 429, 500, 502, 503, 504)
+
+
+def engine_settings(config: dict) -> tuple:
+    """引擎建立後仍會影響行為的設定（並行上下限、延遲目標、重試與逾時），用來判斷是否需要重新設定"""
+    return tuple(config.get(name) for name in (
+        "min_concurrency", "max_concurrency", "target_latency", "max_retries", "request_timeout"))
+
+
+@dataclass
+class ChatResult:
+    """單一請求的回應與量測"""
+    content: str
+    latency: float
+    attempts: int = 1
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class AIMDLimiter:
+    """
+    加法增加 / 乘法減少的並行上限
+
+    - 成功且延遲在目標內：每完成約 limit 個請求，上限 +1
+    - 429：上限乘以 backoff（預設 0.5）
+    - 延遲超過目標：上限乘以 slow_backoff（預設 0.8）
+    同一段延遲時間內只降一次，避免同一波請求連續把上限壓到底。
+    """
+
+    def __init__(self, initial: float, min_limit: int = 1, max_limit: int = DEFAULT_MAX_CONCURRENCY,
+                 target_latency: float = DEFAULT_TARGET_LATENCY,
+                 backoff: float = 0.5, slow_backoff: float = 0.8):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.slow_backoff = slow_backoff
+        self.in_flight = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # 需在事件迴圈內建立
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            while self.in_flight >= int(self.limit):
+                await condition.wait()
+            self.in_flight += 1
+
+    async def release(self, latency: float, throttled: bool = False):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                self._decrease(self.backoff, now, latency)
+            elif latency > self.target_latency:
+                self._decrease(self.slow_backoff, now, latency)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            condition.notify_all()
+
+    async def reconfigure(self, min_limit: int, max_limit: int, target_latency: float):
+        """套用新的上下限與目標延遲；目前的上限保留，只夾進新範圍"""
+        condition = self._get_condition()
+        async with condition:
+            self.min_limit = max(1, min_limit)
+            self.max_limit = max(self.min_limit, max_limit)
+            self.limit = float(min(max(self.limit, self.min_limit), self.max_limit))
+            self.target_latency = target_latency
+            condition.notify_all()
+
+    def _decrease(self, factor: float, now: float, latency: float):
+        if now - self._last_decrease < latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "throttled": self.throttled
+        }
+
+
+class TranslationEngine:
+    """
+    共用的非同步翻譯引擎
+
+    呼叫端維持同步介面：chat_many() 會把請求送到背景事件迴圈並阻塞等待結果，
+    因此可以直接從任意執行緒呼叫。
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, config: Optional[dict] = None):
+        if not OPENAI_AVAILABLE:
+            raise ImportError("openai")
+
+        config = config or {}
+        self.api_key = api_key
+        self.base_url = base_url
+        self.settings = engine_settings(config)
+        self.max_retries = config.get("max_retries", 4)
+        self.request_timeout = config.get("request_timeout", 120.0)
+
+        max_concurrency = config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        self.limiter = AIMDLimiter(
+            initial=config.get("initial_concurrency", config.get("max_workers", DEFAULT_INITIAL_CONCURRENCY)),
+            min_limit=config.get("min_concurrency", 1),
+            max_limit=max_concurrency,
+            target_latency=config.get("target_latency", DEFAULT_TARGET_LATENCY)
+        )
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="translation-engine", daemon=True)
+        self._thread.start()
+        self._client = None
+        # 設定變更後換下的 client，等沒有進行中的請求時再關閉
+        self._retired_clients: List["AsyncOpenAI"] = []
+
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "latency_total": 0.0,
+                      "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _get_client(self) -> "AsyncOpenAI":
+        """建立共用 client（在事件迴圈執行緒內呼叫）"""
+        if self._client is None:
+            kwargs = {"api_key": self.api_key, "max_retries": 0, "timeout": self.request_timeout}
+            if self.base_url:
+                kwargs["base_url"] = self.base_url
+            if HTTPX_AVAILABLE:
+                # 連線池大小跟並行上限一致，閒置連線保持 keep-alive
+                kwargs["http_client"] = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.limiter.max_limit,
+                        max_keepalive_connections=self.limiter.max_limit,
+                        keepalive_expiry=60.0
+                    ),
+                    timeout=self.request_timeout
+                )
+            self._client = AsyncOpenAI(**kwargs)
+        return self._client
+
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        status = getattr(error, "status_code", None)
+        if status is None:
+            response = getattr(error, "response", None)
+            status = getattr(response, "status_code", None)
+        return status
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    async def _chat(self, request: dict) -> ChatResult:
+        """送出一個 chat completion，處理 429 / 暫時性錯誤重試"""
+        client = self._get_client()
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            started = time.monotonic()
+            throttled = False
+            try:
+                response = await client.chat.completions.create(**request)
+                latency = time.monotonic() - started
+                self.stats["requests"] += 1
+                self.stats["latency_total"] += latency
+                usage = getattr(response, "usage", None)
+                self.stats["prompt_tokens"] += getattr(usage, "prompt_tokens", None) or 0
+                self.stats["completion_tokens"] += getattr(usage, "completion_tokens", None) or 0
+                return ChatResult(
+                    content=response.choices[0].message.content or "",
+                    latency=latency,
+                    attempts=attempt + 1,
+                    prompt_tokens=getattr(usage, "prompt_tokens", None),
+                    completion_tokens=getattr(usage, "completion_tokens", None)
+                )
+            except Exception as e:
+                status = self._status_code(e)
+                throttled = status == 429
+                retryable = status in RETRY_STATUS or (status is None and type(e).__name__ in (
+                    "APIConnectionError", "APITimeoutError"))
+                if not retryable or attempt >= self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                delay = self._retry_after(e) or min(30.0, 2 ** attempt) * (0.5 + random.random())
+            finally:
+                await self.limiter.release(time.monotonic() - started, throttled)
+
+            await asyncio.sleep(delay)
+
+    async def _gather(self, requests: List[dict],
+                      on_result: Optional[Callable[[int, Union[ChatResult, Exception]], None]]) -> list:
+        async def run(index: int, request: dict):
+            try:
+                result = await self._chat(request)
+            except Exception as e:
+                result = e
+            if on_result is not None:
+                on_result(index, result)
+            return result
+
+        try:
+            return await asyncio.gather(*(run(i, r) for i, r in enumerate(requests)))
+        finally:
+            await self._close_retired_clients()
+
+    async def _close_retired_clients(self):
+        if self.limiter.in_flight or not self._retired_clients:
+            return
+        retired, self._retired_clients = self._retired_clients, []
+        for client in retired:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+    async def _reconfigure(self, config: dict):
+        old_pool = (self.limiter.max_limit, self.request_timeout)
+        self.settings = engine_settings(config)
+        self.max_retries = config.get("max_retries", 4)
+        self.request_timeout = config.get("request_timeout", 120.0)
+        await self.limiter.reconfigure(
+            min_limit=config.get("min_concurrency", 1),
+            max_limit=config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+            target_latency=config.get("target_latency", DEFAULT_TARGET_LATENCY)
+        )
+        # 連線池大小與逾時是建立 client 時決定的，變更時改用新 client
+        if self._client is not None and old_pool != (self.limiter.max_limit, self.request_timeout):
+            self._retired_clients.append(self._client)
+            self._client = None
+            await self._close_retired_clients()
+
+    def configure(self, config: dict):
+        """套用新的並行、延遲目標與重試設定（在事件迴圈執行緒內更新，進行中的請求不受影響）"""
+        asyncio.run_coroutine_threadsafe(self._reconfigure(config), self._loop).result()
+
+    def chat_many(self, requests: List[dict],
+                  on_result: Optional[Callable[[int, Union[ChatResult, Exception]], None]] = None
+                  ) -> List[Union[ChatResult, Exception]]:
+        """
+        並行送出多個 chat completion 請求
+
+        Args:
+            requests: chat.completions.create 的參數（model、messages、temperature...）
+            on_result: 每個請求完成時的回呼 (index, ChatResult 或例外)，於引擎執行緒呼叫
+
+        Returns:
+            與 requests 同順序的 ChatResult；失敗的請求為 Exception
+        """
+        if not requests:
+            return []
+        future = asyncio.run_coroutine_threadsafe(self._gather(requests, on_result), self._loop)
+        return future.result()
+
+    def snapshot(self) -> dict:
+        """目前的並行上限與請求統計"""
+        stats = dict(self.stats, **self.limiter.snapshot())
+        if stats["requests"]:
+            stats["avg_latency"] = round(stats["latency_total"] / stats["requests"], 2)
+        return stats
+
+
+_engines: Dict[Tuple[str, Optional[str]], TranslationEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(api_key: str, base_url: Optional[str] = None,
+               config: Optional[dict] = None) -> TranslationEngine:
+    """
+    取得（必要時建立）此行程共用的翻譯引擎
+
+    同一組 (api_key, base_url) 共用一個引擎與並行上限；傳入的 config 與引擎目前的
+    並行 / 延遲目標 / 重試設定不同時（例如 GUI 改了設定），會就地重新設定引擎。
+    """
+    key = (api_key, base_url)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = TranslationEngine(api_key, base_url, config)
+        elif config is not None and engine_settings(config) != engine.settings:
+            engine.configure(config)
+        return engine
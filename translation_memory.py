@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+翻譯記憶 - 跨影片重複出現的字幕（開場白、業配、口頭禪）只翻譯一次
+
+以 SQLite 儲存，key 為 (正規化原文, 目標語言, 模型, prompt 版本)；
+更換模型或修改 prompt 時 key 自然失效，不會拿到舊 prompt 的翻譯。
+"""
+
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_MEMORY_PATH = "cache/translation_memory.sqlite"
+
+# SQLite 單一查詢的參數上限（舊版為 999）
+_QUERY_CHUNK = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_source(text: str) -> str:
+    """正規化原文：Unicode NFKC + 合併空白"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class TranslationMemory:
+    """SQLite 翻譯記憶（多執行緒共用同一連線，以鎖保護）"""
+
+    def __init__(self, db_path: str = DEFAULT_MEMORY_PATH):
+        path = Path(db_path)
+        self.db_path = path if path.is_absolute() else PROJECT_ROOT / path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS memory (
+                source TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source, target_lang, model, prompt_version)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, translation_config: dict) -> Optional['TranslationMemory']:
+        """依 translation 設定建立翻譯記憶，停用時返回 None"""
+        memory_config = translation_config.get("memory", {})
+        if not memory_config.get("enabled", True):
+            return None
+        return cls(memory_config.get("path", DEFAULT_MEMORY_PATH))
+
+    def lookup(self, sources: Iterable[str], target_lang: str, model: str,
+               prompt_version: str) -> Dict[str, str]:
+        """
+        查詢多筆原文
+
+        Args:
+            sources: 已正規化的原文
+
+        Returns:
+            {正規化原文: 翻譯}，只包含命中的部分
+        """
+        unique = list(dict.fromkeys(sources))
+        found: Dict[str, str] = {}
+
+        with self._lock:
+            for i in range(0, len(unique), _QUERY_CHUNK):
+                chunk = unique[i:i + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT source, translation FROM memory "
+                    f"WHERE target_lang = ? AND model = ? AND prompt_version = ? AND source IN ({placeholders})",
+                    [target_lang, model, prompt_version, *chunk]
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE memory SET hits = hits + 1 "
+                    "WHERE source = ? AND target_lang = ? AND model = ? AND prompt_version = ?",
+                    [(source, target_lang, model, prompt_version) for source in found]
+                )
+                self._conn.commit()
+
+        return found
+
+    def store(self, translations: Dict[str, str], target_lang: str, model: str, prompt_version: str):
+        """寫入 {正規化原文: 翻譯}"""
+        if not translations:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO memory (source, target_lang, model, prompt_version, translation, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, target_lang, model, prompt_version) "
+                "DO UPDATE SET translation = excluded.translation, updated_at = excluded.updated_at",
+                [(source, target_lang, model, prompt_version, text, now)
+                 for source, text in translations.items()]
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """記憶筆數與累計命中次數"""
+        with self._lock:
+            count, hits = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM memory").fetchone()
+        return {"entries": count, "hits": hits}
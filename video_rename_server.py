@@ -9,11 +9,12 @@ import json
 import os
 import urllib.parse
 from pathlib import Path
-import socketserver
 import webbrowser
 import mimetypes
 import socket
 
+from web_server import KeepAliveHandlerMixin, create_server
+
 # 預設影片資料夾
 DEFAULT_VIDEO_FOLDER = "videos/translate_raw"
 PROJECT_ROOT = Path(__file__).parent
@@ -22,7 +23,7 @@ PROJECT_ROOT = Path(__file__).parent
 VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v'}
 
 
-class VideoRenameHandler(http.server.SimpleHTTPRequestHandler):
+class VideoRenameHandler(KeepAliveHandlerMixin, http.server.SimpleHTTPRequestHandler):
     """處理影片重命名的 HTTP Handler"""
 
     def __init__(self, *args, **kwargs):
@@ -43,6 +44,15 @@ class VideoRenameHandler(http.server.SimpleHTTPRequestHandler):
             # 靜態檔案
             super().do_GET()
 
+    def do_HEAD(self):
+        """處理 HEAD 請求（播放器探測影片大小）"""
+        parsed = urllib.parse.urlparse(self.path)
+
+        if parsed.path.startswith('/video/'):
+            self._handle_serve_video(parsed.path)
+        else:
+            super().do_HEAD()
+
     def do_POST(self):
         """處理 POST 請求"""
         parsed = urllib.parse.urlparse(self.path)
@@ -54,11 +64,7 @@ class VideoRenameHandler(http.server.SimpleHTTPRequestHandler):
 
     def _send_json(self, data, status=200):
         """送出 JSON 回應"""
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        self.send_json_body(data, status, {'Access-Control-Allow-Origin': '*'})
 
     def _handle_list_folders(self):
         """列出可用資料夾"""
@@ -127,59 +133,20 @@ class VideoRenameHandler(http.server.SimpleHTTPRequestHandler):
         """提供影片檔案"""
         # /video/videos/translate_raw/xxx.mp4 -> videos/translate_raw/xxx.mp4
         video_path = urllib.parse.unquote(path[7:])  # 移除 /video/
-        full_path = PROJECT_ROOT / video_path
+        full_path = (PROJECT_ROOT / video_path).resolve()
 
-        if not full_path.exists() or not full_path.is_file():
+        # 只允許專案資料夾內的檔案
+        if PROJECT_ROOT.resolve() not in full_path.parents or not full_path.is_file():
             self.send_error(404, "Video not found")
             return
 
-        # 取得檔案大小
-        file_size = full_path.stat().st_size
-
-        # 處理 Range 請求 (影片 seek)
-        range_header = self.headers.get('Range')
-
-        if range_header:
-            # 解析 Range: bytes=start-end
-            range_match = range_header.replace('bytes=', '').split('-')
-            start = int(range_match[0]) if range_match[0] else 0
-            end = int(range_match[1]) if range_match[1] else file_size - 1
-
-            self.send_response(206)  # Partial Content
-            self.send_header('Content-Range', f'bytes {start}-{end}/{file_size}')
-            content_length = end - start + 1
-        else:
-            self.send_response(200)
-            start = 0
-            end = file_size - 1
-            content_length = file_size
-
-        # 設定 headers
         mime_type, _ = mimetypes.guess_type(str(full_path))
-        self.send_header('Content-Type', mime_type or 'video/mp4')
-        self.send_header('Content-Length', content_length)
-        self.send_header('Accept-Ranges', 'bytes')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-
-        # 送出檔案內容
-        with open(full_path, 'rb') as f:
-            f.seek(start)
-            remaining = content_length
-            chunk_size = 64 * 1024  # 64KB chunks
-
-            while remaining > 0:
-                chunk = f.read(min(chunk_size, remaining))
-                if not chunk:
-                    break
-                self.wfile.write(chunk)
-                remaining -= len(chunk)
+        self.send_file(str(full_path), mime_type or 'video/mp4', {'Access-Control-Allow-Origin': '*'})
 
     def _handle_rename(self):
         """處理重新命名請求"""
         try:
-            content_length = int(self.headers['Content-Length'])
-            body = self.rfile.read(content_length).decode('utf-8')
+            body = self.read_body().decode('utf-8')
             data = json.loads(body)
 
             old_path = data.get('oldPath', '')
@@ -216,6 +183,7 @@ class VideoRenameHandler(http.server.SimpleHTTPRequestHandler):
 
             # 執行重命名
             old_full.rename(new_full)
+            self._update_transcription_cache(old_full, new_full)
 
             self._send_json({
                 'success': True,
@@ -231,10 +199,28 @@ class VideoRenameHandler(http.server.SimpleHTTPRequestHandler):
         except Exception as e:
             self._send_json({'error': str(e)}, 500)
 
+    def _update_transcription_cache(self, old_full: Path, new_full: Path):
+        """搬移轉錄快取的音訊雜湊記錄，重新命名後不需重新解碼或轉錄"""
+        try:
+            from transcription_cache import TranscriptionCache
+
+            whisper_config = {}
+            config_path = PROJECT_ROOT / "translation_config.json"
+            if config_path.exists():
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    whisper_config = json.load(f).get("whisper", {})
+
+            cache = TranscriptionCache.from_config(whisper_config)
+            if cache is not None:
+                cache.rename_source(str(old_full), str(new_full))
+        except Exception as e:
+            print(f"[Warning] 轉錄快取更新失敗: {e}")
+
     def log_message(self, format, *args):
         """自訂 log 格式"""
-        if '/api/' in args[0] or args[0].startswith('"POST'):
-            print(f"[API] {args[0]}")
+        request = str(args[0]) if args else ''
+        if '/api/' in request or request.startswith('POST'):
+            print(f"[API] {request}")
 
 
 def find_available_port(start_port=8765, max_attempts=10):
@@ -263,10 +249,7 @@ def run_server(port=8765):
     if available_port != port:
         print(f"\n[注意] Port {port} 已被佔用，改用 {available_port}")
 
-    # 設定 socket 可重用
-    socketserver.TCPServer.allow_reuse_address = True
-
-    with socketserver.TCPServer(("", available_port), VideoRenameHandler) as httpd:
+    with create_server(VideoRenameHandler, "", available_port) as httpd:
         url = f"http://localhost:{available_port}/video_rename.html"
         print(f"\n{'='*50}")
         print(f"  Video Rename Server")
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Web 工具共用的 HTTP 伺服器核心
+
+字幕編輯器、翻譯編輯器與影片重新命名工具共用：
+- 每個連線交給有上限的執行緒池處理；串流影片或執行批次時其他請求不會被卡住
+- HTTP/1.1 keep-alive：所有回應都帶 Content-Length，閒置連線逾時後釋放執行緒
+- 未讀取的請求主體會讓該連線在回應後關閉，避免殘留資料被當成下一個請求
+- send_file(): 以 sendfile 零複製送出檔案，支援 Range（含 suffix / 多段）、ETag 與條件請求
+"""
+
+import os
+import sys
+import json
+import uuid
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Type
+
+DEFAULT_MAX_WORKERS = 32
+
+# keep-alive 連線閒置多久（秒）後關閉，釋放工作執行緒
+KEEPALIVE_TIMEOUT = 15
+
+# 多段 Range 的段數上限（超過時回應整個檔案）
+MAX_RANGES = 16
+
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    解析 Range 標頭（bytes=0-99, bytes=500-, bytes=-500, 以逗號分隔的多段）
+
+    Returns:
+        已排序並合併重疊部分的 [(start, end)]（含 end）；
+        格式錯誤或不支援時為 None（應回應整個檔案）；沒有任何一段可滿足時為空列表（416）
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        first, dash, last = part.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if not first:
+                # suffix：最後 N 個位元組
+                length = int(last)
+                # 空檔案沒有可回應的位元組，suffix 一律無法滿足
+                if length <= 0 or size == 0:
+                    continue
+                ranges.append((max(0, size - length), size - 1))
+                continue
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            continue
+        if end < start:
+            return None
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class KeepAliveHandlerMixin:
+    """
+    搭配 BaseHTTPRequestHandler / SimpleHTTPRequestHandler 使用
+
+    子類別以 send_bytes() / send_json_body() 回應，以 read_body() 讀取請求主體。
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+
+    def handle_one_request(self):
+        self._body_read = False
+        super().handle_one_request()
+        headers = getattr(self, "headers", None)
+        if headers is not None and not self._body_read:
+            try:
+                unread = int(headers.get("Content-Length") or 0) > 0
+            except ValueError:
+                unread = True
+            if unread:
+                self.close_connection = True
+
+    def read_body(self) -> bytes:
+        """讀取完整的請求主體"""
+        self._body_read = True
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length > 0 else b""
+
+    def send_bytes(self, body: bytes, content_type: str, status: int = 200,
+                   headers: Optional[Dict[str, str]] = None):
+        """送出帶 Content-Length 的完整回應"""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_json_body(self, data, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        """送出 JSON 回應"""
+        self.send_bytes(json.dumps(data, ensure_ascii=False).encode("utf-8"),
+                        "application/json; charset=utf-8", status, headers)
+
+    # ------------------------------------------------------------------
+    # 檔案
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _etag(stat: os.stat_result) -> str:
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    @staticmethod
+    def _etag_matches(header: str, etag: str) -> bool:
+        """If-None-Match 比對（弱比對，支援多個值與 *）"""
+        candidates = [value.strip() for value in header.split(",")]
+        return "*" in candidates or any((value[2:] if value.startswith("W/") else value) == etag
+                                        for value in candidates)
+
+    def _not_modified(self, stat: os.stat_result, etag: str) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return self._etag_matches(if_none_match, etag)
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _range_applies(self, stat: os.stat_result, etag: str) -> bool:
+        """If-Range 不符（檔案已變更）時忽略 Range，改送整個檔案"""
+        if_range = self.headers.get("If-Range")
+        if not if_range:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == etag
+        try:
+            return int(stat.st_mtime) <= parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def _sendfile(self, f, offset: int, count: int):
+        """零複製送出檔案片段（平台不支援時 socket.sendfile 會自動改用一般傳送）"""
+        self.wfile.flush()
+        self.connection.sendfile(f, offset, count)
+
+    def send_file(self, file_path: str, content_type: Optional[str] = None,
+                  headers: Optional[Dict[str, str]] = None):
+        """
+        送出檔案：ETag / Last-Modified、304、Range（206 單段、multipart/byteranges 多段、416）
+
+        Args:
+            file_path: 檔案路徑（呼叫端負責確認位於允許的目錄內）
+            content_type: 預設依副檔名判斷
+            headers: 額外的回應標頭
+        """
+        try:
+            f = open(file_path, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = self._etag(stat)
+            content_type = content_type or mimetypes.guess_type(str(file_path))[0] or "application/octet-stream"
+            common = {
+                "ETag": etag,
+                "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+                "Accept-Ranges": "bytes",
+                "Cache-Control": "no-cache",
+                **(headers or {})
+            }
+
+            if self._not_modified(stat, etag):
+                self.send_response(304)
+                for name, value in common.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+
+            ranges = None
+            range_header = self.headers.get("Range")
+            if range_header and self._range_applies(stat, etag):
+                ranges = parse_range(range_header, size)
+
+            if ranges == []:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                for name, value in common.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+
+            include_body = self.command != "HEAD"
+
+            if ranges is None:
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(size))
+                for name, value in common.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if include_body and size:
+                    self._sendfile(f, 0, size)
+                return
+
+            if len(ranges) == 1:
+                start, end = ranges[0]
+                self.send_response(206)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                self.send_header("Content-Length", str(end - start + 1))
+                for name, value in common.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if include_body:
+                    self._sendfile(f, start, end - start + 1)
+                return
+
+            # 多段：multipart/byteranges，先算出完整長度
+            boundary = uuid.uuid4().hex
+            part_headers = [
+                (f"\r\n--{boundary}\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n").encode("latin-1")
+                for start, end in ranges
+            ]
+            closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            total = sum(len(h) for h in part_headers) + sum(end - start + 1 for start, end in ranges) + len(closing)
+
+            self.send_response(206)
+            self.send_header("Content-Type", f"multipart/byteranges; boundary={boundary}")
+            self.send_header("Content-Length", str(total))
+            for name, value in common.items():
+                self.send_header(name, value)
+            self.end_headers()
+            if include_body:
+                for part_header, (start, end) in zip(part_headers, ranges):
+                    self.wfile.write(part_header)
+                    self._sendfile(f, start, end - start + 1)
+                self.wfile.write(closing)
+
+
+class ToolHTTPServer(ThreadingHTTPServer):
+    """以固定大小執行緒池處理連線的 HTTP 伺服器"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class: Type, max_workers: int = DEFAULT_MAX_WORKERS):
+        super().__init__(server_address, handler_class)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-worker")
+
+    def process_request(self, request, client_address):
+        # 連線數超過上限時在佇列中等待，而不是無限制地建立執行緒
+        self._executor.submit(self.process_request_thread, request, client_address)
+
+    def handle_error(self, request, client_address):
+        # 瀏覽器中斷影片串流（跳轉、關閉分頁）是正常情況，不印出堆疊
+        if isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            return
+        super().handle_error(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_server(handler_class: Type, host: str, port: int,
+                  max_workers: int = DEFAULT_MAX_WORKERS) -> ToolHTTPServer:
+    """建立共用的並行 HTTP 伺服器"""
+    return ToolHTTPServer((host, port), handler_class, max_workers)
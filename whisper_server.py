@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Whisper 常駐模型伺服器
+模型只載入一次並保持預熱，供 translate_video.py、Web 工具與 GUI 共用
+
+協定: 本機 TCP，每個請求/回應為一行 JSON
+    -> {"op": "transcribe", "video_path": "...", "audio_path": null, "language": "en", "whisper": {...}}
+    <- {"ok": true, "segments": [...]}
+    -> {"op": "ping"}
+    <- {"ok": true, "models": [...]}
+
+使用方式:
+    python whisper_server.py
+    python whisper_server.py --port 8770 --max-models 2
+    python whisper_server.py --preload
+"""
+
+import os
+import json
+import socket
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from subtitle_generator import SubtitleGenerator
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8770
+
+# 影響模型載入的 whisper 設定；其餘設定（language、vad 等）每次請求各自帶入
+MODEL_KEYS = ("engine", "model", "device", "device_index", "compute_type", "cpu_threads", "num_workers")
+
+
+class WhisperServerUnavailable(Exception):
+    """無法連線到 Whisper 伺服器"""
+
+
+class WhisperModelPool:
+    """
+    依 (engine, model, compute_type, device, cpu_threads, num_workers) 快取已載入的模型
+
+    - 同一個模型同時只跑一個轉錄（GPU 無法有效共用）
+    - 超過 max_models 時釋放最久未使用的模型；使用中（含等待模型鎖）的模型不會被釋放，
+      待其請求結束後再檢查
+    """
+
+    def __init__(self, max_models: int = 2):
+        self.max_models = max(1, max_models)
+        self._generators: "OrderedDict[Tuple, SubtitleGenerator]" = OrderedDict()
+        self._model_locks: Dict[Tuple, threading.Lock] = {}
+        self._users: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def _model_key(self, whisper_config: dict) -> Tuple:
+        """計算模型快取 key（解析 auto device / compute_type）"""
+        probe = SubtitleGenerator(config={"whisper": whisper_config})
+        engine = whisper_config.get("engine", "openai-whisper")
+        if engine not in SubtitleGenerator.SUPPORTED_ENGINES:
+            engine = "openai-whisper"
+        device = probe._get_device()
+        compute_type = probe._get_compute_type(device) if engine == "faster-whisper" else ""
+        if device == "cuda" and "device_index" in whisper_config:
+            device = f"cuda:{whisper_config['device_index']}"
+        # faster-whisper 的 cpu_threads / num_workers 在模型載入時決定，設定不同就是不同的模型實例
+        cpu_threads, num_workers = "", ""
+        if engine == "faster-whisper":
+            cpu_threads = whisper_config.get("cpu_threads", 0)
+            num_workers = whisper_config.get("num_workers", 1)
+        return (engine, whisper_config.get("model", "base"), compute_type, device, cpu_threads, num_workers)
+
+    @contextmanager
+    def use(self, whisper_config: dict) -> Iterator[SubtitleGenerator]:
+        """
+        取得（必要時建立）對應的 SubtitleGenerator，並在持有其模型鎖期間使用
+
+        從取得到離開 with 區塊為止模型都算使用中，不會被釋放。
+        """
+        model_config = {k: whisper_config[k] for k in MODEL_KEYS if k in whisper_config}
+        key = self._model_key(model_config)
+
+        with self._lock:
+            generator = self._generators.get(key)
+            if generator is None:
+                generator = SubtitleGenerator(config={"whisper": dict(model_config)})
+                self._generators[key] = generator
+                self._model_locks[key] = threading.Lock()
+            self._generators.move_to_end(key)
+            self._users[key] = self._users.get(key, 0) + 1
+            model_lock = self._model_locks[key]
+            self._evict()
+
+        try:
+            with model_lock:
+                yield generator
+        finally:
+            with self._lock:
+                self._users[key] -= 1
+                if not self._users[key]:
+                    del self._users[key]
+                self._evict()
+
+    def _evict(self):
+        """依最久未使用的順序釋放閒置模型，直到不超過 max_models（呼叫端需持有 self._lock）"""
+        excess = len(self._generators) - self.max_models
+        for key in list(self._generators):
+            if excess <= 0:
+                break
+            if self._users.get(key):
+                continue
+            generator = self._generators.pop(key)
+            self._model_locks.pop(key, None)
+            generator.whisper_model = None
+            excess -= 1
+            print(f"[Server] 釋放模型: {key}")
+
+    def loaded_models(self) -> List[dict]:
+        """列出目前已載入的模型"""
+        with self._lock:
+            return [
+                {"engine": k[0], "model": k[1], "compute_type": k[2], "device": k[3],
+                 "cpu_threads": k[4], "num_workers": k[5], "loaded": g.whisper_model is not None}
+                for k, g in self._generators.items()
+            ]
+
+
+class WhisperRequestHandler(socketserver.StreamRequestHandler):
+    """處理單一連線上的 JSON 請求"""
+
+    def handle(self):
+        for raw_line in self.rfile:
+            if not raw_line.strip():
+                continue
+            try:
+                request = json.loads(raw_line.decode('utf-8'))
+                response = self._dispatch(request)
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+    def _dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        pool: WhisperModelPool = self.server.model_pool
+
+        if op == "ping":
+            return {"ok": True, "models": pool.loaded_models()}
+
+        if op == "transcribe":
+            video_path = request["video_path"]
+            if not os.path.exists(video_path):
+                return {"ok": False, "error": f"找不到影片: {video_path}"}
+
+            whisper_config = request.get("whisper", {})
+
+            print(f"[Server] 轉錄: {os.path.basename(video_path)}")
+            with pool.use(whisper_config) as generator:
+                # 每次請求帶入完整 whisper 設定（language、vad 等），模型本身不重新載入
+                generator.config = {"whisper": dict(generator.config["whisper"], **whisper_config)}
+                audio_path = request.get("audio_path")
+                if audio_path and not os.path.exists(audio_path):
+                    audio_path = None
+                segments = generator.transcribe_raw(video_path, request.get("language"), audio_path)
+            print(f"[Server] 完成: {os.path.basename(video_path)} ({len(segments)} segments)")
+            return {"ok": True, "engine": generator.engine, "segments": segments}
+
+        return {"ok": False, "error": f"不支援的操作: {op}"}
+
+
+class WhisperServer(socketserver.ThreadingTCPServer):
+    """多執行緒 TCP 伺服器，所有連線共用同一個 WhisperModelPool"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], model_pool: WhisperModelPool):
+        super().__init__(address, WhisperRequestHandler)
+        self.model_pool = model_pool
+
+
+class WhisperServerClient:
+    """Whisper 伺服器客戶端"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 timeout: float = 3600, connect_timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+    def _request(self, payload: dict) -> dict:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        except OSError as e:
+            raise WhisperServerUnavailable(f"{self.host}:{self.port} ({e})")
+
+        with sock:
+            sock.settimeout(self.timeout)
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n")
+            with sock.makefile('rb') as f:
+                line = f.readline()
+
+        if not line:
+            raise WhisperServerUnavailable("伺服器關閉連線")
+
+        response = json.loads(line.decode('utf-8'))
+        if not response.get("ok"):
+            raise RuntimeError(f"Whisper 伺服器錯誤: {response.get('error')}")
+        return response
+
+    def ping(self) -> Optional[List[dict]]:
+        """檢查伺服器狀態，無法連線時返回 None"""
+        try:
+            return self._request({"op": "ping"}).get("models", [])
+        except WhisperServerUnavailable:
+            return None
+
+    def transcribe(self, video_path: str, language: str, whisper_config: dict,
+                   audio_path: Optional[str] = None) -> List[dict]:
+        """請求伺服器轉錄，返回 segment dict 列表（audio_path 為預先解碼的 PCM 檔）"""
+        response = self._request({
+            "op": "transcribe",
+            "video_path": video_path,
+            "audio_path": audio_path,
+            "language": language,
+            "whisper": {k: v for k, v in whisper_config.items() if k != "server"}
+        })
+        return response["segments"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper 常駐模型伺服器")
+    parser.add_argument("--config", default="translation_config.json", help="設定檔路徑")
+    parser.add_argument("--host", help="監聽位址（預設使用設定檔或 127.0.0.1）")
+    parser.add_argument("--port", type=int, help="監聽 port（預設使用設定檔或 8770）")
+    parser.add_argument("--max-models", type=int, default=2, help="最多同時保留的模型數量")
+    parser.add_argument("--preload", action="store_true", help="啟動時預先載入設定檔中的模型")
+    args = parser.parse_args()
+
+    whisper_config = SubtitleGenerator(args.config).config.get("whisper", {})
+    server_config = whisper_config.get("server", {})
+    host = args.host or server_config.get("host", DEFAULT_HOST)
+    port = args.port or server_config.get("port", DEFAULT_PORT)
+
+    model_pool = WhisperModelPool(max_models=args.max_models)
+    if args.preload:
+        with model_pool.use(whisper_config) as generator:
+            generator._load_whisper_model()
+
+    print("=" * 50)
+    print("  Whisper 模型伺服器")
+    print("=" * 50)
+    print(f"  監聽: {host}:{port}")
+    print(f"  最多保留模型: {model_pool.max_models}")
+    print("  按 Ctrl+C 停止")
+    print("=" * 50)
+
+    server = WhisperServer((host, port), model_pool)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n伺服器已停止")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()